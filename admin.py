@@ -0,0 +1,224 @@
+"""
+Admin command line for the research results database.
+
+The curated tool catalog lives in a versioned JSON file (ai_tools_catalog.json). seed and
+sync compare it with the database and only write the difference in bulk: an unchanged
+catalog costs no writes, a changed description exactly one. Catalog tools get the same
+deterministic result_id as tools found by the auto-search, so a curated tool that was
+already discovered is left alone instead of being duplicated.
+
+Usage:
+    python -m admin seed  [--catalog FILE] [--dry-run]   # insert new and update changed curated tools
+    python -m admin sync  [--catalog FILE] [--dry-run]   # seed, and delete curated tools removed from the file
+    python -m admin clear [--status STATUS] [--dry-run]  # delete all results (or all in one status)
+    python -m admin check                                # indexes and query plans (Cosmos DB)
+    python -m admin stats                                # results per department and status
+"""
+import argparse
+import json
+import os
+import sys
+from db_cache import validated_results_manager
+from db_connection import get_storage_backend
+
+# Catalog file and the format version this CLI understands
+CATALOG_PATH = os.getenv("TOOL_CATALOG_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ai_tools_catalog.json"))
+CATALOG_FORMAT_VERSION = 1
+
+# 'apertus_validation' of curated tools (identifies the documents the catalog owns)
+CURATED_SOURCE = "Curated list"
+# Fields a catalog entry controls; differences in these are written by seed/sync
+SYNC_FIELDS = ('tool_name', 'source_url', 'llm_analysis')
+
+
+def load_catalog(path: str = CATALOG_PATH) -> dict:
+    """
+    Reads the catalog file.
+
+    Returns:
+        dict: result_id -> add_pending_result arguments of the tool.
+
+    Raises:
+        ValueError: If the file has another format version or is malformed.
+    """
+    with open(path, encoding='utf-8') as f:
+        catalog = json.load(f)
+    if catalog.get('version') != CATALOG_FORMAT_VERSION:
+        raise ValueError(f"unsupported catalog version {catalog.get('version')!r} (expected {CATALOG_FORMAT_VERSION})")
+
+    items = {}
+    for department, tools in catalog['departments'].items():
+        for tool in tools:
+            item = {
+                'query': f"AI tools for {department}",
+                'department': department,
+                'llm_analysis': tool['desc'],
+                'apertus_validation': CURATED_SOURCE,
+                'tool_name': tool['name'],
+                'source_url': tool['url'],
+            }
+            result_id = validated_results_manager.tool_result_id(department, tool['name'], tool['url'])
+            if result_id in items:
+                print(f"⚠️ Duplicate catalog entry ignored: [{department}] {tool['name']}")
+                continue
+            items[result_id] = item
+    return items
+
+
+def diff_catalog(items: dict) -> dict:
+    """
+    Compares the catalog with the database.
+
+    Args:
+        items (dict): Output of load_catalog().
+
+    Returns:
+        dict: {'insert': [items], 'update': {department: {result_id: changed fields}},
+        'delete': {department: [result_ids]}}, or None if the database is unavailable.
+    """
+    fields = SYNC_FIELDS + ('result_id', 'department', 'apertus_validation')
+    stored = validated_results_manager.find_results(result_ids=list(items), fields=fields, none_if_unavailable=True)
+    curated = validated_results_manager.find_results(source=CURATED_SOURCE, fields=fields, none_if_unavailable=True)
+    if stored is None or curated is None:
+        return None
+
+    existing = {doc['result_id']: doc for doc in stored}
+    diff = {'insert': [], 'update': {}, 'delete': {}}
+    for result_id, item in items.items():
+        doc = existing.get(result_id)
+        if doc is None:
+            diff['insert'].append(item)
+        elif doc.get('apertus_validation') == CURATED_SOURCE:
+            # Tools found by the auto-search keep their own description
+            changed = {field: item[field] for field in SYNC_FIELDS if doc.get(field) != item[field]}
+            if changed:
+                diff['update'].setdefault(item['department'], {})[result_id] = changed
+    for doc in curated:
+        if doc['result_id'] not in items:
+            diff['delete'].setdefault(doc.get('department'), []).append(doc['result_id'])
+    return diff
+
+
+def apply_diff(diff: dict, delete: bool) -> dict:
+    """
+    Writes a catalog diff in bulk.
+
+    Args:
+        diff (dict): Output of diff_catalog().
+        delete (bool): Also delete curated tools that are no longer in the catalog.
+
+    Returns:
+        dict: Number of inserted, updated and deleted results.
+    """
+    written = {'inserted': 0, 'updated': 0, 'deleted': 0}
+    if diff['insert']:
+        written['inserted'] = len(validated_results_manager.add_pending_results_bulk(diff['insert']))
+    # One call per department, so every write targets a single partition
+    for department, changes in diff['update'].items():
+        written['updated'] += validated_results_manager.update_results(changes, department=department)
+    if delete:
+        for department, result_ids in diff['delete'].items():
+            written['deleted'] += validated_results_manager.delete_results(result_ids, department=department)
+    return written
+
+
+def cmd_seed(args, delete: bool = False) -> int:
+    """seed / sync: applies the catalog file to the database."""
+    try:
+        items = load_catalog(args.catalog)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Cannot read catalog {args.catalog}: {e}")
+        return 1
+
+    diff = diff_catalog(items)
+    if diff is None:
+        print("❌ Database not reachable")
+        return 1
+
+    updated = sum(len(changes) for changes in diff['update'].values())
+    removed = sum(len(result_ids) for result_ids in diff['delete'].values())
+    print(f"Catalog: {len(items)} tools - {len(diff['insert'])} new, {updated} changed, "
+          f"{removed} removed{'' if delete else ' (kept, use sync to delete)'}")
+    for item in diff['insert']:
+        print(f"  + [{item['department']}] {item['tool_name']}")
+    for department, changes in diff['update'].items():
+        for result_id, changed in changes.items():
+            print(f"  ~ [{department}] {result_id}: {', '.join(changed)}")
+    if delete:
+        for department, result_ids in diff['delete'].items():
+            for result_id in result_ids:
+                print(f"  - [{department}] {result_id}")
+
+    if args.dry_run:
+        return 0
+    written = apply_diff(diff, delete)
+    print(f"✅ {written['inserted']} inserted, {written['updated']} updated, {written['deleted']} deleted")
+    return 0
+
+
+def cmd_clear(args) -> int:
+    """clear: deletes all results (or all results in one status)."""
+    count = validated_results_manager.purge(args.status, dry_run=args.dry_run)
+    print(f"{'Would delete' if args.dry_run else 'Deleted'} {count} result(s)")
+    return 0
+
+
+def cmd_check(args) -> int:
+    """check: verifies indexes and hot-path query plans."""
+    if get_storage_backend() != "cosmos":
+        print("✅ SQLite backend: indexes are part of the schema")
+        return 0
+
+    from db_indexes import MIGRATION_HINT, check_indexes, check_migrations, verify_query_plans
+    missing = check_indexes()
+    for collection_name, index_name in missing:
+        print(f"❌ Missing index: {collection_name}.{index_name}")
+    for collection_name, index_name in check_migrations():
+        print(f"⚠️ Index {collection_name}.{index_name} {MIGRATION_HINT}")
+    problems = verify_query_plans()
+    for problem in problems:
+        print(f"❌ Query not indexed: {problem}")
+    if missing or problems:
+        return 1
+    print("✅ All indexes present and used by the hot-path queries")
+    return 0
+
+
+def cmd_stats(args) -> int:
+    """stats: prints the number of results per department and status."""
+    counts = validated_results_manager.get_status_counts()
+    totals = {}
+    for department, statuses in sorted(counts.items()):
+        print(f"  {department}: {statuses}")
+        for status, count in statuses.items():
+            totals[status] = totals.get(status, 0) + count
+    print(f"Total: {totals}")
+    return 0
+
+
+def main(argv: list = None) -> int:
+    """Parses the command line and runs a subcommand. Returns the exit code."""
+    parser = argparse.ArgumentParser(prog="python -m admin", description="Admin tools for the research results database.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in (("seed", "insert new and update changed curated tools"),
+                            ("sync", "like seed, and delete curated tools removed from the catalog")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--catalog", default=CATALOG_PATH, help="catalog file (JSON)")
+        command.add_argument("--dry-run", action="store_true", help="only show the difference")
+
+    clear = commands.add_parser("clear", help="delete all results")
+    clear.add_argument("--status", help="only delete results in this status")
+    clear.add_argument("--dry-run", action="store_true", help="only count what would be deleted")
+
+    commands.add_parser("check", help="verify indexes and query plans")
+    commands.add_parser("stats", help="results per department and status")
+
+    args = parser.parse_args(argv)
+    if args.command in ("seed", "sync"):
+        return cmd_seed(args, delete=args.command == "sync")
+    return {"clear": cmd_clear, "check": cmd_check, "stats": cmd_stats}[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
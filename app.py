@@ -665,39 +665,9 @@ def render_anwendungen():
     tab_names = ["Marketing", "Customer Success", "HR", "Product", "General"]
     tabs = st.tabs(tab_names)
     
-    # Pre-defined questions for each department
-    questions_by_department = {
-        "Marketing": [
-            "Welche KI-Tools eignen sich am besten für Content-Erstellung?",
-            "Wie kann KI bei SEO und Keyword-Recherche helfen?",
-            "Welche Tools nutzen Sie für Social Media Automation?",
-            "Wie verwenden Sie KI für Grafikdesign und Bildgenerierung?"
-        ],
-        "Customer Success": [
-            "Welche Chatbot-Lösungen empfehlen Sie für KMUs?",
-            "Wie kann KI bei der Analyse von Kundenfeedback helfen?",
-            "Welche Tools automatisieren Support-Tickets am besten?",
-            "Wie nutzen Sie KI für personalisierte Kundenansprache?"
-        ],
-        "HR": [
-            "Welche KI-Tools unterstützen beim Recruiting?",
-            "Wie kann KI im Onboarding-Prozess eingesetzt werden?",
-            "Welche Tools helfen bei der Mitarbeiterentwicklung?",
-            "Wie nutzen Sie KI für Leistungsbeurteilungen?"
-        ],
-        "Product": [
-            "Welche KI-Coding-Assistenten empfehlen Sie?",
-            "Wie kann KI bei der Produktplanung helfen?",
-            "Welche Tools unterstützen beim UI/UX Design?",
-            "Wie nutzen Sie KI für Feature-Priorisierung?"
-        ],
-        "General": [
-            "Welche allgemeinen Produktivitätstools mit KI gibt es?",
-            "Wie kann KI bei Meeting-Management helfen?",
-            "Welche Tools empfehlen Sie für Wissensmanagement?",
-            "Wie nutzen Sie KI für Dokumentenverarbeitung?"
-        ]
-    }
+    # Pre-defined questions for each department (answers are pre-warmed in the background)
+    from faq_warmup import FAQ_QUESTIONS
+    questions_by_department = FAQ_QUESTIONS
     
     # Content for each tab
     for idx, (tab, dept_name) in enumerate(zip(tabs, tab_names)):
@@ -737,55 +707,26 @@ def render_anwendungen():
                         
                         st.session_state[chat_key].append(("user", question))
                         
-                        # Check cache first for instant response
-                        from db_cache import cache
-                        cached_result = cache.get_cached_answer(question, dept_name)
+                        # Check cache first for instant response (stale answers are refreshed in the background)
+                        from slm_service import lookup_cached_answer
+                        cached_result = lookup_cached_answer(question, dept_name)
                         
                         if cached_result:
                             # Cache HIT - instant response!
                             st.session_state[chat_key].append(("assistant", cached_result['answer']))
                             st.rerun()
                         
-                        # Try SLM with curated knowledge first
+                        # Try SLM with curated knowledge first (falls back to direct LLM)
                         with st.spinner("🤔 Suche in kuratiertem Wissen..."):
-                            from slm_service import answer_with_curated_knowledge
+                            from slm_service import refresh_answer
                             
-                            slm_result = answer_with_curated_knowledge(question, dept_name)
+                            # Computes the answer and caches it for future use
+                            result = refresh_answer(question, dept_name)
                             
-                            if slm_result.get("curated") and slm_result.get("answer"):
-                                # Successfully got answer from curated knowledge
-                                answer_text = slm_result["answer"]
-                                
-                                # Add source attribution
-                                sources = slm_result.get("sources", [])
-                                if sources:
-                                    answer_text += "\n\n---\n*Basierend auf kuratiertem Wissen*"
-                                
-                                # Cache for future use
-                                cache.store_answer(question, dept_name, answer_text)
-                                st.session_state[chat_key].append(("assistant", answer_text))
-                                
-                            elif slm_result.get("no_curated_data"):
-                                # No curated data - fall back to direct LLM
-                                from analysis import analyze_content_llm
-                                
-                                mock_results = [{
-                                    'title': f'{dept_name} KI-Tools',
-                                    'url': 'internal',
-                                    'content': f'Frage zum Bereich {dept_name}: {question}'
-                                }]
-                                
-                                llm_result = analyze_content_llm(mock_results, f"{question} - Fokus: {dept_name}")
-                                
-                                if "error" not in llm_result:
-                                    answer = llm_result["analysis"]
-                                    answer += "\n\n---\n*Hinweis: Diese Antwort wurde direkt generiert. Kuratiertes Wissen ist noch nicht verfügbar.*"
-                                    cache.store_answer(question, dept_name, answer)
-                                    st.session_state[chat_key].append(("assistant", answer))
-                                else:
-                                    st.session_state[chat_key].append(("assistant", f"❌ Fehler: {llm_result['error']}"))
+                            if "error" not in result:
+                                st.session_state[chat_key].append(("assistant", result["answer"]))
                             else:
-                                st.session_state[chat_key].append(("assistant", f"❌ Fehler: {slm_result.get('error', 'Unbekannt')}"))
+                                st.session_state[chat_key].append(("assistant", f"❌ Fehler: {result['error']}"))
                         
                         st.rerun()
             
@@ -854,82 +795,74 @@ AUTO_SEARCH_QUERIES = {
 }
 
 def run_auto_search_if_needed(force=False):
-    """Check if daily auto-search is needed and run it."""
-    from datetime import datetime, timedelta
-    from db_cache import validated_results_manager
-    import os
+    """
+    Starts the daily auto-search as a background job, unless another node already ran it.
+    The schedule lives in the database (one job per 24h window, see research_jobs), so across
+    all replicas exactly one node runs each refresh and the others skip it with a single read.
+    """
+    from research_jobs import run_scheduled_research, submit_research_job
     
-    # Check last search timestamp
-    timestamp_file = os.path.join(os.path.dirname(__file__), '.last_auto_search')
+    if force:
+        return submit_research_job(AUTO_SEARCH_QUERIES, extracted_label="LLM Council extracted")
+    return run_scheduled_research(AUTO_SEARCH_QUERIES, extracted_label="LLM Council extracted")
+
+
+# Seconds between status refreshes of a running research job
+RESEARCH_JOB_POLL_SECONDS = 3
+
+
+def render_research_job_status():
+    """Shows the progress of the latest research job (re-rendered on its own while it runs)."""
+    from research_jobs import RESEARCH_JOB_KIND, is_stale, job_store
     
-    should_run = force  # Always run if forced
-    if not force and os.path.exists(timestamp_file):
-        with open(timestamp_file, 'r') as f:
-            last_run = f.read().strip()
-            try:
-                last_datetime = datetime.fromisoformat(last_run)
-                # Run if more than 24 hours have passed
-                if datetime.now() - last_datetime > timedelta(hours=24):
-                    should_run = True
-            except:
-                should_run = True
-    elif not force:
-        should_run = True
+    job = job_store.latest(RESEARCH_JOB_KIND)
+    if job is None:
+        return
     
-    if should_run:
-        print("🔄 Running daily auto-search for new AI tools...")
-        try:
-            from scraper import search_and_scrape
-            from analysis import analyze_content_llm, validate_with_apertus
-            
-            for dept, query in AUTO_SEARCH_QUERIES.items():
-                print(f"  Searching for {dept}...")
-                results = search_and_scrape(query, max_results=3)
-                
-                if results and "error" not in results[0]:
-                    # Use LLM Council to extract actual tool names
-                    from analysis import extract_tool_names
-                    extracted_tools = extract_tool_names(results, dept)
-                    
-                    if extracted_tools:
-                        # Store each extracted tool
-                        for tool in extracted_tools:
-                            # Find source URL from results
-                            source_url = results[0].get('url', '') if results else ''
-                            
-                            validated_results_manager.add_pending_result(
-                                query=query,
-                                department=dept,
-                                llm_analysis=tool.get('description', ''),
-                                apertus_validation="LLM Council extracted",
-                                tool_name=tool.get('tool_name'),
-                                source_url=source_url
-                            )
-                    else:
-                        # Fallback: store scraped page titles
-                        for result in results[:2]:
-                            validated_results_manager.add_pending_result(
-                                query=query,
-                                department=dept,
-                                llm_analysis=result.get('snippet', ''),
-                                apertus_validation="Direct scrape",
-                                tool_name=result.get('title', 'Unknown')[:60],
-                                source_url=result.get('url', '')
-                            )
-            
-            # Update timestamp
-            with open(timestamp_file, 'w') as f:
-                f.write(datetime.now().isoformat())
-            print("✅ Auto-search complete!")
-        except Exception as e:
-            print(f"⚠️ Auto-search failed: {e}")
+    status = job['status']
+    if is_stale(job):
+        status = 'stale'
+    progress = job.get('progress') or {}
+    found = sum(counters.get('tools', 0) for counters in progress.values())
+    
+    _, status_col, _ = st.columns([1, 6, 1])
+    with status_col:
+        if status in ('queued', 'running'):
+            st.info(f"🔄 Suche läuft seit {job['created_at'].strftime('%H:%M')} UTC – bisher {found} Tools gefunden.")
+        elif status == 'done':
+            st.success(f"✅ Letzte Suche abgeschlossen ({job['finished_at'].strftime('%d.%m.%Y %H:%M')} UTC): "
+                       f"{job.get('stored', 0)} Tools gefunden.")
+        elif status == 'failed':
+            st.error(f"❌ Letzte Suche fehlgeschlagen: {job.get('error')}")
+        else:
+            st.warning("⚠️ Die letzte Suche wurde abgebrochen (keine Rückmeldung mehr vom Server).")
+        
+        if progress and (status in ('queued', 'running') or st.session_state.get('research_job_id') == job['_id']):
+            for department, counters in progress.items():
+                errors = f", {counters['errors']} Fehler" if counters.get('errors') else ""
+                st.caption(f"{department}: {counters.get('pages', 0)} Seiten, {counters.get('tools', 0)} Tools{errors}")
+    
+    # Reload the whole page once when a job this session is watching has finished,
+    # so the department tabs show the new tools
+    watching = st.session_state.get('research_job_running')
+    st.session_state['research_job_running'] = job['_id'] if status in ('queued', 'running') else None
+    if watching == job['_id'] and status not in ('queued', 'running'):
+        st.rerun()
+
+
+# Streamlit >= 1.37: only the status block is re-run while the rest of the page stays idle
+if hasattr(st, "fragment"):
+    render_research_job_status = st.fragment(run_every=RESEARCH_JOB_POLL_SECONDS)(render_research_job_status)
 
 
 def render_research_assistant():
     from db_cache import validated_results_manager
+    from research_jobs import AUTO_SEARCH_ENABLED
     
-    # Auto-search disabled for now - runs in background separately
-    # run_auto_search_if_needed()
+    # Daily auto-search (opt-in via AUTO_SEARCH_ENABLED): runs as a background job on one node,
+    # all others skip it cheaply
+    if AUTO_SEARCH_ENABLED:
+        run_auto_search_if_needed()
     
     # Custom CSS for styled tabs
     st.markdown("""
@@ -995,10 +928,15 @@ def render_research_assistant():
     col_spacer1, col_btn, col_spacer2 = st.columns([3, 2, 3])
     with col_btn:
         if st.button("🔄 Neue Tools suchen", type="primary", use_container_width=True):
-            with st.spinner("Suche nach neuen KI-Tools für alle Abteilungen..."):
-                run_auto_search_if_needed(force=True)
-            st.success("Fertig! Neue Tools wurden hinzugefügt.")
-            st.rerun()
+            # Runs in a background job; the status below polls its progress
+            from research_jobs import submit_research_job
+            job = submit_research_job(AUTO_SEARCH_QUERIES, requested_by=st.session_state.get('user_email', 'admin'),
+                                      extracted_label="LLM Council extracted")
+            if job is None:
+                st.warning("Die Suche konnte nicht gestartet werden: Es läuft bereits eine Suche oder die Datenbank ist nicht erreichbar.")
+            else:
+                st.session_state['research_job_id'] = job['_id']
+    render_research_job_status()
     
     # Department tabs
     dept_names = ["Marketing", "Customer Success", "HR", "Product", "General"]
@@ -1006,35 +944,24 @@ def render_research_assistant():
     
     for idx, dept_name in enumerate(dept_names):
         with tabs[idx]:
-            # Get data for this department
-            pending = validated_results_manager.get_pending_results()
-            pending_dept = [r for r in pending if r.get('department') == dept_name]
-            approved = validated_results_manager.get_approved_by_department(dept_name)
+            # Get data for this department (only the listed fields and a description preview)
+            approved = validated_results_manager.iter_results('approved', dept_name, description_chars=200)
+            pending_dept = validated_results_manager.iter_results('pending', dept_name, description_chars=200)
             
             # Combine all results with description
             all_results = []
-            for r in approved:
-                desc = r.get('llm_analysis', '')[:200]
-                if len(r.get('llm_analysis', '')) > 200:
-                    desc += "..."
-                all_results.append({
-                    'id': r.get('result_id'),
-                    'tool_name': r.get('tool_name', r.get('query', 'Unbekannt'))[:40],
-                    'source_url': r.get('source_url', ''),
-                    'description': desc,
-                    'is_active': True
-                })
-            for r in pending_dept:
-                desc = r.get('llm_analysis', '')[:200]
-                if len(r.get('llm_analysis', '')) > 200:
-                    desc += "..."
-                all_results.append({
-                    'id': r.get('result_id'),
-                    'tool_name': r.get('tool_name', r.get('query', 'Unbekannt'))[:40],
-                    'source_url': r.get('source_url', ''),
-                    'description': desc,
-                    'is_active': False
-                })
+            for is_active, results in ((True, approved), (False, pending_dept)):
+                for r in results:
+                    desc = r.get('description', '')[:200]
+                    if len(r.get('description', '')) > 200:
+                        desc += "..."
+                    all_results.append({
+                        'id': r.get('result_id'),
+                        'tool_name': r.get('tool_name', r.get('query', 'Unbekannt'))[:40],
+                        'source_url': r.get('source_url', ''),
+                        'description': desc,
+                        'is_active': is_active
+                    })
             
             if all_results:
                 # Centered layout using columns
@@ -1043,6 +970,21 @@ def render_research_assistant():
                 with main_col:
                     st.markdown(f"<h3 style='text-align: center; color: #222; margin-bottom: 25px;'>{dept_name} - {len(all_results)} Tools</h3>", unsafe_allow_html=True)
                     
+                    # Bulk actions - one round trip for the whole department
+                    pending_ids = [r['id'] for r in all_results if not r['is_active']]
+                    active_ids = [r['id'] for r in all_results if r['is_active']]
+                    b1, b2 = st.columns(2)
+                    with b1:
+                        if pending_ids:
+                            st.button(f"✨ Alle {len(pending_ids)} aktivieren", key=f"btn_show_all_{dept_name}",
+                                     use_container_width=True,
+                                     on_click=lambda ids=pending_ids, dept=dept_name: validated_results_manager.approve_many(ids, st.session_state.get('user_email', 'admin'), department=dept))
+                    with b2:
+                        if active_ids:
+                            st.button(f"🔽 Alle {len(active_ids)} deaktivieren", key=f"btn_hide_all_{dept_name}",
+                                     use_container_width=True,
+                                     on_click=lambda ids=active_ids, dept=dept_name: validated_results_manager.revoke_many(ids, department=dept))
+                    
                     # Styles for the rows - BLACK TEXT always
                     st.markdown("""
                     <style>
@@ -1098,12 +1040,12 @@ def render_research_assistant():
                                 st.button(f"🔽", key=f"btn_hide_{result['id']}", 
                                          use_container_width=True,
                                          type="secondary",
-                                         on_click=lambda rid=result['id']: validated_results_manager.revoke_approval(rid))
+                                         on_click=lambda rid=result['id'], dept=dept_name: validated_results_manager.revoke_approval(rid, department=dept))
                             else:
                                 st.button(f"✨", key=f"btn_show_{result['id']}", 
                                          use_container_width=True, 
                                          type="primary",
-                                         on_click=lambda rid=result['id']: validated_results_manager.approve_result(rid, st.session_state.get('user_email', 'admin')))
+                                         on_click=lambda rid=result['id'], dept=dept_name: validated_results_manager.approve_result(rid, st.session_state.get('user_email', 'admin'), department=dept))
                         
                         # Divider between rows
                         st.markdown("<div style='border-bottom: 1px solid #f0f0f0; margin: 4px 0;'></div>", unsafe_allow_html=True)
@@ -1111,12 +1053,13 @@ def render_research_assistant():
             else:
                 st.info(f"Noch keine Tools für {dept_name}.")
             
-            # Stats footer - centered
+            # Stats footer - centered (server-side counts, shared across tabs)
+            dept_counts = validated_results_manager.get_status_counts().get(dept_name, {})
             st.markdown(f"""
             <div style="max-width: 600px; margin: 30px auto; background: linear-gradient(135deg, #e8f5e9, #c8e6c9); padding: 12px 24px; border-radius: 20px; text-align: center;">
                 <span style="font-size: 13px; color: #333;">
-                    ✅ <b>{len(approved)}</b> aktiv &nbsp;•&nbsp; 
-                    ⏳ <b>{len(pending_dept)}</b> ausstehend
+                    ✅ <b>{dept_counts.get('approved', 0)}</b> aktiv &nbsp;•&nbsp; 
+                    ⏳ <b>{dept_counts.get('pending', 0)}</b> ausstehend
                 </span>
             </div>
             """, unsafe_allow_html=True)
@@ -1135,6 +1078,17 @@ def render_logout():
     logout_azure()
 
 
+# ============================================================
+# HINTERGRUND-JOBS – starten nur einmal pro Prozess
+# ============================================================
+from cache_snapshot import load_snapshot_at_startup
+from db_indexes import ensure_indexes_in_background
+from faq_warmup import start_faq_warmup
+load_snapshot_at_startup()  # before the warm-up, so answers from the snapshot are not recomputed
+ensure_indexes_in_background()
+start_faq_warmup()
+
+
 # ============================================================
 # ROUTING – es läuft IMMER nur genau eine Seite
 # ============================================================
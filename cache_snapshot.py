@@ -0,0 +1,176 @@
+"""
+Snapshot files of the answer cache and the approved tool catalog for instant cold starts.
+
+A new replica (or a restarted app) starts with empty in-process caches, so its first
+requests wait for the database. The snapshot is a single versioned msgpack file holding
+the unexpired answer_cache entries and the approved tools per department. At startup the
+app memory-maps it and seeds the L1 answer cache, the paraphrase candidates and the
+catalog snapshots (see AnswerCache.seed, DepartmentCatalog.seed), so curated answers and
+cache hits are served before the first database round trip. Seeded data is replaced by
+database reads as usual once it expires or the catalog changes.
+
+msgpack is optional: without it the app starts normally with cold caches.
+
+Usage:
+    python cache_snapshot.py export   # write the snapshot to CACHE_SNAPSHOT_PATH
+    python cache_snapshot.py import   # load the snapshot like the app does at startup and report its content
+"""
+import argparse
+import mmap
+import os
+import sys
+import threading
+from datetime import datetime
+from db_cache import cache, validated_results_manager
+from slm_service import CATALOG_FIELDS, department_catalog
+
+# Snapshot file (next to the app by default, so it can be shipped with a deployment)
+SNAPSHOT_PATH = os.getenv("CACHE_SNAPSHOT_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_snapshot.msgpack"))
+# Snapshots older than this are not loaded (their catalog may be outdated)
+SNAPSHOT_MAX_AGE_SECONDS = int(os.getenv("CACHE_SNAPSHOT_MAX_AGE_SECONDS", str(24 * 3600)))
+
+# File format identifier and version (bump SNAPSHOT_VERSION on incompatible changes)
+SNAPSHOT_FORMAT = "kmu-meet-ki-cache-snapshot"
+SNAPSHOT_VERSION = 1
+
+# Fields stored per answer (datetimes are stored as ISO 8601 strings)
+ANSWER_FIELDS = ('department', 'question_hash', 'question', 'canonical_question', 'answer', 'catalog_version', 'created_at')
+
+
+def _msgpack():
+    """Imports msgpack lazily; returns None (with a warning) if it is not installed."""
+    try:
+        import msgpack
+        return msgpack
+    except ImportError:
+        print("⚠️ msgpack not installed. Cache snapshots disabled.")
+        return None
+
+
+def export_snapshot(path: str = SNAPSHOT_PATH) -> dict:
+    """
+    Writes the unexpired answers and the approved catalog into a snapshot file.
+    The file is replaced atomically, so a running app never reads a half-written snapshot.
+
+    Args:
+        path (str): Target file.
+
+    Returns:
+        dict: {'answers': int, 'tools': int, 'bytes': int}, or None if msgpack is missing.
+    """
+    msgpack = _msgpack()
+    if msgpack is None:
+        return None
+
+    answers = []
+    for document in cache.iter_documents():
+        answer = {field: document.get(field) for field in ANSWER_FIELDS}
+        answer['created_at'] = answer['created_at'].isoformat() if answer['created_at'] else None
+        answers.append(answer)
+
+    catalog = {}
+    for tool in validated_results_manager.iter_results('approved', fields=CATALOG_FIELDS + ('department',)):
+        catalog.setdefault(tool.get('department') or 'Unknown', []).append({field: tool.get(field) for field in CATALOG_FIELDS})
+
+    payload = {
+        'format': SNAPSHOT_FORMAT,
+        'version': SNAPSHOT_VERSION,
+        'created_at': datetime.utcnow().isoformat(),
+        'answers': answers,
+        'catalog': catalog,
+    }
+    data = msgpack.packb(payload, use_bin_type=True)
+    temporary_path = path + ".tmp"
+    with open(temporary_path, 'wb') as f:
+        f.write(data)
+    os.replace(temporary_path, path)
+
+    tools = sum(len(department_tools) for department_tools in catalog.values())
+    print(f"✅ Exported {len(answers)} answer(s) and {tools} approved tool(s) to {path} ({len(data)} bytes)")
+    return {'answers': len(answers), 'tools': tools, 'bytes': len(data)}
+
+
+def read_snapshot(path: str = SNAPSHOT_PATH) -> dict:
+    """
+    Memory-maps and decodes a snapshot file.
+
+    Returns:
+        dict: The snapshot payload, or None if the file is missing, unreadable,
+        of another format version or older than SNAPSHOT_MAX_AGE_SECONDS.
+    """
+    if not os.path.exists(path):
+        return None
+    msgpack = _msgpack()
+    if msgpack is None:
+        return None
+
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            payload = msgpack.unpackb(mapped, raw=False)
+    except Exception as e:
+        print(f"⚠️ Failed to read cache snapshot {path}: {e}")
+        return None
+
+    if not isinstance(payload, dict) or payload.get('format') != SNAPSHOT_FORMAT or payload.get('version') != SNAPSHOT_VERSION:
+        print(f"⚠️ Ignoring cache snapshot {path}: unsupported format")
+        return None
+
+    age = (datetime.utcnow() - datetime.fromisoformat(payload['created_at'])).total_seconds()
+    if age > SNAPSHOT_MAX_AGE_SECONDS:
+        print(f"⚠️ Ignoring cache snapshot {path}: {age / 3600:.0f}h old")
+        return None
+    return payload
+
+
+def import_snapshot(path: str = SNAPSHOT_PATH) -> dict:
+    """
+    Seeds the in-process answer cache and catalog snapshots from a snapshot file.
+
+    Returns:
+        dict: {'answers': int, 'departments': int, 'created_at': str}, or None if no
+        usable snapshot was found.
+    """
+    payload = read_snapshot(path)
+    if payload is None:
+        return None
+
+    answers = []
+    for answer in payload['answers']:
+        created_at = answer.get('created_at')
+        answers.append({**answer, 'created_at': datetime.fromisoformat(created_at) if created_at else None})
+    seeded = cache.seed(answers)
+
+    for department, tools in payload['catalog'].items():
+        department_catalog.seed(department, tools)
+
+    print(f"✅ Loaded cache snapshot from {payload['created_at']}: {seeded} answer(s), {len(payload['catalog'])} department catalog(s)")
+    return {'answers': seeded, 'departments': len(payload['catalog']), 'created_at': payload['created_at']}
+
+
+_loaded = False
+_load_lock = threading.Lock()
+
+
+def load_snapshot_at_startup():
+    """Runs import_snapshot() once per process (safe to call on every Streamlit rerun)."""
+    global _loaded
+    with _load_lock:
+        if _loaded:
+            return
+        _loaded = True
+
+    try:
+        import_snapshot()
+    except Exception as e:
+        print(f"⚠️ Loading the cache snapshot failed: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or load the answer cache and approved catalog snapshot.")
+    parser.add_argument("command", choices=("export", "import"))
+    parser.add_argument("--path", default=SNAPSHOT_PATH, help="snapshot file")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        sys.exit(0 if export_snapshot(args.path) is not None else 1)
+    sys.exit(0 if import_snapshot(args.path) is not None else 1)
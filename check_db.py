@@ -5,20 +5,32 @@ Useful for administrators to quickly check data health.
 """
 from db_cache import validated_results_manager
 
-# Fetch lists of all pending and approved items
-pending = validated_results_manager.get_pending_results()
-approved = validated_results_manager.get_all_approved()
+# Print summary statistics (single server-side aggregation)
+counts = validated_results_manager.get_status_counts()
+print(f"Pending: {sum(c.get('pending', 0) for c in counts.values())}")
+print(f"Approved: {sum(c.get('approved', 0) for c in counts.values())}")
+print(f"Rejected: {sum(c.get('rejected', 0) for c in counts.values())} (archived: {sum(c.get('archived', 0) for c in counts.values())}, see db_compaction.py)")
+for dept, statuses in sorted(counts.items()):
+    print(f"  {dept}: {statuses}")
 
-# Print summary statistics
-print(f"Pending: {len(pending)}")
-print(f"Approved: {len(approved)}")
+# Fetch the first page of pending and approved items (lightweight records only)
+pending = validated_results_manager.list_results('pending', page_size=10)['items']
+approved = validated_results_manager.list_results('approved', page_size=10)['items']
 
 # Detailed list of Pending items (limit 10)
 print("\nPending items:")
-for r in pending[:10]:
+for r in pending:
     print(f"  - [{r.get('department')}] {r.get('query', '')[:50]}")
 
 # Detailed list of Approved items (limit 10)
 print("\nApproved items:")
-for r in approved[:10]:
+for r in approved:
     print(f"  - [{r.get('department')}] {r.get('query', '')[:50]}")
+
+# Request units and throttling per operation (charges are measured with COSMOS_RU_ACCOUNTING=1)
+from request_units import ru_meter
+print("\nRequest units:")
+for operation, counters in sorted(ru_meter.stats().items()):
+    charge = counters['avg_request_charge']
+    charge_text = f"{charge:.2f} RU/call" if charge is not None else "not measured"
+    print(f"  - {operation}: {counters['calls']} call(s), {charge_text}, {counters['retries']} retried, {counters['throttled']} throttled")
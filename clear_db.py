@@ -1,27 +1,20 @@
-# Delete old data one by one (Cosmos DB compatible)
-from pymongo import MongoClient
-import os
-from dotenv import load_dotenv
+# Delete all research results (batched range deletes, Cosmos DB compatible)
+# Usage: python clear_db.py [--dry-run]
+import sys
+from db_cache import validated_results_manager
+from research_jobs import RESEARCH_JOB_KIND, job_store
 
-load_dotenv()
+dry_run = "--dry-run" in sys.argv[1:]
+count = validated_results_manager.purge(dry_run=dry_run)
 
-connection_string = os.getenv("AZURE_COSMOS_CONNECTION_STRING")
-client = MongoClient(connection_string)
-db = client["kmu_meet_ki"]
-collection = db["validated_results"]
-
-# Find and delete each document
-count = 0
-for doc in collection.find({}):
-    collection.delete_one({"_id": doc["_id"]})
-    count += 1
+if dry_run:
+    print(f"Would delete {count} documents")
+    sys.exit(0)
 
 print(f"Deleted {count} documents")
 
-# Delete timestamp file
-timestamp_file = os.path.join(os.path.dirname(__file__), '.last_auto_search')
-if os.path.exists(timestamp_file):
-    os.remove(timestamp_file)
-    print("Deleted timestamp file")
+# Delete finished research jobs, so the scheduled auto-search of the current window runs again
+jobs = job_store.clear(RESEARCH_JOB_KIND)
+print(f"Deleted {jobs} research job(s)")
 
 print("Database cleared!")
@@ -1,51 +1,126 @@
 """
 Azure Cosmos DB (MongoDB API) cache layer for storing and retrieving question-answer pairs.
+Answers are cached in two tiers: a bounded in-process TTL/LRU cache (L1) in front of Cosmos DB (L2).
+
+Without Cosmos DB (or with STORAGE_BACKEND=sqlite) the global managers are the embedded
+SQLite implementations from sqlite_backend, which share this module's interface.
 """
-import os
 import hashlib
-from datetime import datetime
-from pymongo import MongoClient, ASCENDING
-from dotenv import load_dotenv
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from db_purge import PURGE_BATCH_SIZE, purge_collection
+from memory_cache import TTLLRUCache
+from request_units import run_bulk_metered, run_metered
+from write_behind import write_queue
+from text_normalization import canonical_similarity, canonicalize_question, normalize_tool_name
+from db_connection import (
+    ANSWER_CACHE_COLLECTION,
+    ARCHIVE_COLLECTION,
+    VALIDATED_RESULTS_COLLECTION,
+    db_breaker,
+    get_collection,
+    get_storage_backend,
+    is_configured,
+)
+
+# Seconds for which aggregated status counts are reused (see ValidatedResultsManager.get_status_counts)
+STATS_CACHE_TTL = 30
+
+# Documents/operations per bulk request. Keeps each request well below Cosmos DB's
+# request size limit and the RU budget a single call may consume.
+BULK_CHUNK_SIZE = 100
+
+# Counts results per department and status (see ValidatedResultsManager.get_status_counts)
+STATUS_COUNTS_PIPELINE = [
+    {'$group': {
+        '_id': {'department': '$department', 'status': '$status'},
+        'count': {'$sum': 1}
+    }}
+]
 
-load_dotenv()
+# Listing APIs: default page size and the lightweight fields returned per result
+LIST_PAGE_SIZE = 50
+LISTING_FIELDS = ('result_id', 'tool_name', 'query', 'source_url', 'department', 'status', 'created_at')
+
+# Compaction (see ValidatedResultsManager.compact): pending results not seen again for
+# STALE_PENDING_DAYS are archived like rejected ones. The slim tombstone left in their place
+# is dropped once the tool has not been rediscovered for TOMBSTONE_MAX_AGE_DAYS, and archived
+# documents expire after ARCHIVE_RETENTION_SECONDS.
+STALE_PENDING_DAYS = int(os.getenv("STALE_PENDING_DAYS", "30"))
+TOMBSTONE_MAX_AGE_DAYS = int(os.getenv("TOMBSTONE_MAX_AGE_DAYS", "365"))
+ARCHIVE_RETENTION_SECONDS = int(os.getenv("ARCHIVE_RETENTION_SECONDS", str(365 * 24 * 3600)))
+# Fields a tombstone keeps (enough to recognize the tool and to expire the tombstone)
+TOMBSTONE_FIELDS = ('result_id', 'tool_name', 'department', 'created_at', 'last_seen', 'seen_count')
+
+# In-process (L1) answer cache settings
+L1_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_L1_MAX_ENTRIES", "512"))
+L1_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_L1_TTL_SECONDS", "600"))
+
+# Paraphrase fallback: minimum similarity of two canonical questions to reuse an answer
+SIMILARITY_THRESHOLD = float(os.getenv("ANSWER_CACHE_SIMILARITY_THRESHOLD", "0.9"))
+# Seconds for which the per-department list of cached questions is reused
+CANDIDATE_INDEX_TTL = 300
+CANDIDATE_PROJECTION = {"_id": 0, "question_hash": 1, "question": 1, "canonical_question": 1}
+
+# Answer lifetime: after ANSWER_STALE_AFTER the answer is still served but refreshed in the
+# background, after ANSWER_MAX_AGE it is treated as a miss (and removed by the TTL index).
+ANSWER_STALE_AFTER_SECONDS = int(os.getenv("ANSWER_CACHE_STALE_AFTER_SECONDS", str(24 * 3600)))
+ANSWER_MAX_AGE_SECONDS = int(os.getenv("ANSWER_CACHE_MAX_AGE_SECONDS", str(7 * 24 * 3600)))
 
 class AnswerCache:
     """
     Manages caching of question-answer pairs in Azure Cosmos DB (MongoDB API).
     This cache prevents repetitive SLM calls for identical questions by storing previous answers.
+    
+    Lookups first hit a process-local TTL/LRU cache (L1) and only go to Cosmos DB (L2) on an L1 miss.
+    Writes go through both tiers.
+    
+    Every entry records the catalog version (approved tool set) it was built from. A lookup with
+    a different version, or an entry older than ANSWER_STALE_AFTER_SECONDS, is returned with
+    'stale': True so the caller can serve it immediately and refresh it in the background.
+    
+    The helpers without I/O (entry_from_document, fresh_candidates, remember_candidates,
+    best_candidate, to_result) are public: db_cache_async builds on them.
     """
     
+    BACKEND = "cosmos"
+    
     def __init__(self):
         """
-        Initialize the MongoDB client.
-        Establishes connection to Azure Cosmos DB and sets up the collection.
+        Initialize the cache.
+        The connection itself is established lazily by db_connection on first use,
+        so constructing the cache never blocks on the network.
         """
-        connection_string = os.getenv("AZURE_COSMOS_CONNECTION_STRING")
+        self.l1 = TTLLRUCache(maxsize=L1_MAX_ENTRIES, ttl=L1_TTL_SECONDS)
+        self.l2_hits = 0
+        self.l2_misses = 0
         
-        if not connection_string:
-            print("⚠️ Azure Cosmos DB connection string not found. Caching disabled.")
-            self.client = None
-            self.collection = None
-            return
+        # Canonical questions per department for the similarity fallback: department -> (loaded_at, {hash: canonical})
+        self._candidates = {}
+        self._candidates_lock = threading.Lock()
         
-        try:
-            self.client = MongoClient(connection_string)
-            db = self.client["kmu_meet_ki"]
-            self.collection = db["answer_cache"]
-            
-            # Test connection with a ping
-            self.client.admin.command('ping')
-            
-            print("✅ Azure Cosmos DB (MongoDB) connected successfully")
-        except Exception as e:
-            print(f"❌ Failed to connect to Cosmos DB: {e}")
-            self.client = None
-            self.collection = None
+        if self.BACKEND == "cosmos" and not is_configured():
+            print("⚠️ Azure Cosmos DB connection string not found. Caching disabled.")
+    
+    @property
+    def collection(self):
+        """
+        The answer_cache collection on the shared client.
+        None if caching is disabled or the circuit breaker is open (lookups then count as misses).
+        """
+        return get_collection(ANSWER_CACHE_COLLECTION)
     
     def _hash_question(self, question: str, department: str) -> str:
         """
         Generates a deterministic SHA-256 hash for a question/department pair.
         This hash acts as the unique index key for looking up cached results.
+        The question is canonicalized first (see text_normalization), so punctuation,
+        umlaut spelling, filler words and word order do not change the key.
         
         Args:
             question (str): The user's question.
@@ -54,89 +129,367 @@ class AnswerCache:
         Returns:
             str: Hexadecimal hash string.
         """
-        combined = f"{department}:{question.lower().strip()}"
+        combined = f"{department}:{canonicalize_question(question)}"
         return hashlib.sha256(combined.encode()).hexdigest()
     
-    def get_cached_answer(self, question: str, department: str) -> dict:
+    def question_key(self, question: str, department: str) -> str:
+        """Public cache key of a question (used to coalesce concurrent computations)."""
+        return self._hash_question(question, department)
+    
+    def _lookup(self, question_hash: str, department: str, question: str) -> dict:
         """
-        Attempts to retrieve a cached answer for a given question.
+        Looks up a cache entry by hash, first in L1, then in L2.
         
-        Args:
-            question (str): The user's question.
-            department (str): The department context.
-            
         Returns:
-            dict: The cached document including 'answer', or None if not found.
+            dict: The L1 entry ('department', 'answer', 'created_at', 'catalog_version'), or None.
         """
-        if self.collection is None:
+        # 1. L1: process-local memory (no network, no request units)
+        entry = self.l1.get(question_hash)
+        if entry is not None:
+            return entry
+        
+        # Written moments ago but not flushed yet
+        queued = write_queue.pending(ANSWER_CACHE_COLLECTION, question_hash)
+        if queued is not None:
+            entry = self.entry_from_document(department, queued)
+            self.l1.set(question_hash, entry)
+            return entry
+        
+        # 2. L2: Cosmos DB
+        collection = self.collection
+        if collection is None:
             return None
         
         try:
-            question_hash = self._hash_question(question, department)
-            
             # Query for the cached item
-            item = self.collection.find_one({
+            item = run_metered(collection, 'find_one', lambda: collection.find_one({
                 "question_hash": question_hash,
                 "department": department
-            })
+            }))
             
             if item:
+                self.l2_hits += 1
                 print(f"✅ Cache HIT for: {question[:50]}...")
-                return {
-                    'answer': item.get('answer'),
-                    'cached': True,
-                    'created_at': item.get('created_at')
-                }
+                entry = self.entry_from_document(department, item)
+                self.l1.set(question_hash, entry)
+                return entry
             else:
+                self.l2_misses += 1
                 print(f"❌ Cache MISS for: {question[:50]}...")
                 return None
         except Exception as e:
+            db_breaker.record_failure(e)
             print(f"⚠️ Cache lookup error: {e}")
             return None
     
-    def store_answer(self, question: str, department: str, answer: str) -> bool:
+    @staticmethod
+    def entry_from_document(department: str, document: dict) -> dict:
+        """Reduces a stored (or queued) answer document to an L1 entry."""
+        return {
+            'department': department,
+            'answer': document.get('answer'),
+            'created_at': document.get('created_at'),
+            'catalog_version': document.get('catalog_version')
+        }
+    
+    def _department_candidates(self, department: str) -> dict:
         """
-        Stores a new question-answer pair in the cache.
-        Uses 'upsert' logic to update if the entry already exists.
+        Returns the canonical forms of all cached questions of a department
+        (loaded with a projection and kept in memory for CANDIDATE_INDEX_TTL seconds).
+        
+        Returns:
+            dict: question_hash -> canonical question.
+        """
+        fresh = self.fresh_candidates(department)
+        if fresh is not None:
+            return fresh
+        
+        candidates = None
+        collection = self.collection
+        if collection is not None:
+            try:
+                items = run_metered(collection, 'find_candidates', lambda: list(collection.find({"department": department}, CANDIDATE_PROJECTION)))
+                candidates = {}
+                for item in items:
+                    canonical = item.get('canonical_question') or canonicalize_question(item.get('question', ''))
+                    candidates[item['question_hash']] = canonical
+            except Exception as e:
+                db_breaker.record_failure(e)
+                print(f"⚠️ Failed to load cached questions: {e}")
+                candidates = None
+        return self.remember_candidates(department, candidates)
+    
+    def fresh_candidates(self, department: str) -> dict:
+        """The in-memory candidates of a department if younger than CANDIDATE_INDEX_TTL, else None."""
+        with self._candidates_lock:
+            cached = self._candidates.get(department)
+            if cached is not None and time.monotonic() - cached[0] < CANDIDATE_INDEX_TTL:
+                return cached[1]
+            return None
+    
+    def remember_candidates(self, department: str, candidates: dict) -> dict:
+        """Stores freshly loaded candidates (None = load failed, keep the old ones) and returns them."""
+        with self._candidates_lock:
+            if candidates is None:
+                # Database unavailable: keep what we know locally
+                cached = self._candidates.get(department)
+                candidates = dict(cached[1]) if cached is not None else {}
+            self._candidates[department] = (time.monotonic(), candidates)
+            return candidates
+    
+    def iter_documents(self, batch_size: int = BULK_CHUNK_SIZE):
+        """
+        Yields all unexpired answer documents (without '_id'), read in batches in '_id' order.
+        Used to export cache snapshots; yields nothing if the database is unavailable.
+        """
+        collection = self.collection
+        if collection is None:
+            return
+
+        query = {'created_at': {'$gte': datetime.utcnow() - timedelta(seconds=ANSWER_MAX_AGE_SECONDS)}}
+        last_id = None
+        while True:
+            page_query = {**query, '_id': {'$gt': last_id}} if last_id is not None else query
+            batch = run_metered(collection, 'export', lambda: list(collection.find(page_query).sort('_id', 1).limit(batch_size)))
+            if not batch:
+                return
+            last_id = batch[-1]['_id']
+            for document in batch:
+                document.pop('_id', None)
+                yield document
+
+    def seed(self, documents) -> int:
+        """
+        Fills L1 and the similarity candidates from answer documents (e.g. a cache snapshot),
+        so a freshly started process serves cached answers without a database round trip.
+        Meant for startup: seeded entries replace what L1 holds for the same question.
+
+        Args:
+            documents: Answer documents as stored by store_answer ('created_at' as datetime).
+
+        Returns:
+            int: Number of seeded answers (expired ones are skipped).
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=ANSWER_MAX_AGE_SECONDS)
+        candidates = {}
+        seeded = 0
+        for document in documents:
+            created_at = document.get('created_at')
+            if created_at is None or created_at < cutoff:
+                continue
+            department = document.get('department')
+            question_hash = document['question_hash']
+            self.l1.set(question_hash, self.entry_from_document(department, document))
+            canonical = document.get('canonical_question') or canonicalize_question(document.get('question') or '')
+            candidates.setdefault(department, {})[question_hash] = canonical
+            seeded += 1
+
+        # Candidates already loaded from the database are more recent than a snapshot
+        with self._candidates_lock:
+            for department, department_candidates in candidates.items():
+                self._candidates.setdefault(department, (time.monotonic(), department_candidates))
+        return seeded
+
+    def _find_similar(self, question: str, department: str):
+        """
+        Finds the most similar cached question of the same department.
+        
+        Returns:
+            tuple: (question_hash, similarity) of the best match above SIMILARITY_THRESHOLD, or None.
+        """
+        return self.best_candidate(question, self._department_candidates(department))
+    
+    @staticmethod
+    def best_candidate(question: str, candidates: dict):
+        """Picks the most similar candidate (question_hash -> canonical) above SIMILARITY_THRESHOLD, or None."""
+        canonical = canonicalize_question(question)
+        best_hash, best_score = None, 0.0
+        for question_hash, candidate in candidates.items():
+            score = canonical_similarity(canonical, candidate)
+            if score > best_score:
+                best_hash, best_score = question_hash, score
+        
+        if best_hash is not None and best_score >= SIMILARITY_THRESHOLD:
+            return best_hash, best_score
+        return None
+    
+    def to_result(self, entry: dict, catalog_version: str) -> dict:
+        """
+        Converts a cache entry into the public result, applying age and version checks.
+        
+        Returns:
+            dict: The result with a 'stale' flag, or None if the entry has expired.
+        """
+        created_at = entry.get('created_at')
+        age = (datetime.utcnow() - created_at).total_seconds() if created_at else 0
+        if age > ANSWER_MAX_AGE_SECONDS:
+            return None
+        
+        version_changed = catalog_version is not None and entry.get('catalog_version') != catalog_version
+        return {
+            'answer': entry['answer'],
+            'cached': True,
+            'created_at': created_at,
+            'catalog_version': entry.get('catalog_version'),
+            'stale': version_changed or age > ANSWER_STALE_AFTER_SECONDS
+        }
+    
+    def get_cached_answer(self, question: str, department: str, catalog_version: str = None) -> dict:
+        """
+        Attempts to retrieve a cached answer for a given question.
+        On an exact miss, falls back to the most similar cached question of the same
+        department if its similarity reaches SIMILARITY_THRESHOLD.
+        
+        Args:
+            question (str): The user's question.
+            department (str): The department context.
+            catalog_version (str, optional): Current catalog version of the department. Entries
+                built from another version are returned with 'stale': True.
+            
+        Returns:
+            dict: The cached document including 'answer' and 'stale' (and 'similarity' for
+            fuzzy hits), or None if not found or expired.
+        """
+        question_hash = self._hash_question(question, department)
+        
+        entry = self._lookup(question_hash, department, question)
+        if entry is not None:
+            return self.to_result(entry, catalog_version)
+        
+        # Exact miss: try a paraphrase of an already answered question
+        match = self._find_similar(question, department)
+        if match is None:
+            return None
+        
+        similar_hash, similarity = match
+        entry = self._lookup(similar_hash, department, question)
+        if entry is None:
+            return None
+        
+        print(f"≈ Similar cache HIT ({similarity:.2f}) for: {question[:50]}...")
+        # Remember the paraphrase locally so the next identical request is an exact L1 hit
+        self.l1.set(question_hash, entry)
+        result = self.to_result(entry, catalog_version)
+        if result is not None:
+            result['similarity'] = similarity
+        return result
+    
+    def _prepare_store(self, question: str, department: str, answer: str, catalog_version: str = None):
+        """
+        Local part of store_answer: updates the similarity candidates and L1.
+        
+        Returns:
+            tuple: (question_hash, L2 document to upsert)
+        """
+        question_hash = self._hash_question(question, department)
+        canonical = canonicalize_question(question)
+        created_at = datetime.utcnow()
+        
+        # Make the new question available to the similarity fallback
+        with self._candidates_lock:
+            cached = self._candidates.get(department)
+            if cached is not None:
+                cached[1][question_hash] = canonical
+        
+        # L1 is always updated, so the answer is served locally even while Cosmos is unreachable
+        self.l1.set(question_hash, {
+            'department': department,
+            'answer': answer,
+            'created_at': created_at,
+            'catalog_version': catalog_version
+        })
+        
+        return question_hash, {
+            'question_hash': question_hash,
+            'department': department,
+            'question': question,
+            'canonical_question': canonical,
+            'answer': answer,
+            'catalog_version': catalog_version,
+            'created_at': created_at,
+            'validated': True
+        }
+    
+    def store_answer(self, question: str, department: str, answer: str, catalog_version: str = None) -> bool:
+        """
+        Stores a new question-answer pair in the cache (write-through to L1 and L2).
+        Uses 'upsert' logic to update if the entry already exists (this replaces
+        the answer of a previous catalog version). The L2 write goes through the
+        write-behind queue, so the caller does not wait for Cosmos.
         
         Args:
             question (str): The user's question.
             department (str): The department context.
             answer (str): The answer generated by the SLM.
+            catalog_version (str, optional): Catalog version the answer was built from.
             
         Returns:
-            bool: True if successful, False otherwise.
+            bool: True if the answer was queued for Cosmos DB, False if caching is disabled.
         """
-        if self.collection is None:
+        question_hash, document = self._prepare_store(question, department, answer, catalog_version)
+        if not is_configured():
             return False
         
-        try:
-            question_hash = self._hash_question(question, department)
-            
-            document = {
-                'question_hash': question_hash,
-                'department': department,
-                'question': question,
-                'answer': answer,
-                'created_at': datetime.utcnow(),
-                'validated': True
-            }
-            
-            # Upsert: update if exists, insert if new
-            self.collection.update_one(
+        # Upsert: update if exists, insert if new (written by the background flusher)
+        write_queue.enqueue(
+            ANSWER_CACHE_COLLECTION,
+            question_hash,
+            UpdateOne(
                 {"question_hash": question_hash, "department": department},
                 {"$set": document},
                 upsert=True
-            )
-            
-            print(f"✅ Cached answer for: {question[:50]}...")
-            return True
+            ),
+            document
+        )
+        
+        print(f"✅ Cached answer for: {question[:50]}...")
+        return True
+    
+    def invalidate(self, question: str, department: str):
+        """
+        Removes a cached answer from both tiers.
+        
+        Args:
+            question (str): The user's question.
+            department (str): The department context.
+        """
+        question_hash = self._hash_question(question, department)
+        self.l1.invalidate(question_hash)
+        
+        collection = self.collection
+        if collection is None:
+            return
+        
+        try:
+            run_metered(collection, 'delete_one', lambda: collection.delete_one({"question_hash": question_hash, "department": department}))
         except Exception as e:
-            print(f"⚠️ Failed to cache answer: {e}")
-            return False
+            db_breaker.record_failure(e)
+            print(f"⚠️ Failed to invalidate cached answer: {e}")
+    
+    def invalidate_department(self, department: str) -> int:
+        """
+        Drops all in-process (L1) entries of a department.
+        
+        Args:
+            department (str): The department context.
+            
+        Returns:
+            int: Number of removed L1 entries.
+        """
+        return self.l1.invalidate_where(lambda entry: entry['department'] == department)
+    
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters per tier.
+        
+        Returns:
+            dict: {'l1': {...size, hits, misses, evictions}, 'l2': {'hits': int, 'misses': int}}
+        """
+        return {
+            'l1': self.l1.stats(),
+            'l2': {'hits': self.l2_hits, 'misses': self.l2_misses}
+        }
 
-# Global cache instance
-cache = AnswerCache()
 
 
 class ValidatedResultsManager:
@@ -145,31 +498,134 @@ class ValidatedResultsManager:
     1. Pending: Found by scraper/LLM, waiting for admin review.
     2. Approved: Reviewed by admin, ready for end-users.
     3. Rejected: Discarded results.
+    4. Archived: Tombstone of a rejected or stale pending result moved to the archive by compact().
+       Rediscoveries only update last_seen/seen_count, so archived tools do not come back as pending.
+    
+    The query builders, bump_catalog_version and the stats cache accessors are public:
+    db_cache_async builds on them.
     """
     
+    BACKEND = "cosmos"
+    
     def __init__(self):
-        """Initialize MongoDB client for the validated_results collection."""
-        connection_string = os.getenv("AZURE_COSMOS_CONNECTION_STRING")
+        """Initialize the manager (the shared client connects lazily on first use)."""
+        # Per-department catalog versions. Bumped whenever the approved set of a
+        # department changes so that in-process snapshots know when to reload.
+        self._catalog_versions = {}
+        self._catalog_listeners = []
+        self._version_lock = threading.Lock()
         
-        if not connection_string:
+        # Short-lived cache of the aggregated status counts: (loaded_at, counts)
+        self._stats_cache = None
+        
+        if self.BACKEND == "cosmos" and not is_configured():
             print("⚠️ Azure Cosmos DB connection string not found. Validated results disabled.")
-            self.client = None
-            self.collection = None
-            return
+    
+    @property
+    def collection(self):
+        """
+        The validated_results collection on the shared client.
+        None if disabled or while the circuit breaker is open.
+        """
+        return get_collection(VALIDATED_RESULTS_COLLECTION)
+    
+    def catalog_version(self, department: str) -> int:
+        """
+        Returns the current catalog version of a department.
+        The version changes every time a result of this department is approved or revoked.
         
-        try:
-            self.client = MongoClient(connection_string)
-            db = self.client["kmu_meet_ki"]
-            self.collection = db["validated_results"]
-            print("✅ ValidatedResultsManager connected to Cosmos DB")
-        except Exception as e:
-            print(f"❌ Failed to connect ValidatedResultsManager: {e}")
-            self.client = None
-            self.collection = None
+        Args:
+            department (str): The department context.
+            
+        Returns:
+            int: Monotonic version counter (0 if the catalog never changed in this process).
+        """
+        with self._version_lock:
+            return self._catalog_versions.get(department, 0)
+    
+    def add_catalog_listener(self, callback):
+        """
+        Registers a callback that is invoked with the department name whenever
+        the approved set of that department changes.
+        
+        Args:
+            callback (callable): Function taking a single 'department' argument.
+        """
+        with self._version_lock:
+            self._catalog_listeners.append(callback)
+    
+    def bump_catalog_version(self, department: str):
+        """Signals that the approved set of a department has changed."""
+        self._stats_cache = None
+        with self._version_lock:
+            self._catalog_versions[department] = self._catalog_versions.get(department, 0) + 1
+            listeners = list(self._catalog_listeners)
+        
+        # Notify outside the lock so listeners may read the new version
+        for callback in listeners:
+            try:
+                callback(department)
+            except Exception as e:
+                print(f"⚠️ Catalog listener failed: {e}")
+    
+    @staticmethod
+    def tool_result_id(department: str, tool_name: str = None, source_url: str = None, query: str = None) -> str:
+        """
+        Deterministic identity of a discovered tool.
+        The same tool found again (by another query or a later search run) gets the same result_id,
+        so rediscoveries update the existing document instead of creating duplicates.
+        
+        Args:
+            department (str): The department context.
+            tool_name (str, optional): The extracted tool name (preferred identity).
+            source_url (str, optional): URL source (its domain is used if there is no usable name).
+            query (str, optional): Last-resort identity if neither name nor URL is known.
+            
+        Returns:
+            str: 16 hex characters.
+        """
+        identity = normalize_tool_name(tool_name)
+        if not identity and source_url:
+            identity = 'domain:' + urlparse(source_url).netloc.lower().removeprefix('www.')
+        if not identity:
+            identity = 'query:' + canonicalize_question(query or '', sort_tokens=True)
+        return hashlib.sha256(f"{department}:{identity}".encode()).hexdigest()[:16]
+    
+    def build_pending_upsert(self, query: str, department: str, llm_analysis: str, apertus_validation: str, tool_name: str = None, source_url: str = None):
+        """
+        Builds the upsert for a discovered tool (see add_pending_result for the arguments).
+        A new tool is inserted as 'pending'; a known one only gets last_seen/seen_count updated,
+        so approved or rejected tools keep their status.
+        
+        Returns:
+            tuple: (UpdateOne operation, document as it looks after inserting a new tool)
+        """
+        result_id = self.tool_result_id(department, tool_name, source_url, query)
+        now = datetime.utcnow()
+        initial = {
+            'result_id': result_id,
+            'query': query,
+            'tool_name': tool_name or query[:50],  # Use tool_name if provided, else query
+            'source_url': source_url or '',
+            'department': department,
+            'llm_analysis': llm_analysis,
+            'apertus_validation': apertus_validation,
+            'status': 'pending',
+            'approved_by': None,
+            'created_at': now,
+            'approved_at': None
+        }
+        # department is the partition key: upserts on a sharded collection must carry it
+        operation = UpdateOne(
+            {'result_id': result_id, 'department': department},
+            {'$setOnInsert': initial, '$set': {'last_seen': now}, '$inc': {'seen_count': 1}},
+            upsert=True
+        )
+        return operation, {**initial, 'last_seen': now, 'seen_count': 1}
     
     def add_pending_result(self, query: str, department: str, llm_analysis: str, apertus_validation: str, tool_name: str = None, source_url: str = None) -> str:
         """
-        Add a new research result with 'pending' status.
+        Add a research result with 'pending' status, or record a rediscovery of a known tool.
         
         Args:
             query (str): The search query used.
@@ -180,140 +636,759 @@ class ValidatedResultsManager:
             source_url (str, optional): URL source.
             
         Returns:
-            str: The unique result_id generated.
+            str: The deterministic result_id of the tool.
         """
-        if self.collection is None:
+        if not is_configured():
             return None
         
-        try:
-            # Generate a consistent ID
-            result_id = hashlib.sha256(f"{query}:{department}:{datetime.utcnow().isoformat()}".encode()).hexdigest()[:16]
-            
-            document = {
-                'result_id': result_id,
-                'query': query,
-                'tool_name': tool_name or query[:50],  # Use tool_name if provided, else query
-                'source_url': source_url or '',
-                'department': department,
-                'llm_analysis': llm_analysis,
-                'apertus_validation': apertus_validation,
-                'status': 'pending',
-                'approved_by': None,
-                'created_at': datetime.utcnow(),
-                'approved_at': None
-            }
+        operation, document = self.build_pending_upsert(query, department, llm_analysis, apertus_validation, tool_name, source_url)
+        result_id = document['result_id']
+        
+        # Upserted by the background flusher; get_pending_results already sees new tools
+        write_queue.enqueue(VALIDATED_RESULTS_COLLECTION, result_id, operation, document)
+        self._stats_cache = None
+        print(f"✅ Added pending result: {result_id} - {tool_name}")
+        return result_id
+    
+    def add_pending_results_bulk(self, items: list) -> list:
+        """
+        Adds many research results using chunked, unordered bulk upserts.
+        Tools that already exist are only marked as seen again (their status is kept).
+        
+        Args:
+            items (list): Dicts with the arguments of add_pending_result
+                ('query', 'department', 'llm_analysis', 'apertus_validation', 'tool_name', 'source_url').
             
-            self.collection.insert_one(document)
-            print(f"✅ Added pending result: {result_id} - {tool_name}")
-            return result_id
-        except Exception as e:
-            print(f"⚠️ Failed to add pending result: {e}")
-            return None
+        Returns:
+            list: The result_ids of all written tools (without duplicates).
+        """
+        collection = self.collection
+        if collection is None:
+            return []
+        
+        # Duplicates within one call would race for the same upsert, so keep the first occurrence
+        operations = self.unique_upserts([self.build_pending_upsert(**item) for item in items])
+        
+        result_ids = list(operations)
+        written_ids = []
+        for start in range(0, len(result_ids), BULK_CHUNK_SIZE):
+            chunk = result_ids[start:start + BULK_CHUNK_SIZE]
+            try:
+                run_bulk_metered(collection, 'upsert_pending', [operations[result_id] for result_id in chunk])
+                written_ids.extend(chunk)
+            except BulkWriteError as e:
+                failed = {error['index'] for error in e.details.get('writeErrors', [])}
+                written_ids.extend(result_id for i, result_id in enumerate(chunk) if i not in failed)
+                print(f"⚠️ {len(failed)} pending result(s) could not be written")
+            except Exception as e:
+                db_breaker.record_failure(e)
+                print(f"⚠️ Failed to add pending results: {e}")
+                break
+        
+        self._stats_cache = None
+        print(f"✅ Added or refreshed {len(written_ids)} pending result(s)")
+        return written_ids
     
-    def get_pending_results(self) -> list:
-        """Get all results with 'pending' status (for Admin Dashboard)."""
-        if self.collection is None:
+    def _new_queued_results(self, collection, queued: list, known: set) -> list:
+        """
+        Filters queued pending documents down to tools that do not exist in the database yet.
+        Queued rediscoveries of already stored (e.g. approved or rejected) tools are not pending.
+        """
+        unknown = [doc['result_id'] for doc in queued if doc['result_id'] not in known]
+        if not unknown:
             return []
+        found = run_metered(collection, 'find_existing', lambda: list(collection.find({'result_id': {'$in': unknown}}, {'result_id': 1})))
+        existing = {r['result_id'] for r in found}
+        return [doc for doc in queued if doc['result_id'] not in known and doc['result_id'] not in existing]
+    
+    @staticmethod
+    def unique_upserts(operations: list) -> dict:
+        """Keeps the first upsert per result_id of (operation, document) pairs (see add_pending_results_bulk)."""
+        unique = {}
+        for operation, document in operations:
+            unique.setdefault(document['result_id'], operation)
+        return unique
+    
+    def get_pending_results(self) -> list:
+        """Get all results with 'pending' status (for Admin Dashboard), including not yet flushed ones."""
+        queued = [doc for doc in write_queue.pending_documents(VALIDATED_RESULTS_COLLECTION) if doc.get('status') == 'pending']
+        
+        collection = self.collection
+        if collection is None:
+            return queued
         
         try:
-            results = list(self.collection.find({'status': 'pending'}))
+            results = run_metered(collection, 'find_pending', lambda: list(collection.find({'status': 'pending'})))
+            known = {r.get('result_id') for r in results}
+            results.extend(self._new_queued_results(collection, queued, known))
             return results
         except Exception as e:
+            db_breaker.record_failure(e)
             print(f"⚠️ Failed to get pending results: {e}")
-            return []
+            return queued
     
-    def get_approved_by_department(self, department: str) -> list:
-        """Get all approved results for a specific department (for SLM Service)."""
-        if self.collection is None:
-            return []
+    def get_approved_by_department(self, department: str, none_if_unavailable: bool = False) -> list:
+        """
+        Get all approved results for a specific department (for SLM Service).
+        
+        Args:
+            department (str): The department context.
+            none_if_unavailable (bool): Return None instead of [] if the database cannot be
+                reached, so callers can tell "unavailable" apart from "no approved results".
+        """
+        collection = self.collection
+        if collection is None:
+            return None if none_if_unavailable else []
         
         try:
-            results = list(self.collection.find({
+            results = run_metered(collection, 'find_approved', lambda: list(collection.find({
                 'status': 'approved',
                 'department': department
-            }))
+            })))
             return results
         except Exception as e:
+            db_breaker.record_failure(e)
             print(f"⚠️ Failed to get approved results: {e}")
-            return []
+            return None if none_if_unavailable else []
     
     def get_all_approved(self) -> list:
         """Get all approved results across all departments."""
-        if self.collection is None:
+        collection = self.collection
+        if collection is None:
             return []
         
         try:
-            results = list(self.collection.find({'status': 'approved'}))
+            results = run_metered(collection, 'find_all_approved', lambda: list(collection.find({'status': 'approved'})))
             return results
         except Exception as e:
+            db_breaker.record_failure(e)
             print(f"⚠️ Failed to get all approved results: {e}")
             return []
     
-    def approve_result(self, result_id: str, approved_by: str) -> bool:
+    def list_results(self, status: str, department: str = None, fields: tuple = LISTING_FIELDS,
+                     page_size: int = LIST_PAGE_SIZE, after=None, description_chars: int = None,
+                     none_if_unavailable: bool = False) -> dict:
+        """
+        Lists one page of results with a given status, returning only the requested fields.
+        Pages are read in '_id' order and resumed from a cursor (keyset pagination), so every
+        page costs the same no matter how far the caller has paged.
+        
+        Args:
+            status (str): 'pending', 'approved' or 'rejected'.
+            department (str, optional): Restrict to one department.
+            fields (tuple): Document fields to return.
+            page_size (int): Maximum number of results per page.
+            after: 'next_cursor' of the previous page (None for the first page).
+            description_chars (int, optional): Also return the first description_chars + 1
+                characters of 'llm_analysis' as 'description' (the extra character tells the
+                caller whether the text was cut off).
+            none_if_unavailable (bool): Return None instead of an empty page if the database
+                cannot be reached.
+            
+        Returns:
+            dict: {'items': list, 'next_cursor': cursor for the next page or None on the last page}
+        """
+        queued = self.queued_pending(department) if status == 'pending' else []
+        
+        collection = self.collection
+        if collection is None:
+            return None if none_if_unavailable else {'items': [], 'next_cursor': None}
+        
+        try:
+            if description_chars is None:
+                match = self.listing_match(status, department, after)
+                items = run_metered(collection, 'list', lambda: list(
+                    collection.find(match, {field: 1 for field in fields}).sort('_id', 1).limit(page_size)
+                ))
+            else:
+                # Truncate on the server, so long analyses never leave the database
+                pipeline = self.listing_pipeline(status, department, after, fields, page_size, description_chars)
+                items = run_metered(collection, 'list_preview', lambda: list(collection.aggregate(pipeline)))
+            
+            if len(items) < page_size:
+                # Last page: add tools that are still waiting in the write-behind queue
+                new_docs = self._new_queued_results(collection, queued, {r.get('result_id') for r in items}) if queued else []
+                items.extend(self.listing_items(new_docs, fields, description_chars))
+                return {'items': items, 'next_cursor': None}
+            return {'items': items, 'next_cursor': items[-1]['_id']}
+        except Exception as e:
+            db_breaker.record_failure(e)
+            print(f"⚠️ Failed to list {status} results: {e}")
+            return None if none_if_unavailable else {'items': [], 'next_cursor': None}
+    
+    @staticmethod
+    def queued_pending(department: str = None) -> list:
+        """Pending documents (of a department) that are still in the write-behind queue."""
+        return [doc for doc in write_queue.pending_documents(VALIDATED_RESULTS_COLLECTION)
+                if doc.get('status') == 'pending' and department in (None, doc.get('department'))]
+    
+    @staticmethod
+    def listing_match(status: str, department: str, after) -> dict:
+        """Filter of one listing page (keyset on '_id')."""
+        match = {'status': status}
+        if department is not None:
+            match['department'] = department
+        if after is not None:
+            match['_id'] = {'$gt': after}
+        return match
+    
+    @classmethod
+    def listing_pipeline(cls, status: str, department: str, after, fields: tuple, page_size: int, description_chars: int) -> list:
+        """Aggregation of one listing page that also returns a truncated 'description'."""
+        projection = {field: 1 for field in fields}
+        projection['description'] = {'$substrCP': [{'$ifNull': ['$llm_analysis', '']}, 0, description_chars + 1]}
+        return [
+            {'$match': cls.listing_match(status, department, after)},
+            {'$sort': {'_id': 1}},
+            {'$limit': page_size},
+            {'$project': projection},
+        ]
+    
+    @staticmethod
+    def listing_items(documents: list, fields: tuple, description_chars: int = None) -> list:
+        """Reduces full (queued) documents to listing records."""
+        items = []
+        for doc in documents:
+            item = {field: doc.get(field) for field in fields}
+            if description_chars is not None:
+                item['description'] = (doc.get('llm_analysis') or '')[:description_chars + 1]
+            items.append(item)
+        return items
+    
+    def iter_results(self, status: str, department: str = None, fields: tuple = LISTING_FIELDS,
+                     page_size: int = LIST_PAGE_SIZE, description_chars: int = None):
+        """
+        Iterates over all results with a given status, page by page (see list_results).
+        Only one page is held in memory at a time.
+        """
+        after = None
+        while True:
+            page = self.list_results(status, department, fields, page_size, after, description_chars)
+            yield from page['items']
+            after = page['next_cursor']
+            if after is None:
+                return
+    
+    def get_status_counts(self) -> dict:
+        """
+        Counts results per department and status with a single server-side aggregation.
+        The result is cached for STATS_CACHE_TTL seconds and dropped on every local write.
+        
+        Returns:
+            dict: Nested counts, e.g. {'Marketing': {'approved': 12, 'pending': 3}}.
+        """
+        cached = self.cached_status_counts()
+        if cached is not None:
+            return cached
+        
+        collection = self.collection
+        if collection is None:
+            # Database unavailable: last known counts are better than none
+            return self.cached_status_counts(max_age=None) or {}
+        
+        try:
+            rows = run_metered(collection, 'status_counts', lambda: list(collection.aggregate(STATUS_COUNTS_PIPELINE)))
+            counts = self.counts_from_rows(rows)
+            self.remember_status_counts(counts)
+            return counts
+        except Exception as e:
+            db_breaker.record_failure(e)
+            print(f"⚠️ Failed to aggregate result stats: {e}")
+            return {}
+    
+    def cached_status_counts(self, max_age: float = STATS_CACHE_TTL) -> dict:
+        """The last aggregated status counts if younger than max_age seconds (any age with None), else None."""
+        cached = self._stats_cache
+        if cached is None or (max_age is not None and time.monotonic() - cached[0] >= max_age):
+            return None
+        return cached[1]
+    
+    def remember_status_counts(self, counts: dict):
+        """Caches freshly aggregated status counts (see get_status_counts)."""
+        self._stats_cache = (time.monotonic(), counts)
+    
+    def invalidate_stats(self):
+        """Drops the cached status counts after a write."""
+        self._stats_cache = None
+    
+    @staticmethod
+    def counts_from_rows(rows) -> dict:
+        """Nests the rows of STATUS_COUNTS_PIPELINE as {department: {status: count}}."""
+        counts = {}
+        for row in rows:
+            dept = row['_id'].get('department') or 'Unknown'
+            status = row['_id'].get('status') or 'unknown'
+            counts.setdefault(dept, {})[status] = row['count']
+        return counts
+    
+    @staticmethod
+    def result_filter(result_ids, status: str, department: str = None) -> dict:
+        """
+        Filter for one result_id (or a list of them) in a given status.
+        With the department (the partition key) the operation stays within one partition.
+        """
+        if isinstance(result_ids, list):
+            query = {'result_id': {'$in': result_ids}, 'status': status}
+        else:
+            query = {'result_id': result_ids, 'status': status}
+        if department is not None:
+            query['department'] = department
+        return query
+    
+    def approve_result(self, result_id: str, approved_by: str, department: str = None) -> bool:
         """
         Transfers a result from 'pending' to 'approved'.
         
         Args:
             result_id (str): The ID of the item to approve.
             approved_by (str): The username/email of the approver.
+            department (str, optional): The result's department, if known (single-partition update).
         """
-        if self.collection is None:
+        collection = self.collection
+        if collection is None:
             return False
         
+        # The result may still sit in the write-behind queue
+        if write_queue.pending(VALIDATED_RESULTS_COLLECTION, result_id) is not None:
+            write_queue.flush()
+        
         try:
-            result = self.collection.update_one(
-                {'result_id': result_id, 'status': 'pending'},
+            # find_one_and_update hands back the department so that only the
+            # affected catalog snapshot gets invalidated.
+            previous = run_metered(collection, 'approve', lambda: collection.find_one_and_update(
+                self.result_filter(result_id, 'pending', department),
                 {'$set': {
                     'status': 'approved',
                     'approved_by': approved_by,
                     'approved_at': datetime.utcnow()
-                }}
-            )
-            if result.modified_count > 0:
+                }},
+                projection={'department': 1}
+            ))
+            if previous is not None:
+                self.bump_catalog_version(previous.get('department'))
                 print(f"✅ Approved result: {result_id}")
                 return True
             return False
         except Exception as e:
+            db_breaker.record_failure(e)
             print(f"⚠️ Failed to approve result: {e}")
             return False
     
-    def reject_result(self, result_id: str) -> bool:
-        """Mark a pending result as 'rejected'."""
-        if self.collection is None:
+    def reject_result(self, result_id: str, department: str = None) -> bool:
+        """Mark a pending result as 'rejected' (department: optional partition key, see approve_result)."""
+        collection = self.collection
+        if collection is None:
             return False
         
+        # The result may still sit in the write-behind queue
+        if write_queue.pending(VALIDATED_RESULTS_COLLECTION, result_id) is not None:
+            write_queue.flush()
+        
         try:
-            result = self.collection.update_one(
-                {'result_id': result_id, 'status': 'pending'},
+            result = run_metered(collection, 'reject', lambda: collection.update_one(
+                self.result_filter(result_id, 'pending', department),
                 {'$set': {'status': 'rejected'}}
-            )
+            ))
             if result.modified_count > 0:
+                self._stats_cache = None
                 print(f"❌ Rejected result: {result_id}")
                 return True
             return False
         except Exception as e:
+            db_breaker.record_failure(e)
             print(f"⚠️ Failed to reject result: {e}")
             return False
     
-    def revoke_approval(self, result_id: str) -> bool:
-        """Moves an item back from 'approved' to 'pending'."""
-        if self.collection is None:
+    def _update_many_by_id(self, result_ids: list, from_status: str, update: dict, department: str = None) -> dict:
+        """
+        Applies the same status transition to many results with chunked, unordered bulk_write.
+        
+        Args:
+            result_ids (list): IDs of the results to update.
+            from_status (str): Only results currently in this status are changed.
+            update (dict): The $set payload.
+            department (str, optional): Department of all results, if known (single-partition updates).
+            
+        Returns:
+            dict: {'modified': int, 'departments': set of affected departments}
+        """
+        collection = self.collection
+        if collection is None or not result_ids:
+            return {'modified': 0, 'departments': set()}
+        
+        # Queued results must be in the database before they can change status
+        if any(write_queue.pending(VALIDATED_RESULTS_COLLECTION, rid) is not None for rid in result_ids):
+            write_queue.flush()
+        
+        modified = 0
+        departments = set()
+        for start in range(0, len(result_ids), BULK_CHUNK_SIZE):
+            chunk = list(result_ids[start:start + BULK_CHUNK_SIZE])
+            try:
+                departments.update(run_metered(collection, 'distinct_departments', lambda: collection.distinct(
+                    'department', self.result_filter(chunk, from_status, department)
+                )))
+                result = run_bulk_metered(
+                    collection, 'update_status',
+                    [UpdateOne(self.result_filter(rid, from_status, department), {'$set': update}) for rid in chunk]
+                )
+                modified += result.modified_count
+            except BulkWriteError as e:
+                modified += e.details.get('nModified', 0)
+                print(f"⚠️ {len(e.details.get('writeErrors', []))} result update(s) failed")
+            except Exception as e:
+                db_breaker.record_failure(e)
+                print(f"⚠️ Failed to update results: {e}")
+                break
+        
+        self._stats_cache = None
+        return {'modified': modified, 'departments': departments}
+    
+    def approve_many(self, result_ids: list, approved_by: str, department: str = None) -> int:
+        """
+        Approves many pending results in one or a few round trips.
+        
+        Args:
+            result_ids (list): IDs of the results to approve.
+            approved_by (str): The username/email of the approver.
+            department (str, optional): Department of all results, if known (single-partition updates).
+            
+        Returns:
+            int: Number of approved results.
+        """
+        outcome = self._update_many_by_id(result_ids, 'pending', {
+            'status': 'approved',
+            'approved_by': approved_by,
+            'approved_at': datetime.utcnow()
+        }, department)
+        for department in outcome['departments']:
+            self.bump_catalog_version(department)
+        print(f"✅ Approved {outcome['modified']} result(s)")
+        return outcome['modified']
+    
+    def reject_many(self, result_ids: list, department: str = None) -> int:
+        """Marks many pending results as 'rejected'. Returns the number of rejected results."""
+        outcome = self._update_many_by_id(result_ids, 'pending', {'status': 'rejected'}, department)
+        print(f"❌ Rejected {outcome['modified']} result(s)")
+        return outcome['modified']
+    
+    def revoke_many(self, result_ids: list, department: str = None) -> int:
+        """Moves many approved results back to 'pending'. Returns the number of revoked results."""
+        outcome = self._update_many_by_id(result_ids, 'approved', {
+            'status': 'pending',
+            'approved_by': None,
+            'approved_at': None
+        }, department)
+        for department in outcome['departments']:
+            self.bump_catalog_version(department)
+        return outcome['modified']
+    
+    def revoke_approval(self, result_id: str, department: str = None) -> bool:
+        """Moves an item back from 'approved' to 'pending' (department: optional partition key, see approve_result)."""
+        collection = self.collection
+        if collection is None:
             return False
         
         try:
-            result = self.collection.update_one(
-                {'result_id': result_id, 'status': 'approved'},
+            previous = run_metered(collection, 'revoke', lambda: collection.find_one_and_update(
+                self.result_filter(result_id, 'approved', department),
                 {'$set': {
                     'status': 'pending',
                     'approved_by': None,
                     'approved_at': None
-                }}
-            )
-            return result.modified_count > 0
+                }},
+                projection={'department': 1}
+            ))
+            if previous is not None:
+                self.bump_catalog_version(previous.get('department'))
+                return True
+            return False
         except Exception as e:
+            db_breaker.record_failure(e)
             print(f"⚠️ Failed to revoke approval: {e}")
             return False
 
+    @staticmethod
+    def id_filter(result_ids, department: str = None) -> dict:
+        """Filter for one result_id (or a list of them) in any status (see result_filter)."""
+        query = {'result_id': {'$in': result_ids} if isinstance(result_ids, list) else result_ids}
+        if department is not None:
+            query['department'] = department
+        return query
+
+    def find_results(self, result_ids: list = None, source: str = None, fields: tuple = LISTING_FIELDS,
+                     none_if_unavailable: bool = False) -> list:
+        """
+        Looks up results in any status by result_id and/or by the source they were stored from.
+
+        Args:
+            result_ids (list, optional): Only these results.
+            source (str, optional): Only results whose 'apertus_validation' equals source (e.g. "Curated list").
+            fields (tuple): Document fields to return.
+            none_if_unavailable (bool): Return None instead of [] if the database cannot be reached.
+
+        Returns:
+            list: The matching documents.
+        """
+        collection = self.collection
+        if collection is None:
+            return None if none_if_unavailable else []
+
+        query = {}
+        if result_ids is not None:
+            query['result_id'] = {'$in': list(result_ids)}
+        if source is not None:
+            query['apertus_validation'] = source
+        projection = {field: 1 for field in fields}
+        try:
+            return run_metered(collection, 'find_results', lambda: list(collection.find(query, projection)))
+        except Exception as e:
+            db_breaker.record_failure(e)
+            print(f"⚠️ Failed to find results: {e}")
+            return None if none_if_unavailable else []
+
+    def _approved_departments(self, collection, result_ids: list, department: str = None) -> list:
+        """Departments with an approved result among result_ids (their catalog changes with the results)."""
+        return run_metered(collection, 'distinct_departments', lambda: collection.distinct(
+            'department', {**self.id_filter(result_ids, department), 'status': 'approved'}
+        ))
+
+    def update_results(self, changes: dict, department: str = None) -> int:
+        """
+        Updates fields of many results (in any status) with chunked, unordered bulk_write.
+        The status is not changed.
+
+        Args:
+            changes (dict): result_id -> {field: new value}.
+            department (str, optional): Department of all results, if known (single-partition updates).
+
+        Returns:
+            int: Number of modified results.
+        """
+        collection = self.collection
+        if collection is None or not changes:
+            return 0
+
+        result_ids = list(changes)
+        modified = 0
+        departments = set()
+        for start in range(0, len(result_ids), BULK_CHUNK_SIZE):
+            chunk = result_ids[start:start + BULK_CHUNK_SIZE]
+            try:
+                departments.update(self._approved_departments(collection, chunk, department))
+                result = run_bulk_metered(collection, 'update_fields', [
+                    UpdateOne(self.id_filter(result_id, department), {'$set': changes[result_id]}) for result_id in chunk
+                ])
+                modified += result.modified_count
+            except BulkWriteError as e:
+                modified += e.details.get('nModified', 0)
+                print(f"⚠️ {len(e.details.get('writeErrors', []))} result update(s) failed")
+            except Exception as e:
+                db_breaker.record_failure(e)
+                print(f"⚠️ Failed to update results: {e}")
+                break
+
+        self._stats_cache = None
+        for changed_department in departments:
+            self.bump_catalog_version(changed_department)
+        return modified
+
+    def delete_results(self, result_ids: list, department: str = None) -> int:
+        """
+        Deletes many results (in any status), one delete_many per BULK_CHUNK_SIZE ids.
+
+        Args:
+            result_ids (list): IDs of the results to delete.
+            department (str, optional): Department of all results, if known (single-partition deletes).
+
+        Returns:
+            int: Number of deleted results.
+        """
+        collection = self.collection
+        if collection is None or not result_ids:
+            return 0
+
+        deleted = 0
+        departments = set()
+        for start in range(0, len(result_ids), BULK_CHUNK_SIZE):
+            chunk = list(result_ids[start:start + BULK_CHUNK_SIZE])
+            try:
+                departments.update(self._approved_departments(collection, chunk, department))
+                deleted += run_metered(collection, 'delete_results', lambda: collection.delete_many(self.id_filter(chunk, department))).deleted_count
+            except Exception as e:
+                db_breaker.record_failure(e)
+                print(f"⚠️ Failed to delete results: {e}")
+                break
+
+        self._stats_cache = None
+        for changed_department in departments:
+            self.bump_catalog_version(changed_department)
+        return deleted
+
+    def purge(self, status: str = None, dry_run: bool = False, batch_size: int = PURGE_BATCH_SIZE) -> int:
+        """
+        Deletes all results (or all results in one status) with batched range deletes.
+        
+        Args:
+            status (str, optional): Only delete results in this status.
+            dry_run (bool): Only count what would be deleted.
+            batch_size (int): Results per delete request.
+            
+        Returns:
+            int: Number of deleted (or, in a dry run, matching) results; 0 if the database is unavailable.
+        """
+        collection = self.collection
+        if collection is None:
+            return 0
+        
+        # Queued writes would otherwise re-create results right after the purge
+        write_queue.flush()
+        query = {'status': status} if status else {}
+        try:
+            # Departments whose approved catalog changes
+            departments = [] if dry_run or status not in (None, 'approved') else run_metered(
+                collection, 'distinct_departments', lambda: collection.distinct('department', {'status': 'approved'})
+            )
+            deleted = purge_collection(collection, query, batch_size, dry_run)
+        except Exception as e:
+            db_breaker.record_failure(e)
+            print(f"⚠️ Failed to purge results: {e}")
+            return 0
+        
+        self._stats_cache = None
+        for department in departments:
+            self.bump_catalog_version(department)
+        return deleted
+    
+    @staticmethod
+    def _compaction_query(stale_before: datetime) -> dict:
+        """Filter for results that compact() archives: rejected ones and pending ones not seen since stale_before."""
+        return {'$or': [
+            {'status': 'rejected'},
+            {'status': 'pending', 'last_seen': {'$lt': stale_before}},
+            # Results stored before rediscoveries were tracked
+            {'status': 'pending', 'last_seen': {'$exists': False}, 'created_at': {'$lt': stale_before}},
+        ]}
+
+    @staticmethod
+    def _archived_document(document: dict, archived_at: datetime) -> dict:
+        """The full result as stored in the archive (without '_id', which differs if a tool is archived twice)."""
+        archived = {key: value for key, value in document.items() if key != '_id'}
+        archived['archived_at'] = archived_at
+        archived['archived_reason'] = 'rejected' if document.get('status') == 'rejected' else 'stale'
+        return archived
+
+    @staticmethod
+    def _tombstone(document: dict, archived_at: datetime) -> dict:
+        """The slim document that replaces an archived result in the hot collection."""
+        tombstone = {field: document.get(field) for field in TOMBSTONE_FIELDS}
+        tombstone['last_seen'] = document.get('last_seen') or document.get('created_at') or archived_at
+        tombstone['status'] = 'archived'
+        tombstone['archived_at'] = archived_at
+        return tombstone
+
+    def compact(self, stale_after_days: int = STALE_PENDING_DAYS, tombstone_max_age_days: int = TOMBSTONE_MAX_AGE_DAYS,
+                batch_size: int = BULK_CHUNK_SIZE, dry_run: bool = False) -> dict:
+        """
+        Moves rejected and stale pending results into the archive collection.
+        Each result is first copied to the archive and then replaced by a tombstone (same
+        result_id, status 'archived'), so the hot collection only keeps a few fields per
+        archived tool and the deterministic upsert of a rediscovery cannot re-insert it as pending.
+        A result that changes while the batch is processed (approved, rejected, seen again)
+        keeps its document; its archive copy is refreshed by the next run.
+
+        Args:
+            stale_after_days (int): Pending results not seen for this many days are archived.
+            tombstone_max_age_days (int): Tombstones of tools not seen for this many days are
+                deleted (the tool may then be discovered again).
+            batch_size (int): Results per read and bulk write.
+            dry_run (bool): Only count what would be archived and expired.
+
+        Returns:
+            dict: {'archived': int, 'expired_tombstones': int, 'expired_archived': int}
+        """
+        outcome = {'archived': 0, 'expired_tombstones': 0, 'expired_archived': 0}
+        collection = self.collection
+        archive = get_collection(ARCHIVE_COLLECTION)
+        if collection is None or archive is None:
+            return outcome
+
+        # Queued rediscoveries update last_seen and may keep a pending result fresh
+        write_queue.flush()
+        now = datetime.utcnow()
+        query = self._compaction_query(now - timedelta(days=stale_after_days))
+        expired_query = {'status': 'archived', 'last_seen': {'$lt': now - timedelta(days=tombstone_max_age_days)}}
+        # Cosmos DB's RU-based API ignores the TTL index on archived_at, so expire app-side as well
+        archive_expired_query = {'archived_at': {'$lt': now - timedelta(seconds=ARCHIVE_RETENTION_SECONDS)}}
+
+        try:
+            if dry_run:
+                return {
+                    'archived': run_metered(collection, 'count_compactable', lambda: collection.count_documents(query)),
+                    'expired_tombstones': run_metered(collection, 'count_tombstones', lambda: collection.count_documents(expired_query)),
+                    'expired_archived': run_metered(archive, 'count_expired', lambda: archive.count_documents(archive_expired_query)),
+                }
+
+            last_id = None
+            while True:
+                page_query = {**query, '_id': {'$gt': last_id}} if last_id is not None else query
+                batch = run_metered(collection, 'find_compactable', lambda: list(collection.find(page_query).sort('_id', 1).limit(batch_size)))
+                if not batch:
+                    break
+                last_id = batch[-1]['_id']
+                outcome['archived'] += self._archive_batch(collection, archive, batch, now)
+
+            outcome['expired_tombstones'] = run_metered(collection, 'expire_tombstones', lambda: collection.delete_many(expired_query)).deleted_count
+            outcome['expired_archived'] = run_metered(archive, 'expire_archived', lambda: archive.delete_many(archive_expired_query)).deleted_count
+        except Exception as e:
+            db_breaker.record_failure(e)
+            print(f"⚠️ Compaction failed: {e}")
+
+        self._stats_cache = None
+        print(f"🗄️ Archived {outcome['archived']} result(s), expired {outcome['expired_tombstones']} tombstone(s) "
+              f"and {outcome['expired_archived']} archived result(s)")
+        return outcome
+
+    def _archive_batch(self, collection, archive, batch: list, now: datetime) -> int:
+        """
+        Copies one batch into the archive, then replaces the copied results by tombstones.
+
+        Returns:
+            int: Number of results replaced by tombstones.
+        """
+        try:
+            run_bulk_metered(archive, 'archive', [
+                ReplaceOne({'result_id': doc['result_id'], 'department': doc.get('department')}, self._archived_document(doc, now), upsert=True)
+                for doc in batch
+            ])
+        except BulkWriteError as e:
+            # Only results that are safely in the archive may lose their content
+            failed = {error['index'] for error in e.details.get('writeErrors', [])}
+            print(f"⚠️ {len(failed)} result(s) could not be archived")
+            batch = [doc for i, doc in enumerate(batch) if i not in failed]
+        if not batch:
+            return 0
+
+        # The filter only matches results that are unchanged since they were read
+        requests = [
+            ReplaceOne(
+                {'_id': doc['_id'], 'department': doc.get('department'), 'status': doc['status'], 'last_seen': doc.get('last_seen')},
+                self._tombstone(doc, now)
+            )
+            for doc in batch
+        ]
+        try:
+            return run_bulk_metered(collection, 'tombstone', requests).modified_count
+        except BulkWriteError as e:
+            print(f"⚠️ {len(e.details.get('writeErrors', []))} result(s) could not be replaced by tombstones")
+            return e.details.get('nModified', 0)
+
 
-# Global validated results manager instance
-validated_results_manager = ValidatedResultsManager()
+# Global instances (embedded SQLite when Cosmos DB is not configured or not selected)
+if get_storage_backend() == "sqlite":
+    from sqlite_backend import SQLiteAnswerCache, SQLiteValidatedResultsManager, sqlite_database
+    cache = SQLiteAnswerCache(sqlite_database)
+    validated_results_manager = SQLiteValidatedResultsManager(sqlite_database)
+else:
+    cache = AnswerCache()
+    validated_results_manager = ValidatedResultsManager()
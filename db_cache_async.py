@@ -0,0 +1,655 @@
+"""
+Async (Motor) counterparts of the Cosmos DB managers in db_cache.
+They offer the same methods as AnswerCache and ValidatedResultsManager, but every
+database call is awaited, so an asyncio pipeline can overlap database writes with
+HTTP fetches and LLM calls.
+
+Each async manager wraps the process-wide sync manager and shares its in-process state:
+the L1 cache and similarity candidates of the answer cache, and the catalog versions,
+listeners and stats cache of the validated results. Approving a tool from async code
+therefore invalidates the catalog snapshot exactly like the sync API does. Queries and
+documents are built by the public helpers of the sync managers, so both APIs read and
+write the same documents. The maintenance jobs purge() and compact() run the sync
+implementation in a worker thread.
+
+Writes are awaited directly instead of going through the write-behind queue;
+async callers do not block a thread while they wait. Answers are the exception: they
+are queued like the sync ones (see AsyncAnswerCache.store_answer). Every Motor call
+goes through request_units.run_metered_async (or run_bulk_metered_async), so throttled
+calls are retried and recorded in ru_meter exactly like the sync ones. Apart from
+store_answer() the async managers only talk to Cosmos DB; with the SQLite backend they
+behave like an unavailable database.
+
+Usage:
+    from db_cache_async import async_validated_results_manager
+    result_id = await async_validated_results_manager.add_pending_result(...)
+"""
+import asyncio
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from request_units import run_bulk_metered_async, run_metered_async
+from write_behind import write_queue
+from db_cache import (
+    ANSWER_MAX_AGE_SECONDS,
+    BULK_CHUNK_SIZE,
+    CANDIDATE_PROJECTION,
+    LISTING_FIELDS,
+    LIST_PAGE_SIZE,
+    STALE_PENDING_DAYS,
+    STATUS_COUNTS_PIPELINE,
+    TOMBSTONE_MAX_AGE_DAYS,
+    cache,
+    validated_results_manager,
+)
+from db_purge import PURGE_BATCH_SIZE
+from db_connection import (
+    ANSWER_CACHE_COLLECTION,
+    VALIDATED_RESULTS_COLLECTION,
+    db_breaker,
+    get_async_collection,
+    get_storage_backend,
+)
+from text_normalization import canonicalize_question
+
+
+class AsyncAnswerCache:
+    """
+    Async AnswerCache: L1 lookups stay synchronous (no I/O), L2 lookups and writes are awaited.
+    """
+
+    def __init__(self, sync_cache):
+        """
+        Args:
+            sync_cache (AnswerCache): The sync cache whose L1 and candidate index are shared.
+        """
+        self._sync = sync_cache
+        self.l1 = sync_cache.l1
+
+    @property
+    def collection(self):
+        """The answer_cache collection on the shared async client (None if disabled or breaker open)."""
+        if get_storage_backend() != "cosmos":
+            return None
+        return get_async_collection(ANSWER_CACHE_COLLECTION)
+
+    def question_key(self, question: str, department: str) -> str:
+        """Public cache key of a question (same as AnswerCache.question_key)."""
+        return self._sync.question_key(question, department)
+
+    async def _lookup(self, question_hash: str, department: str, question: str) -> dict:
+        """Looks up a cache entry by hash, first in L1 (and the write-behind queue), then in L2."""
+        entry = self.l1.get(question_hash)
+        if entry is not None:
+            return entry
+
+        queued = write_queue.pending(ANSWER_CACHE_COLLECTION, question_hash)
+        if queued is not None:
+            entry = self._sync.entry_from_document(department, queued)
+            self.l1.set(question_hash, entry)
+            return entry
+
+        collection = self.collection
+        if collection is None:
+            return None
+
+        try:
+            item = await run_metered_async(collection, 'find_one', lambda: collection.find_one({
+                "question_hash": question_hash,
+                "department": department
+            }))
+            if item:
+                self._sync.l2_hits += 1
+                print(f"✅ Cache HIT for: {question[:50]}...")
+                entry = self._sync.entry_from_document(department, item)
+                self.l1.set(question_hash, entry)
+                return entry
+            self._sync.l2_misses += 1
+            print(f"❌ Cache MISS for: {question[:50]}...")
+            return None
+        except Exception as e:
+            db_breaker.record_failure(e)
+            print(f"⚠️ Cache lookup error: {e}")
+            return None
+
+    async def _department_candidates(self, department: str) -> dict:
+        """Canonical forms of all cached questions of a department (see AnswerCache._department_candidates)."""
+        fresh = self._sync.fresh_candidates(department)
+        if fresh is not None:
+            return fresh
+
+        candidates = None
+        collection = self.collection
+        if collection is not None:
+            try:
+                candidates = {}
+                items = await run_metered_async(collection, 'find_candidates', lambda: collection.find({"department": department}, CANDIDATE_PROJECTION).to_list(None))
+                for item in items:
+                    canonical = item.get('canonical_question') or canonicalize_question(item.get('question', ''))
+                    candidates[item['question_hash']] = canonical
+            except Exception as e:
+                db_breaker.record_failure(e)
+                print(f"⚠️ Failed to load cached questions: {e}")
+                candidates = None
+        return self._sync.remember_candidates(department, candidates)
+
+    async def iter_documents(self, batch_size: int = BULK_CHUNK_SIZE):
+        """Async AnswerCache.iter_documents: all unexpired answer documents (without '_id'), in batches."""
+        collection = self.collection
+        if collection is None:
+            return
+
+        query = {'created_at': {'$gte': datetime.utcnow() - timedelta(seconds=ANSWER_MAX_AGE_SECONDS)}}
+        last_id = None
+        while True:
+            page_query = {**query, '_id': {'$gt': last_id}} if last_id is not None else query
+            batch = await run_metered_async(collection, 'export', lambda: collection.find(page_query).sort('_id', 1).limit(batch_size).to_list(None))
+            if not batch:
+                return
+            last_id = batch[-1]['_id']
+            for document in batch:
+                document.pop('_id', None)
+                yield document
+
+    def seed(self, documents) -> int:
+        """Fills the shared L1 and similarity candidates from answer documents (no I/O, hence not async)."""
+        return self._sync.seed(documents)
+
+    async def get_cached_answer(self, question: str, department: str, catalog_version: str = None) -> dict:
+        """Async AnswerCache.get_cached_answer (exact hit, then paraphrase fallback)."""
+        question_hash = self._sync.question_key(question, department)
+
+        entry = await self._lookup(question_hash, department, question)
+        if entry is not None:
+            return self._sync.to_result(entry, catalog_version)
+
+        match = self._sync.best_candidate(question, await self._department_candidates(department))
+        if match is None:
+            return None
+
+        similar_hash, similarity = match
+        entry = await self._lookup(similar_hash, department, question)
+        if entry is None:
+            return None
+
+        print(f"≈ Similar cache HIT ({similarity:.2f}) for: {question[:50]}...")
+        self.l1.set(question_hash, entry)
+        result = self._sync.to_result(entry, catalog_version)
+        if result is not None:
+            result['similarity'] = similarity
+        return result
+
+    async def store_answer(self, question: str, department: str, answer: str, catalog_version: str = None) -> bool:
+        """
+        Async AnswerCache.store_answer. Answers take the sync write-behind path (L1 immediately,
+        the same upsert queued for L2), so lookups see them in the queue and a queued older
+        answer cannot be flushed over a newer one. Enqueueing does no I/O.
+
+        Returns:
+            bool: True if the answer was queued for the database.
+        """
+        return self._sync.store_answer(question, department, answer, catalog_version)
+
+    async def invalidate(self, question: str, department: str):
+        """Removes a cached answer from both tiers."""
+        question_hash = self._sync.question_key(question, department)
+        self.l1.invalidate(question_hash)
+
+        collection = self.collection
+        if collection is None:
+            return
+
+        try:
+            await run_metered_async(collection, 'delete_one', lambda: collection.delete_one({"question_hash": question_hash, "department": department}))
+        except Exception as e:
+            db_breaker.record_failure(e)
+            print(f"⚠️ Failed to invalidate cached answer: {e}")
+
+    def invalidate_department(self, department: str) -> int:
+        """Drops all L1 entries of a department (no I/O, hence not async)."""
+        return self._sync.invalidate_department(department)
+
+    def stats(self) -> dict:
+        """Hit/miss counters per tier (shared with the sync cache)."""
+        return self._sync.stats()
+
+
+class AsyncValidatedResultsManager:
+    """
+    Async ValidatedResultsManager with the same status lifecycle (pending -> approved/rejected).
+    Pure in-memory helpers (catalog versions, listeners, ids) are delegated to the sync manager.
+    """
+
+    def __init__(self, sync_manager):
+        """
+        Args:
+            sync_manager (ValidatedResultsManager): The sync manager whose catalog state is shared.
+        """
+        self._sync = sync_manager
+
+    @property
+    def collection(self):
+        """The validated_results collection on the shared async client (None if disabled or breaker open)."""
+        if get_storage_backend() != "cosmos":
+            return None
+        return get_async_collection(VALIDATED_RESULTS_COLLECTION)
+
+    def catalog_version(self, department: str) -> int:
+        """Current catalog version of a department (shared with the sync manager)."""
+        return self._sync.catalog_version(department)
+
+    def add_catalog_listener(self, callback):
+        """Registers a catalog change listener (shared with the sync manager)."""
+        self._sync.add_catalog_listener(callback)
+
+    def tool_result_id(self, department: str, tool_name: str = None, source_url: str = None, query: str = None) -> str:
+        """Deterministic identity of a discovered tool (see ValidatedResultsManager.tool_result_id)."""
+        return self._sync.tool_result_id(department, tool_name, source_url, query)
+
+    async def _flush_if_queued(self, result_ids: list):
+        """Queued results must be written before they can change status (flushes off the event loop)."""
+        if any(write_queue.pending(VALIDATED_RESULTS_COLLECTION, rid) is not None for rid in result_ids):
+            await asyncio.to_thread(write_queue.flush)
+
+    async def add_pending_result(self, query: str, department: str, llm_analysis: str, apertus_validation: str, tool_name: str = None, source_url: str = None) -> str:
+        """
+        Async ValidatedResultsManager.add_pending_result (upsert awaited).
+
+        Returns:
+            str: The deterministic result_id, or None if the database is unavailable.
+        """
+        collection = self.collection
+        if collection is None:
+            return None
+
+        operation, document = self._sync.build_pending_upsert(query, department, llm_analysis, apertus_validation, tool_name, source_url)
+        try:
+            await run_bulk_metered_async(collection, 'upsert_pending', [operation])
+            self._sync.invalidate_stats()
+            print(f"✅ Added pending result: {document['result_id']} - {tool_name}")
+            return document['result_id']
+        except Exception as e:
+            db_breaker.record_failure(e)
+            print(f"⚠️ Failed to add pending result: {e}")
+            return None
+
+    async def add_pending_results_bulk(self, items: list) -> list:
+        """Async ValidatedResultsManager.add_pending_results_bulk (chunked, unordered upserts)."""
+        collection = self.collection
+        if collection is None:
+            return []
+
+        operations = self._sync.unique_upserts([self._sync.build_pending_upsert(**item) for item in items])
+        result_ids = list(operations)
+        written_ids = []
+        for start in range(0, len(result_ids), BULK_CHUNK_SIZE):
+            chunk = result_ids[start:start + BULK_CHUNK_SIZE]
+            try:
+                await run_bulk_metered_async(collection, 'upsert_pending', [operations[result_id] for result_id in chunk])
+                written_ids.extend(chunk)
+            except BulkWriteError as e:
+                failed = {error['index'] for error in e.details.get('writeErrors', [])}
+                written_ids.extend(result_id for i, result_id in enumerate(chunk) if i not in failed)
+                print(f"⚠️ {len(failed)} pending result(s) could not be written")
+            except Exception as e:
+                db_breaker.record_failure(e)
+                print(f"⚠️ Failed to add pending results: {e}")
+                break
+
+        self._sync.invalidate_stats()
+        print(f"✅ Added or refreshed {len(written_ids)} pending result(s)")
+        return written_ids
+
+    async def _new_queued_results(self, collection, queued: list, known: set) -> list:
+        """Async ValidatedResultsManager._new_queued_results."""
+        unknown = [doc['result_id'] for doc in queued if doc['result_id'] not in known]
+        if not unknown:
+            return []
+        found = await run_metered_async(collection, 'find_existing', lambda: collection.find({'result_id': {'$in': unknown}}, {'result_id': 1}).to_list(None))
+        existing = {r['result_id'] for r in found}
+        return [doc for doc in queued if doc['result_id'] not in known and doc['result_id'] not in existing]
+
+    async def get_pending_results(self) -> list:
+        """All results with 'pending' status, including not yet flushed ones."""
+        queued = self._sync.queued_pending()
+
+        collection = self.collection
+        if collection is None:
+            return queued
+
+        try:
+            results = await run_metered_async(collection, 'find_pending', lambda: collection.find({'status': 'pending'}).to_list(None))
+            known = {r.get('result_id') for r in results}
+            results.extend(await self._new_queued_results(collection, queued, known))
+            return results
+        except Exception as e:
+            db_breaker.record_failure(e)
+            print(f"⚠️ Failed to get pending results: {e}")
+            return queued
+
+    async def get_approved_by_department(self, department: str, none_if_unavailable: bool = False) -> list:
+        """All approved results of a department (None/[] if the database is unavailable)."""
+        collection = self.collection
+        if collection is None:
+            return None if none_if_unavailable else []
+
+        try:
+            return await run_metered_async(collection, 'find_approved', lambda: collection.find({
+                'status': 'approved',
+                'department': department
+            }).to_list(None))
+        except Exception as e:
+            db_breaker.record_failure(e)
+            print(f"⚠️ Failed to get approved results: {e}")
+            return None if none_if_unavailable else []
+
+    async def get_all_approved(self) -> list:
+        """All approved results across all departments."""
+        collection = self.collection
+        if collection is None:
+            return []
+
+        try:
+            return await run_metered_async(collection, 'find_all_approved', lambda: collection.find({'status': 'approved'}).to_list(None))
+        except Exception as e:
+            db_breaker.record_failure(e)
+            print(f"⚠️ Failed to get all approved results: {e}")
+            return []
+
+    async def list_results(self, status: str, department: str = None, fields: tuple = LISTING_FIELDS,
+                           page_size: int = LIST_PAGE_SIZE, after=None, description_chars: int = None,
+                           none_if_unavailable: bool = False) -> dict:
+        """Async ValidatedResultsManager.list_results (one keyset page of lightweight records)."""
+        queued = self._sync.queued_pending(department) if status == 'pending' else []
+
+        collection = self.collection
+        if collection is None:
+            return None if none_if_unavailable else {'items': [], 'next_cursor': None}
+
+        try:
+            if description_chars is None:
+                match = self._sync.listing_match(status, department, after)
+                items = await run_metered_async(collection, 'list', lambda: collection.find(
+                    match, {field: 1 for field in fields}
+                ).sort('_id', 1).limit(page_size).to_list(None))
+            else:
+                pipeline = self._sync.listing_pipeline(status, department, after, fields, page_size, description_chars)
+                items = await run_metered_async(collection, 'list_preview', lambda: collection.aggregate(pipeline).to_list(None))
+
+            if len(items) < page_size:
+                new_docs = await self._new_queued_results(collection, queued, {r.get('result_id') for r in items}) if queued else []
+                items.extend(self._sync.listing_items(new_docs, fields, description_chars))
+                return {'items': items, 'next_cursor': None}
+            return {'items': items, 'next_cursor': items[-1]['_id']}
+        except Exception as e:
+            db_breaker.record_failure(e)
+            print(f"⚠️ Failed to list {status} results: {e}")
+            return None if none_if_unavailable else {'items': [], 'next_cursor': None}
+
+    async def iter_results(self, status: str, department: str = None, fields: tuple = LISTING_FIELDS,
+                           page_size: int = LIST_PAGE_SIZE, description_chars: int = None):
+        """Async generator over all results with a given status, page by page."""
+        after = None
+        while True:
+            page = await self.list_results(status, department, fields, page_size, after, description_chars)
+            for item in page['items']:
+                yield item
+            after = page['next_cursor']
+            if after is None:
+                return
+
+    async def get_status_counts(self) -> dict:
+        """Counts per department and status (shares the sync manager's short-lived stats cache)."""
+        cached = self._sync.cached_status_counts()
+        if cached is not None:
+            return cached
+
+        collection = self.collection
+        if collection is None:
+            return self._sync.cached_status_counts(max_age=None) or {}
+
+        try:
+            rows = await run_metered_async(collection, 'status_counts', lambda: collection.aggregate(STATUS_COUNTS_PIPELINE).to_list(None))
+            counts = self._sync.counts_from_rows(rows)
+            self._sync.remember_status_counts(counts)
+            return counts
+        except Exception as e:
+            db_breaker.record_failure(e)
+            print(f"⚠️ Failed to aggregate result stats: {e}")
+            return {}
+
+    async def approve_result(self, result_id: str, approved_by: str, department: str = None) -> bool:
+        """Transfers a result from 'pending' to 'approved'."""
+        collection = self.collection
+        if collection is None:
+            return False
+
+        await self._flush_if_queued([result_id])
+        try:
+            previous = await run_metered_async(collection, 'approve', lambda: collection.find_one_and_update(
+                self._sync.result_filter(result_id, 'pending', department),
+                {'$set': {
+                    'status': 'approved',
+                    'approved_by': approved_by,
+                    'approved_at': datetime.utcnow()
+                }},
+                projection={'department': 1}
+            ))
+            if previous is not None:
+                self._sync.bump_catalog_version(previous.get('department'))
+                print(f"✅ Approved result: {result_id}")
+                return True
+            return False
+        except Exception as e:
+            db_breaker.record_failure(e)
+            print(f"⚠️ Failed to approve result: {e}")
+            return False
+
+    async def reject_result(self, result_id: str, department: str = None) -> bool:
+        """Mark a pending result as 'rejected'."""
+        collection = self.collection
+        if collection is None:
+            return False
+
+        await self._flush_if_queued([result_id])
+        try:
+            result = await run_metered_async(collection, 'reject', lambda: collection.update_one(
+                self._sync.result_filter(result_id, 'pending', department),
+                {'$set': {'status': 'rejected'}}
+            ))
+            if result.modified_count > 0:
+                self._sync.invalidate_stats()
+                print(f"❌ Rejected result: {result_id}")
+                return True
+            return False
+        except Exception as e:
+            db_breaker.record_failure(e)
+            print(f"⚠️ Failed to reject result: {e}")
+            return False
+
+    async def _update_many_by_id(self, result_ids: list, from_status: str, update: dict, department: str = None) -> dict:
+        """Async ValidatedResultsManager._update_many_by_id."""
+        collection = self.collection
+        if collection is None or not result_ids:
+            return {'modified': 0, 'departments': set()}
+
+        await self._flush_if_queued(result_ids)
+
+        modified = 0
+        departments = set()
+        for start in range(0, len(result_ids), BULK_CHUNK_SIZE):
+            chunk = list(result_ids[start:start + BULK_CHUNK_SIZE])
+            try:
+                departments.update(await run_metered_async(collection, 'distinct_departments', lambda: collection.distinct(
+                    'department', self._sync.result_filter(chunk, from_status, department)
+                )))
+                result = await run_bulk_metered_async(
+                    collection, 'update_status',
+                    [UpdateOne(self._sync.result_filter(rid, from_status, department), {'$set': update}) for rid in chunk]
+                )
+                modified += result.modified_count
+            except BulkWriteError as e:
+                modified += e.details.get('nModified', 0)
+                print(f"⚠️ {len(e.details.get('writeErrors', []))} result update(s) failed")
+            except Exception as e:
+                db_breaker.record_failure(e)
+                print(f"⚠️ Failed to update results: {e}")
+                break
+
+        self._sync.invalidate_stats()
+        return {'modified': modified, 'departments': departments}
+
+    async def approve_many(self, result_ids: list, approved_by: str, department: str = None) -> int:
+        """Approves many pending results. Returns the number of approved results."""
+        outcome = await self._update_many_by_id(result_ids, 'pending', {
+            'status': 'approved',
+            'approved_by': approved_by,
+            'approved_at': datetime.utcnow()
+        }, department)
+        for department in outcome['departments']:
+            self._sync.bump_catalog_version(department)
+        print(f"✅ Approved {outcome['modified']} result(s)")
+        return outcome['modified']
+
+    async def reject_many(self, result_ids: list, department: str = None) -> int:
+        """Marks many pending results as 'rejected'. Returns the number of rejected results."""
+        outcome = await self._update_many_by_id(result_ids, 'pending', {'status': 'rejected'}, department)
+        print(f"❌ Rejected {outcome['modified']} result(s)")
+        return outcome['modified']
+
+    async def revoke_many(self, result_ids: list, department: str = None) -> int:
+        """Moves many approved results back to 'pending'. Returns the number of revoked results."""
+        outcome = await self._update_many_by_id(result_ids, 'approved', {
+            'status': 'pending',
+            'approved_by': None,
+            'approved_at': None
+        }, department)
+        for department in outcome['departments']:
+            self._sync.bump_catalog_version(department)
+        return outcome['modified']
+
+    async def revoke_approval(self, result_id: str, department: str = None) -> bool:
+        """Moves an item back from 'approved' to 'pending'."""
+        collection = self.collection
+        if collection is None:
+            return False
+
+        try:
+            previous = await run_metered_async(collection, 'revoke', lambda: collection.find_one_and_update(
+                self._sync.result_filter(result_id, 'approved', department),
+                {'$set': {
+                    'status': 'pending',
+                    'approved_by': None,
+                    'approved_at': None
+                }},
+                projection={'department': 1}
+            ))
+            if previous is not None:
+                self._sync.bump_catalog_version(previous.get('department'))
+                return True
+            return False
+        except Exception as e:
+            db_breaker.record_failure(e)
+            print(f"⚠️ Failed to revoke approval: {e}")
+            return False
+
+    async def find_results(self, result_ids: list = None, source: str = None, fields: tuple = LISTING_FIELDS,
+                           none_if_unavailable: bool = False) -> list:
+        """Async ValidatedResultsManager.find_results (results in any status by result_id and/or source)."""
+        collection = self.collection
+        if collection is None:
+            return None if none_if_unavailable else []
+
+        query = {}
+        if result_ids is not None:
+            query['result_id'] = {'$in': list(result_ids)}
+        if source is not None:
+            query['apertus_validation'] = source
+        projection = {field: 1 for field in fields}
+        try:
+            return await run_metered_async(collection, 'find_results', lambda: collection.find(query, projection).to_list(None))
+        except Exception as e:
+            db_breaker.record_failure(e)
+            print(f"⚠️ Failed to find results: {e}")
+            return None if none_if_unavailable else []
+
+    async def _approved_departments(self, collection, result_ids: list, department: str = None) -> list:
+        """Async ValidatedResultsManager._approved_departments."""
+        return await run_metered_async(collection, 'distinct_departments', lambda: collection.distinct(
+            'department', {**self._sync.id_filter(result_ids, department), 'status': 'approved'}
+        ))
+
+    async def update_results(self, changes: dict, department: str = None) -> int:
+        """Async ValidatedResultsManager.update_results (field updates in any status, status unchanged)."""
+        collection = self.collection
+        if collection is None or not changes:
+            return 0
+
+        result_ids = list(changes)
+        modified = 0
+        departments = set()
+        for start in range(0, len(result_ids), BULK_CHUNK_SIZE):
+            chunk = result_ids[start:start + BULK_CHUNK_SIZE]
+            try:
+                departments.update(await self._approved_departments(collection, chunk, department))
+                result = await run_bulk_metered_async(collection, 'update_fields', [
+                    UpdateOne(self._sync.id_filter(result_id, department), {'$set': changes[result_id]}) for result_id in chunk
+                ])
+                modified += result.modified_count
+            except BulkWriteError as e:
+                modified += e.details.get('nModified', 0)
+                print(f"⚠️ {len(e.details.get('writeErrors', []))} result update(s) failed")
+            except Exception as e:
+                db_breaker.record_failure(e)
+                print(f"⚠️ Failed to update results: {e}")
+                break
+
+        self._sync.invalidate_stats()
+        for changed_department in departments:
+            self._sync.bump_catalog_version(changed_department)
+        return modified
+
+    async def delete_results(self, result_ids: list, department: str = None) -> int:
+        """Async ValidatedResultsManager.delete_results (one delete_many per BULK_CHUNK_SIZE ids)."""
+        collection = self.collection
+        if collection is None or not result_ids:
+            return 0
+
+        deleted = 0
+        departments = set()
+        for start in range(0, len(result_ids), BULK_CHUNK_SIZE):
+            chunk = list(result_ids[start:start + BULK_CHUNK_SIZE])
+            try:
+                departments.update(await self._approved_departments(collection, chunk, department))
+                result = await run_metered_async(collection, 'delete_results', lambda: collection.delete_many(self._sync.id_filter(chunk, department)))
+                deleted += result.deleted_count
+            except Exception as e:
+                db_breaker.record_failure(e)
+                print(f"⚠️ Failed to delete results: {e}")
+                break
+
+        self._sync.invalidate_stats()
+        for changed_department in departments:
+            self._sync.bump_catalog_version(changed_department)
+        return deleted
+
+    async def purge(self, status: str = None, dry_run: bool = False, batch_size: int = PURGE_BATCH_SIZE) -> int:
+        """
+        Async ValidatedResultsManager.purge. Like compact(), this maintenance job runs the
+        sync implementation in a worker thread instead of duplicating its batching.
+        """
+        if self.collection is None:
+            return 0
+        return await asyncio.to_thread(self._sync.purge, status, dry_run, batch_size)
+
+    async def compact(self, stale_after_days: int = STALE_PENDING_DAYS, tombstone_max_age_days: int = TOMBSTONE_MAX_AGE_DAYS,
+                      batch_size: int = BULK_CHUNK_SIZE, dry_run: bool = False) -> dict:
+        """Async ValidatedResultsManager.compact (sync implementation in a worker thread, see purge)."""
+        if self.collection is None:
+            return {'archived': 0, 'expired_tombstones': 0, 'expired_archived': 0}
+        return await asyncio.to_thread(self._sync.compact, stale_after_days, tombstone_max_age_days, batch_size, dry_run)
+
+
+# Global async instances, sharing state with db_cache.cache / db_cache.validated_results_manager
+async_cache = AsyncAnswerCache(cache)
+async_validated_results_manager = AsyncValidatedResultsManager(validated_results_manager)
@@ -0,0 +1,40 @@
+"""
+Compacts validated_results: rejected results and pending results that were not rediscovered
+for STALE_PENDING_DAYS are moved into the archive, so status scans, the admin dashboard and
+the catalog queries only touch live results.
+
+Every archived result leaves a tombstone (same result_id, status 'archived', a handful of
+fields). Result ids are deterministic, so when the auto-search finds the tool again its upsert
+hits the tombstone and only updates last_seen instead of creating a new pending result.
+Tombstones of tools not seen for TOMBSTONE_MAX_AGE_DAYS are deleted, archived results
+expire after ARCHIVE_RETENTION_SECONDS.
+
+Safe to run while the app is running; schedule it e.g. once a night.
+
+Usage:
+    python db_compaction.py                 # archive and expire
+    python db_compaction.py --dry-run       # only count what would be archived and expired
+    python db_compaction.py --stale-days 14 # archive pending results not seen for 14 days
+"""
+import argparse
+from db_cache import (
+    BULK_CHUNK_SIZE,
+    STALE_PENDING_DAYS,
+    TOMBSTONE_MAX_AGE_DAYS,
+    validated_results_manager,
+)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive rejected and stale pending results and expire old tombstones.")
+    parser.add_argument("--stale-days", type=int, default=STALE_PENDING_DAYS, help="archive pending results not seen for this many days")
+    parser.add_argument("--tombstone-days", type=int, default=TOMBSTONE_MAX_AGE_DAYS, help="delete tombstones of tools not seen for this many days")
+    parser.add_argument("--batch-size", type=int, default=BULK_CHUNK_SIZE, help="results per read/write batch")
+    parser.add_argument("--dry-run", action="store_true", help="only count what would be archived and expired")
+    args = parser.parse_args()
+
+    # compact() reports what it did; a dry run only returns the counts
+    outcome = validated_results_manager.compact(args.stale_days, args.tombstone_days, args.batch_size, args.dry_run)
+    if args.dry_run:
+        print(f"Would archive {outcome['archived']} result(s), expire {outcome['expired_tombstones']} tombstone(s) "
+              f"and {outcome['expired_archived']} archived result(s)")
@@ -0,0 +1,320 @@
+"""
+Shared connection manager for Azure Cosmos DB (MongoDB API).
+Every module and script obtains its collections from here, so each process holds
+exactly one MongoClient (and therefore one connection pool).
+
+The client is created lazily on first use: importing this module (or db_cache)
+never touches the network. Async code (db_cache_async) gets an equally shared
+Motor client from get_async_client(); motor is only imported when that is called.
+
+Connectivity is guarded by a circuit breaker (db_breaker): after a few consecutive
+connection failures the database is skipped entirely for a cool-down period, so an
+outage costs milliseconds per request instead of a server-selection timeout each time.
+"""
+import os
+import threading
+import time
+from pymongo import MongoClient, monitoring
+from pymongo.errors import ConnectionFailure, ExecutionTimeout
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DATABASE_NAME = "kmu_meet_ki"
+
+# Collection names (configurable, e.g. to switch to the partitioned collections created by db_migrate.py)
+ANSWER_CACHE_COLLECTION = os.getenv("COSMOS_ANSWER_CACHE_COLLECTION", "answer_cache")
+VALIDATED_RESULTS_COLLECTION = os.getenv("COSMOS_VALIDATED_RESULTS_COLLECTION", "validated_results")
+LEASES_COLLECTION = os.getenv("COSMOS_LEASES_COLLECTION", "leases")
+ARCHIVE_COLLECTION = os.getenv("COSMOS_ARCHIVE_COLLECTION", "validated_results_archive")
+JOBS_COLLECTION = os.getenv("COSMOS_JOBS_COLLECTION", "research_jobs")
+
+# Partitioned layout: answer_cache and validated_results are sharded by department, so
+# department-scoped queries are single-partition reads. Enable once the configured
+# collections are partitioned (see db_migrate.py); it adapts the required indexes.
+PARTITION_KEY = "department"
+PARTITIONED_LAYOUT = os.getenv("COSMOS_PARTITIONED_LAYOUT", "").strip().lower() in ("1", "true", "yes")
+
+# Client settings (can be tuned per deployment via environment variables)
+APP_NAME = os.getenv("COSMOS_APP_NAME", "kmu-meet-ki")
+MAX_POOL_SIZE = int(os.getenv("COSMOS_MAX_POOL_SIZE", "20"))
+MIN_POOL_SIZE = int(os.getenv("COSMOS_MIN_POOL_SIZE", "0"))
+# Azure's load balancer drops idle connections after ~4 minutes, so recycle them earlier
+MAX_IDLE_TIME_MS = int(os.getenv("COSMOS_MAX_IDLE_TIME_MS", "120000"))
+# Fail fast: pymongo's defaults wait up to 30s for server selection when Cosmos is unreachable
+CONNECT_TIMEOUT_MS = int(os.getenv("COSMOS_CONNECT_TIMEOUT_MS", "3000"))
+SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("COSMOS_SERVER_SELECTION_TIMEOUT_MS", "3000"))
+SOCKET_TIMEOUT_MS = int(os.getenv("COSMOS_SOCKET_TIMEOUT_MS", "10000"))
+
+# Circuit breaker settings
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("COSMOS_BREAKER_FAILURE_THRESHOLD", "3"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("COSMOS_BREAKER_RESET_TIMEOUT", "30"))
+
+_client = None
+_client_lock = threading.Lock()
+_async_client = None
+
+
+class CircuitBreaker:
+    """
+    Classic three-state circuit breaker for the database connection.
+    
+    - closed:    requests go to the database; connection failures are counted.
+    - open:      requests are skipped immediately until reset_timeout has passed.
+    - half-open: a single probe request is let through; success closes the breaker,
+                 another connection failure opens it again.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+    
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        """
+        Args:
+            failure_threshold (int): Consecutive connection failures before the breaker opens.
+            reset_timeout (float): Seconds to wait before probing the database again.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at = 0.0
+        self._lock = threading.Lock()
+    
+    def allow_request(self) -> bool:
+        """
+        Decides whether a database call may be attempted right now.
+        
+        Returns:
+            bool: False while the breaker is open (callers should use their local fallback).
+        """
+        if self.state == self.CLOSED:
+            return True
+        
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.OPEN:
+                if now - self._opened_at < self.reset_timeout:
+                    return False
+                # Cool-down over: let exactly one probe through
+                self.state = self.HALF_OPEN
+                self._probe_started_at = now
+                return True
+            if self.state == self.HALF_OPEN:
+                # Allow a new probe if the previous one never reported back
+                if now - self._probe_started_at >= self.reset_timeout:
+                    self._probe_started_at = now
+                    return True
+                return False
+            return True
+    
+    def is_available(self) -> bool:
+        """True unless the breaker is open (does not consume the half-open probe)."""
+        return self.state != self.OPEN
+    
+    def record_success(self):
+        """Called after a successful round trip; closes the breaker."""
+        if self.state == self.CLOSED and self._failures == 0:
+            return
+        with self._lock:
+            if self.state != self.CLOSED:
+                print("✅ Cosmos DB reachable again - circuit breaker closed")
+            self.state = self.CLOSED
+            self._failures = 0
+    
+    def record_failure(self, error: Exception):
+        """
+        Called when a database call raised. Only connectivity problems count;
+        logical errors (e.g. duplicate keys) mean the server was reachable.
+        
+        Args:
+            error (Exception): The exception raised by pymongo.
+        """
+        if not isinstance(error, (ConnectionFailure, ExecutionTimeout)):
+            return
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"⚠️ Cosmos DB unreachable - circuit breaker open for {self.reset_timeout:.0f}s")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+# Global breaker shared by all managers in this process
+db_breaker = CircuitBreaker()
+
+
+class _BreakerCommandListener(monitoring.CommandListener):
+    """Closes the breaker whenever any command completes successfully."""
+    
+    def started(self, event):
+        pass
+    
+    def succeeded(self, event):
+        db_breaker.record_success()
+    
+    def failed(self, event):
+        pass
+
+
+def get_connection_string() -> str:
+    """Returns the Cosmos DB connection string from the environment (or None)."""
+    return os.getenv("AZURE_COSMOS_CONNECTION_STRING")
+
+
+def is_configured() -> bool:
+    """True if a connection string is available, i.e. the database layer is enabled."""
+    return bool(get_connection_string())
+
+
+def get_storage_backend() -> str:
+    """
+    Returns the storage backend of db_cache: "cosmos" or "sqlite" (embedded, see sqlite_backend).
+    Set explicitly via STORAGE_BACKEND; defaults to SQLite when no connection string is configured.
+    """
+    backend = os.getenv("STORAGE_BACKEND", "").strip().lower()
+    if backend in ("cosmos", "sqlite"):
+        return backend
+    return "cosmos" if is_configured() else "sqlite"
+
+
+def _client_options() -> dict:
+    """Pool, timeout and monitoring settings shared by the sync and the async client."""
+    return {
+        'appname': APP_NAME,
+        'maxPoolSize': MAX_POOL_SIZE,
+        'minPoolSize': MIN_POOL_SIZE,
+        'maxIdleTimeMS': MAX_IDLE_TIME_MS,
+        'connectTimeoutMS': CONNECT_TIMEOUT_MS,
+        'serverSelectionTimeoutMS': SERVER_SELECTION_TIMEOUT_MS,
+        'socketTimeoutMS': SOCKET_TIMEOUT_MS,
+        'event_listeners': [_BreakerCommandListener()],
+    }
+
+
+def get_client() -> MongoClient:
+    """
+    Returns the process-wide MongoClient, creating it on first use.
+    Creating the client does not block: pymongo connects in the background
+    and only the first operation waits for server selection.
+
+    Returns:
+        MongoClient: The shared client, or None if no connection string is configured
+        or the client could not be created.
+    """
+    global _client
+    if _client is not None:
+        return _client
+
+    connection_string = get_connection_string()
+    if not connection_string:
+        return None
+
+    with _client_lock:
+        if _client is None:
+            try:
+                _client = MongoClient(connection_string, **_client_options())
+            except Exception as e:
+                print(f"❌ Failed to create Cosmos DB client: {e}")
+                return None
+    return _client
+
+
+def get_database():
+    """Returns the kmu_meet_ki database handle, or None if the database layer is disabled."""
+    client = get_client()
+    if client is None:
+        return None
+    return client[DATABASE_NAME]
+
+
+def get_collection(name: str, use_breaker: bool = True):
+    """
+    Returns a collection of the kmu_meet_ki database.
+
+    Args:
+        name (str): The collection name (e.g. VALIDATED_RESULTS_COLLECTION).
+        use_breaker (bool): Return None while the circuit breaker is open. Request-path
+            callers keep the default; admin scripts pass False to always try.
+
+    Returns:
+        Collection: The pymongo collection, or None if the database layer is disabled
+        or currently unreachable.
+    """
+    if use_breaker and not db_breaker.allow_request():
+        return None
+    db = get_database()
+    if db is None:
+        return None
+    return db[name]
+
+
+def close_client():
+    """Closes the shared client (e.g. at the end of a script). A later call reconnects lazily."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+def get_async_client():
+    """
+    Returns the process-wide Motor (asyncio) client, creating it on first use.
+    It uses the same pool settings and circuit breaker as the sync client.
+    Motor binds the client to the event loop it is first used on, so async callers
+    should share one loop (e.g. the research pipeline's).
+
+    Returns:
+        AsyncIOMotorClient: The shared async client, or None if no connection string is
+        configured, motor is not installed or the client could not be created.
+    """
+    global _async_client
+    if _async_client is not None:
+        return _async_client
+
+    connection_string = get_connection_string()
+    if not connection_string:
+        return None
+
+    with _client_lock:
+        if _async_client is None:
+            try:
+                from motor.motor_asyncio import AsyncIOMotorClient
+            except ImportError:
+                print("⚠️ motor not installed. Async database access disabled.")
+                return None
+            try:
+                _async_client = AsyncIOMotorClient(connection_string, **_client_options())
+            except Exception as e:
+                print(f"❌ Failed to create async Cosmos DB client: {e}")
+                return None
+    return _async_client
+
+
+def get_async_collection(name: str, use_breaker: bool = True):
+    """
+    Async counterpart of get_collection().
+
+    Returns:
+        AsyncIOMotorCollection: The Motor collection, or None if the database layer is
+        disabled or currently unreachable.
+    """
+    if use_breaker and not db_breaker.allow_request():
+        return None
+    client = get_async_client()
+    if client is None:
+        return None
+    return client[DATABASE_NAME][name]
+
+
+def close_async_client():
+    """Closes the shared async client. A later call reconnects lazily."""
+    global _async_client
+    with _client_lock:
+        if _async_client is not None:
+            _async_client.close()
+            _async_client = None
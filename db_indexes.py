@@ -0,0 +1,316 @@
+"""
+Index provisioning for the kmu_meet_ki collections.
+Cosmos DB (MongoDB API) only indexes '_id' by default, so every lookup by
+question hash, status or result_id would otherwise scan the whole collection.
+
+The index manager is idempotent: creating an index that already exists is a no-op.
+Specs marked "optional" (the TTL indexes) only work on native MongoDB: Cosmos DB's RU-based
+API supports TTL on '_ts' only. They are attempted, but never count as missing; the app
+expires those documents itself.
+Specs marked "requires_empty" are unique indexes, which Cosmos DB only creates on empty
+collections. On a collection that already holds data, a non-unique index on the same keys
+is created instead, so lookups stay indexed; the unique index is reported as needing a
+migration into a fresh collection (see db_migrate.py) rather than as missing.
+The embedded SQLite backend creates the equivalent indexes with its schema (see sqlite_backend).
+
+Usage:
+    python db_indexes.py            # create missing indexes
+    python db_indexes.py --check    # only report missing indexes and verify query plans
+"""
+import sys
+import threading
+from pymongo import ASCENDING
+from db_cache import ANSWER_MAX_AGE_SECONDS, ARCHIVE_RETENTION_SECONDS
+from db_connection import (
+    ANSWER_CACHE_COLLECTION,
+    ARCHIVE_COLLECTION,
+    JOBS_COLLECTION,
+    LEASES_COLLECTION,
+    PARTITION_KEY,
+    PARTITIONED_LAYOUT,
+    VALIDATED_RESULTS_COLLECTION,
+    get_collection,
+    get_storage_backend,
+)
+
+# Indexes per collection ("optional": native MongoDB only, not required for correctness;
+# "requires_empty": unique index that Cosmos DB only creates on an empty collection)
+INDEX_SPECS = {
+    ANSWER_CACHE_COLLECTION: [
+        # get_cached_answer / store_answer, and (as prefix) the department scan of the similarity fallback
+        {"name": "department_question_hash", "keys": [("department", ASCENDING), ("question_hash", ASCENDING)]},
+        # Expires answers after ANSWER_MAX_AGE_SECONDS.
+        # Note: Cosmos DB's RU-based API only supports TTL on '_ts'; there the app-side max age still applies.
+        {"name": "created_at_ttl", "keys": [("created_at", ASCENDING)], "expireAfterSeconds": ANSWER_MAX_AGE_SECONDS,
+         "optional": True},
+    ],
+    VALIDATED_RESULTS_COLLECTION: [
+        # get_pending_results / get_approved_by_department / stats
+        {"name": "status_department", "keys": [("status", ASCENDING), ("department", ASCENDING)]},
+        # list_results / iter_results: keyset pagination in '_id' order per status and department
+        {"name": "status_department_id", "keys": [("status", ASCENDING), ("department", ASCENDING), ("_id", ASCENDING)]},
+        # approve_result / reject_result / revoke_approval
+        {"name": "result_id_unique", "keys": [("result_id", ASCENDING)], "unique": True, "requires_empty": True},
+    ],
+    ARCHIVE_COLLECTION: [
+        # compact(): one archived copy per tool
+        {"name": "result_id_unique", "keys": [("result_id", ASCENDING)], "unique": True, "requires_empty": True},
+        # Expires archived results after ARCHIVE_RETENTION_SECONDS (same Cosmos DB TTL caveat as above;
+        # compact() expires them app-side)
+        {"name": "archived_at_ttl", "keys": [("archived_at", ASCENDING)], "expireAfterSeconds": ARCHIVE_RETENTION_SECONDS,
+         "optional": True},
+    ],
+    JOBS_COLLECTION: [
+        # research_jobs.JobStore.latest: newest job of a kind
+        {"name": "kind_created_at", "keys": [("kind", ASCENDING), ("created_at", ASCENDING)]},
+    ],
+    LEASES_COLLECTION: [
+        # Garbage-collects expired leases (acquisition itself only relies on '_id' and expires_at;
+        # same Cosmos DB TTL caveat as above)
+        {"name": "expires_at_ttl", "keys": [("expires_at", ASCENDING)], "expireAfterSeconds": 0, "optional": True},
+    ],
+}
+
+# Representative queries of the hot paths and the collection they run against
+QUERY_PLAN_CHECKS = [
+    (ANSWER_CACHE_COLLECTION, {"question_hash": "0" * 64, "department": "Marketing"}),
+    (ANSWER_CACHE_COLLECTION, {"department": "Marketing"}),
+    (VALIDATED_RESULTS_COLLECTION, {"status": "pending"}),
+    (VALIDATED_RESULTS_COLLECTION, {"status": "approved", "department": "Marketing"}),
+    (VALIDATED_RESULTS_COLLECTION, {"result_id": "0" * 16, "status": "pending", "department": "Marketing"}),
+]
+
+# Spec keys that are flags of this module, not create_index options
+SPEC_FLAGS = ("keys", "optional", "requires_empty")
+MIGRATION_HINT = "needs migration (see db_migrate.py): Cosmos DB only creates unique indexes on empty collections"
+
+
+def _existing_index_keys(collection) -> dict:
+    """Maps the key pattern of every existing index to whether that index is unique."""
+    existing = {}
+    for info in collection.index_information().values():
+        existing[tuple((field, int(direction)) for field, direction in info["key"])] = bool(info.get("unique"))
+    return existing
+
+
+def _needs_migration(spec: dict, existing: dict) -> bool:
+    """True if a "requires_empty" unique index only exists as its non-unique fallback."""
+    return bool(spec.get("requires_empty")) and existing.get(tuple(spec["keys"])) is False
+
+
+def _has_documents(collection) -> bool:
+    """True if the collection holds at least one document (False if that cannot be determined)."""
+    try:
+        return collection.find_one({}, {"_id": 1}) is not None
+    except Exception:
+        return False
+
+
+def index_specs(collection_name: str, partitioned: bool = PARTITIONED_LAYOUT) -> list:
+    """
+    Returns the required indexes of a collection.
+    In the partitioned layout, Cosmos DB only accepts unique indexes that contain the
+    partition key, so those get PARTITION_KEY as their first field (plus a non-unique
+    index on the original fields for lookups that do not know the department).
+
+    Args:
+        collection_name (str): Key of INDEX_SPECS.
+        partitioned (bool): Whether the collection is sharded by PARTITION_KEY.
+    """
+    specs = INDEX_SPECS.get(collection_name, [])
+    if not partitioned or collection_name == LEASES_COLLECTION:
+        return specs
+
+    adapted = []
+    for spec in specs:
+        if spec.get("unique") and spec["keys"][0][0] != PARTITION_KEY:
+            adapted.append({**spec, "name": f"{PARTITION_KEY}_{spec['name']}", "keys": [(PARTITION_KEY, ASCENDING)] + spec["keys"]})
+            adapted.append({"name": spec["name"].replace("_unique", ""), "keys": spec["keys"]})
+        else:
+            adapted.append(spec)
+    return adapted
+
+
+def check_indexes() -> list:
+    """
+    Lists the required indexes that do not exist yet (optional indexes are not required,
+    and a unique index that exists as its non-unique fallback is listed by check_migrations()).
+
+    Returns:
+        list: Tuples of (collection name, index name) for every missing index.
+    """
+    missing = []
+    for collection_name in INDEX_SPECS:
+        collection = get_collection(collection_name, use_breaker=False)
+        if collection is None:
+            return missing
+
+        existing = _existing_index_keys(collection)
+        for spec in index_specs(collection_name):
+            if not spec.get("optional") and tuple(spec["keys"]) not in existing:
+                missing.append((collection_name, spec["name"]))
+    return missing
+
+
+def check_migrations() -> list:
+    """
+    Lists the unique indexes that only exist as a non-unique fallback (see ensure_collection_indexes).
+    Lookups are indexed; the uniqueness needs a migration into a fresh collection (db_migrate.py).
+
+    Returns:
+        list: Tuples of (collection name, index name) for every such index.
+    """
+    pending = []
+    for collection_name in INDEX_SPECS:
+        collection = get_collection(collection_name, use_breaker=False)
+        if collection is None:
+            return pending
+
+        existing = _existing_index_keys(collection)
+        for spec in index_specs(collection_name):
+            if _needs_migration(spec, existing):
+                pending.append((collection_name, spec["name"]))
+    return pending
+
+
+def ensure_indexes() -> bool:
+    """
+    Creates all required indexes that are missing.
+
+    Returns:
+        bool: True if all required indexes exist afterwards, False otherwise.
+    """
+    ok = True
+    for collection_name in INDEX_SPECS:
+        collection = get_collection(collection_name, use_breaker=False)
+        if collection is None:
+            print("⚠️ Azure Cosmos DB not configured. Skipping index provisioning.")
+            return False
+        ok = ensure_collection_indexes(collection, index_specs(collection_name)) and ok
+    return ok
+
+
+def ensure_collection_indexes(collection, specs: list) -> bool:
+    """
+    Creates the missing indexes of one collection.
+    A "requires_empty" unique index that cannot be created because the collection already
+    holds data is replaced by a non-unique index on the same keys (see MIGRATION_HINT).
+
+    Args:
+        collection: The pymongo collection.
+        specs (list): Index specs (see INDEX_SPECS / index_specs()).
+
+    Returns:
+        bool: True if all required indexes exist afterwards.
+    """
+    ok = True
+    existing = _existing_index_keys(collection)
+    for spec in specs:
+        if tuple(spec["keys"]) in existing:
+            if _needs_migration(spec, existing):
+                print(f"ℹ️ Index {collection.name}.{spec['name']} {MIGRATION_HINT}")
+            continue
+        try:
+            options = {key: value for key, value in spec.items() if key not in SPEC_FLAGS}
+            collection.create_index(spec["keys"], **options)
+            print(f"✅ Created index {collection.name}.{spec['name']}")
+        except Exception as e:
+            if spec.get("optional"):
+                # Expected on Cosmos DB (TTL only on '_ts'); the app expires these documents itself
+                print(f"ℹ️ Skipped optional index {collection.name}.{spec['name']}: {e}")
+                continue
+            if spec.get("requires_empty") and _has_documents(collection):
+                ok = _create_fallback_index(collection, spec) and ok
+                continue
+            ok = False
+            print(f"⚠️ Failed to create index {collection.name}.{spec['name']}: {e}")
+    return ok
+
+
+def _create_fallback_index(collection, spec: dict) -> bool:
+    """
+    Indexes the keys of a "requires_empty" unique spec without uniqueness.
+
+    Returns:
+        bool: True if the fallback index exists afterwards.
+    """
+    name = spec["name"].replace("_unique", "")
+    try:
+        collection.create_index(spec["keys"], name=name)
+    except Exception as e:
+        print(f"⚠️ Failed to create fallback index {collection.name}.{name}: {e}")
+        return False
+    print(f"⚠️ Created non-unique index {collection.name}.{name}; {spec['name']} {MIGRATION_HINT}")
+    return True
+
+
+def _plan_stages(node) -> set:
+    """Collects all 'stage' names that appear anywhere in an explain() document."""
+    stages = set()
+    if isinstance(node, dict):
+        if isinstance(node.get("stage"), str):
+            stages.add(node["stage"])
+        for value in node.values():
+            stages |= _plan_stages(value)
+    elif isinstance(node, list):
+        for value in node:
+            stages |= _plan_stages(value)
+    return stages
+
+
+def verify_query_plans() -> list:
+    """
+    Explains the hot-path queries and checks that they are answered from an index.
+
+    Returns:
+        list: Human-readable descriptions of queries that fall back to a collection scan.
+    """
+    problems = []
+    for collection_name, query in QUERY_PLAN_CHECKS:
+        collection = get_collection(collection_name, use_breaker=False)
+        if collection is None:
+            return problems
+
+        plan = collection.find(query).explain()
+        stages = _plan_stages(plan.get("queryPlanner", plan))
+        if "COLLSCAN" in stages or "IXSCAN" not in stages:
+            problems.append(f"{collection_name} {sorted(query)} -> {sorted(stages) or 'unknown plan'}")
+    return problems
+
+
+_started = False
+_start_lock = threading.Lock()
+
+
+def ensure_indexes_in_background():
+    """Runs ensure_indexes() once per process without blocking app startup (Cosmos backend only)."""
+    global _started
+    with _start_lock:
+        if _started or get_storage_backend() != "cosmos":
+            return
+        _started = True
+
+    def _run():
+        try:
+            ensure_indexes()
+        except Exception as e:
+            print(f"⚠️ Index provisioning failed: {e}")
+
+    threading.Thread(target=_run, name="index-provisioning", daemon=True).start()
+
+
+if __name__ == "__main__":
+    if "--check" in sys.argv[1:]:
+        missing = check_indexes()
+        for collection_name, index_name in missing:
+            print(f"❌ Missing index: {collection_name}.{index_name}")
+        for collection_name, index_name in check_migrations():
+            print(f"⚠️ Index {collection_name}.{index_name} {MIGRATION_HINT}")
+        problems = verify_query_plans()
+        for problem in problems:
+            print(f"❌ Query not indexed: {problem}")
+        if missing or problems:
+            sys.exit(1)
+        print("✅ All indexes present and used by the hot-path queries")
+    else:
+        sys.exit(0 if ensure_indexes() else 1)
@@ -0,0 +1,199 @@
+"""
+Migrates answer_cache and validated_results into collections partitioned by department.
+
+Cosmos DB cannot change the shard key of an existing collection, so the data is copied
+into new collections created with PARTITION_KEY as shard key:
+1. create the target collection (sharded by department) and its indexes while it is empty,
+2. copy the documents in _id order, in batches (idempotent upserts, safe to re-run),
+3. compare per-department document counts and content checksums of source and target.
+
+Writes that reach the source while the copy runs are not guaranteed to be included, so run
+the migration while the app is stopped, or re-run it until the checksums match.
+Deletions in the source are not propagated.
+
+Usage:
+    python db_migrate.py                    # migrate both collections
+    python db_migrate.py --batch-size 200   # smaller batches (fewer RUs per request)
+    python db_migrate.py --verify-only      # only compare source and target checksums
+
+Afterwards switch the app to the new collections:
+    COSMOS_ANSWER_CACHE_COLLECTION=answer_cache_by_department
+    COSMOS_VALIDATED_RESULTS_COLLECTION=validated_results_by_department
+    COSMOS_PARTITIONED_LAYOUT=1
+"""
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+from db_connection import (
+    ANSWER_CACHE_COLLECTION,
+    PARTITION_KEY,
+    VALIDATED_RESULTS_COLLECTION,
+    get_database,
+)
+from db_indexes import ensure_collection_indexes, index_specs
+from request_units import run_bulk_metered, run_metered
+
+# Documents per read/write batch
+MIGRATION_BATCH_SIZE = 500
+# Suffix of the partitioned target collections
+TARGET_SUFFIX = "_by_department"
+
+
+def create_partitioned_collection(db, name: str) -> bool:
+    """
+    Creates a collection sharded by PARTITION_KEY (no-op if it already exists).
+
+    Returns:
+        bool: True if the collection is partitioned (or already existed).
+    """
+    if name in db.list_collection_names():
+        print(f"ℹ️ {name} already exists, continuing the copy")
+        return True
+
+    try:
+        # Cosmos DB (MongoDB API)
+        db.command({'customAction': 'CreateCollection', 'collection': name, 'shardKey': PARTITION_KEY})
+        print(f"✅ Created {name} (partition key: {PARTITION_KEY})")
+        return True
+    except Exception as cosmos_error:
+        try:
+            # Native sharded MongoDB cluster
+            db.client.admin.command('shardCollection', f"{db.name}.{name}", key={PARTITION_KEY: 'hashed'})
+            print(f"✅ Created {name} (shard key: {PARTITION_KEY})")
+            return True
+        except Exception:
+            db.create_collection(name)
+            print(f"⚠️ Could not partition {name} ({cosmos_error}); created it unpartitioned")
+            return False
+
+
+def _pages(collection, batch_size: int, operation: str):
+    """Yields all documents of a collection as batches in _id order (keyset pagination)."""
+    last_id = None
+    while True:
+        query = {'_id': {'$gt': last_id}} if last_id is not None else {}
+        batch = run_metered(collection, operation, lambda: list(collection.find(query).sort('_id', 1).limit(batch_size)))
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1]['_id']
+
+
+def copy_collection(source, target, batch_size: int = MIGRATION_BATCH_SIZE) -> int:
+    """
+    Copies all documents from source to target with progress output.
+
+    Returns:
+        int: Number of copied documents.
+    """
+    total = source.estimated_document_count()
+    copied = 0
+    failed = 0
+    started = time.monotonic()
+    for batch in _pages(source, batch_size, 'migrate_read'):
+        requests = [ReplaceOne({'_id': doc['_id'], PARTITION_KEY: doc.get(PARTITION_KEY)}, doc, upsert=True) for doc in batch]
+        try:
+            run_bulk_metered(target, 'migrate_write', requests)
+        except BulkWriteError as e:
+            errors = e.details.get('writeErrors', [])
+            failed += len(errors)
+            print(f"⚠️ {len(errors)} document(s) could not be copied: {errors[0].get('errmsg')}")
+
+        copied += len(batch)
+        elapsed = max(time.monotonic() - started, 1e-6)
+        percent = copied / total * 100 if total else 100.0
+        print(f"  {source.name} -> {target.name}: {copied}/{total} ({percent:.0f}%) - {copied / elapsed:.0f} docs/s")
+
+    if failed:
+        print(f"⚠️ {failed} document(s) failed, re-run the migration to retry them")
+    return copied - failed
+
+
+def _document_digest(document: dict) -> int:
+    """64-bit content hash of a document (field order independent)."""
+    encoded = json.dumps(document, sort_keys=True, default=str).encode()
+    return int.from_bytes(hashlib.sha256(encoded).digest()[:8], 'big')
+
+
+def collection_checksums(collection, batch_size: int = MIGRATION_BATCH_SIZE) -> dict:
+    """
+    Computes order-independent checksums per department.
+
+    Returns:
+        dict: {department: {'count': int, 'checksum': hex str}}
+    """
+    sums = {}
+    for batch in _pages(collection, batch_size, 'migrate_checksum'):
+        for doc in batch:
+            department = doc.get(PARTITION_KEY) or 'Unknown'
+            count, checksum = sums.get(department, (0, 0))
+            sums[department] = (count + 1, (checksum + _document_digest(doc)) % 2 ** 64)
+    return {department: {'count': count, 'checksum': f"{checksum:016x}"} for department, (count, checksum) in sums.items()}
+
+
+def verify_collection(source, target, batch_size: int = MIGRATION_BATCH_SIZE) -> bool:
+    """
+    Compares per-department counts and checksums of source and target.
+
+    Returns:
+        bool: True if both collections hold the same documents.
+    """
+    expected = collection_checksums(source, batch_size)
+    actual = collection_checksums(target, batch_size)
+    ok = True
+    for department in sorted(set(expected) | set(actual)):
+        want = expected.get(department, {'count': 0, 'checksum': '-'})
+        got = actual.get(department, {'count': 0, 'checksum': '-'})
+        match = want == got
+        ok = ok and match
+        print(f"  {'✅' if match else '❌'} {department}: {want['count']} -> {got['count']} documents, "
+              f"checksum {want['checksum']} -> {got['checksum']}")
+    return ok
+
+
+def migrate(batch_size: int = MIGRATION_BATCH_SIZE, verify_only: bool = False, suffix: str = TARGET_SUFFIX) -> bool:
+    """
+    Migrates (or only verifies) both collections.
+
+    Returns:
+        bool: True if every target matches its source.
+    """
+    db = get_database()
+    if db is None:
+        print("❌ Azure Cosmos DB not configured (AZURE_COSMOS_CONNECTION_STRING missing)")
+        return False
+
+    ok = True
+    for source_name in (ANSWER_CACHE_COLLECTION, VALIDATED_RESULTS_COLLECTION):
+        target_name = source_name + suffix
+        source, target = db[source_name], db[target_name]
+        print(f"\n=== {source_name} -> {target_name} ===")
+
+        if not verify_only:
+            create_partitioned_collection(db, target_name)
+            # Unique indexes can only be created while the collection is still empty
+            ensure_collection_indexes(target, index_specs(source_name, partitioned=True))
+            copied = copy_collection(source, target, batch_size)
+            print(f"✅ Copied {copied} document(s)")
+
+        print("Verifying checksums...")
+        ok = verify_collection(source, target, batch_size) and ok
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copy answer_cache and validated_results into collections partitioned by department.")
+    parser.add_argument("--batch-size", type=int, default=MIGRATION_BATCH_SIZE, help="documents per read/write batch")
+    parser.add_argument("--verify-only", action="store_true", help="only compare source and target checksums")
+    parser.add_argument("--suffix", default=TARGET_SUFFIX, help="suffix of the target collection names")
+    args = parser.parse_args()
+
+    if migrate(args.batch_size, args.verify_only, args.suffix):
+        print("\n✅ Migration verified")
+        sys.exit(0)
+    print("\n❌ Source and target differ")
+    sys.exit(1)
@@ -0,0 +1,57 @@
+"""
+Batched purge of Cosmos DB collections.
+
+Deleting document by document costs one round trip per document plus a full read of
+every document. purge_collection() instead reads only the '_id's of the next batch and
+deletes the whole '_id' range with a single delete_many, so each request stays within a
+bounded RU budget and throttled batches are retried (see request_units.run_metered).
+"""
+import os
+import time
+from request_units import run_metered
+
+# Documents per delete_many (bounds the request charge of a single call)
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "1000"))
+
+
+def purge_collection(collection, query: dict = None, batch_size: int = PURGE_BATCH_SIZE, dry_run: bool = False) -> int:
+    """
+    Deletes all documents of a collection that match query, in '_id' ranges.
+
+    Args:
+        collection: The pymongo collection.
+        query (dict, optional): Only delete matching documents (default: all).
+        batch_size (int): Documents per delete_many.
+        dry_run (bool): Only count the matching documents.
+
+    Returns:
+        int: Number of deleted (or, in a dry run, matching) documents.
+    """
+    query = query or {}
+    total = run_metered(collection, 'purge_count', lambda: collection.count_documents(query))
+    if dry_run:
+        print(f"ℹ️ Dry run: would delete {total} document(s) from {collection.name}")
+        return total
+
+    deleted = 0
+    last_id = None
+    started = time.monotonic()
+    while True:
+        page_query = {**query, '_id': {'$gt': last_id}} if last_id is not None else query
+        ids = run_metered(collection, 'purge_ids', lambda: [
+            doc['_id'] for doc in collection.find(page_query, {'_id': 1}).sort('_id', 1).limit(batch_size)
+        ])
+        if not ids:
+            break
+
+        # The query is repeated so documents inside the range that do not match are kept
+        range_query = {**query, '_id': {'$gte': ids[0], '$lte': ids[-1]}}
+        deleted += run_metered(collection, 'purge', lambda: collection.delete_many(range_query)).deleted_count
+        last_id = ids[-1]
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        percent = min(deleted / total * 100, 100.0) if total else 100.0
+        print(f"  {collection.name}: {deleted}/{total} deleted ({percent:.0f}%) - {deleted / elapsed:.0f} docs/s")
+
+    print(f"✅ Deleted {deleted} document(s) from {collection.name} in {time.monotonic() - started:.1f}s")
+    return deleted
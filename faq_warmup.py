@@ -0,0 +1,150 @@
+"""
+Background pre-warming of the predefined department FAQ answers.
+The "Anwendungen von KI" page only offers a fixed set of questions, so their answers
+are computed ahead of time and stored in the AnswerCache. Every FAQ click then becomes a cache hit.
+
+Warm-ups run:
+- once at startup (only for questions that are not cached yet), and
+- whenever the approved tool set of a department changes (recomputes the answers that
+  were built from the previous catalog version).
+"""
+import threading
+from db_cache import cache, validated_results_manager
+
+# Pre-defined questions for each department (shown as buttons in render_anwendungen)
+FAQ_QUESTIONS = {
+    "Marketing": [
+        "Welche KI-Tools eignen sich am besten für Content-Erstellung?",
+        "Wie kann KI bei SEO und Keyword-Recherche helfen?",
+        "Welche Tools nutzen Sie für Social Media Automation?",
+        "Wie verwenden Sie KI für Grafikdesign und Bildgenerierung?"
+    ],
+    "Customer Success": [
+        "Welche Chatbot-Lösungen empfehlen Sie für KMUs?",
+        "Wie kann KI bei der Analyse von Kundenfeedback helfen?",
+        "Welche Tools automatisieren Support-Tickets am besten?",
+        "Wie nutzen Sie KI für personalisierte Kundenansprache?"
+    ],
+    "HR": [
+        "Welche KI-Tools unterstützen beim Recruiting?",
+        "Wie kann KI im Onboarding-Prozess eingesetzt werden?",
+        "Welche Tools helfen bei der Mitarbeiterentwicklung?",
+        "Wie nutzen Sie KI für Leistungsbeurteilungen?"
+    ],
+    "Product": [
+        "Welche KI-Coding-Assistenten empfehlen Sie?",
+        "Wie kann KI bei der Produktplanung helfen?",
+        "Welche Tools unterstützen beim UI/UX Design?",
+        "Wie nutzen Sie KI für Feature-Priorisierung?"
+    ],
+    "General": [
+        "Welche allgemeinen Produktivitätstools mit KI gibt es?",
+        "Wie kann KI bei Meeting-Management helfen?",
+        "Welche Tools empfehlen Sie für Wissensmanagement?",
+        "Wie nutzen Sie KI für Dokumentenverarbeitung?"
+    ]
+}
+
+
+def warm_department(department: str, force: bool = False) -> int:
+    """
+    Computes and caches the answers to all predefined questions of a department.
+
+    Args:
+        department (str): The department context.
+        force (bool): Recompute even answers that are fresh for the current catalog version.
+
+    Returns:
+        int: Number of answers that were (re)computed and stored.
+    """
+    from slm_service import department_catalog, refresh_answer
+
+    catalog_version = department_catalog.fingerprint(department)
+    warmed = 0
+    for question in FAQ_QUESTIONS.get(department, []):
+        if not force:
+            # Fresh answers for the current catalog version need no work
+            cached = cache.get_cached_answer(question, department, catalog_version=catalog_version)
+            if cached and not cached.get('stale'):
+                continue
+
+        result = refresh_answer(question, department)
+        if "error" in result:
+            print(f"⚠️ FAQ warm-up failed for '{question[:50]}': {result['error']}")
+            continue
+        warmed += 1
+    return warmed
+
+
+class FAQWarmer:
+    """
+    Single background worker that processes warm-up requests per department.
+    Requests for the same department are coalesced, so a burst of approvals
+    results in one recomputation instead of one per click.
+    """
+
+    def __init__(self):
+        self._pending = {}  # department -> force flag
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def request(self, department: str, force: bool = False):
+        """
+        Schedules a warm-up of a department.
+
+        Args:
+            department (str): The department context.
+            force (bool): Recompute already cached answers.
+        """
+        with self._condition:
+            self._pending[department] = self._pending.get(department, False) or force
+            self._ensure_thread()
+            self._condition.notify()
+
+    def _ensure_thread(self):
+        """Starts the worker thread on first use (caller holds the condition)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="faq-warmup", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Worker loop: takes one department at a time and warms it."""
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                department, force = self._pending.popitem()
+
+            try:
+                warmed = warm_department(department, force=force)
+                print(f"🔥 FAQ warm-up for {department}: {warmed} answer(s) cached")
+            except Exception as e:
+                print(f"⚠️ FAQ warm-up for {department} failed: {e}")
+
+
+# Global warmer instance
+faq_warmer = FAQWarmer()
+_started = False
+_start_lock = threading.Lock()
+
+
+def _on_catalog_change(department: str):
+    """Catalog listener: the approved set changed, so cached FAQ answers are outdated."""
+    if department in FAQ_QUESTIONS:
+        faq_warmer.request(department)
+
+
+def start_faq_warmup():
+    """
+    Starts the warm-up once per process (safe to call on every Streamlit rerun).
+    Warms all departments in the background and subscribes to catalog changes.
+    """
+    global _started
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+
+    validated_results_manager.add_catalog_listener(_on_catalog_change)
+    for department in FAQ_QUESTIONS:
+        faq_warmer.request(department)
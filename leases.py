@@ -0,0 +1,94 @@
+"""
+Lease documents in Cosmos DB for coordinating work across processes and replicas.
+A lease is a document {_id: name, owner, expires_at}; whoever holds an unexpired lease owns the work.
+
+Acquisition is a single atomic upsert: if the lease is held by someone else the filter does not
+match, the upsert tries to insert a second document with the same _id and fails with a duplicate key.
+"""
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
+from db_connection import LEASES_COLLECTION, db_breaker, get_collection
+
+# Identifies this process as lease owner
+PROCESS_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def acquire_lease(name: str, ttl_seconds: float, owner: str = PROCESS_ID, fail_open: bool = True) -> bool:
+    """
+    Tries to acquire (or extend) a lease.
+
+    Args:
+        name (str): Unique name of the guarded work (e.g. "answer:<hash>").
+        ttl_seconds (float): How long the lease stays valid without renewal.
+        owner (str): Lease owner id (defaults to this process).
+        fail_open (bool): Result if the lease cannot be written (database unavailable,
+            throttled or timed out). True suits deduplication, where doing the work twice
+            is only wasteful; leader election passes False so nobody runs unelected.
+
+    Returns:
+        bool: True if the caller now holds the lease, or fail_open if the database
+        could not be asked.
+    """
+    collection = get_collection(LEASES_COLLECTION)
+    if collection is None:
+        return fail_open
+
+    now = datetime.utcnow()
+    try:
+        collection.update_one(
+            {'_id': name, '$or': [{'expires_at': {'$lt': now}}, {'owner': owner}]},
+            {'$set': {
+                'owner': owner,
+                'expires_at': now + timedelta(seconds=ttl_seconds),
+                'renewed_at': now
+            }},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        # Held by another owner and not expired yet
+        return False
+    except Exception as e:
+        db_breaker.record_failure(e)
+        print(f"⚠️ Failed to acquire lease {name}: {e}")
+        return fail_open
+
+
+def renew_lease(name: str, ttl_seconds: float, owner: str = PROCESS_ID) -> bool:
+    """
+    Extends a lease the caller already holds (heartbeat).
+
+    Returns:
+        bool: True if the lease is still held by the caller.
+    """
+    collection = get_collection(LEASES_COLLECTION)
+    if collection is None:
+        return True
+
+    now = datetime.utcnow()
+    try:
+        result = collection.update_one(
+            {'_id': name, 'owner': owner},
+            {'$set': {'expires_at': now + timedelta(seconds=ttl_seconds), 'renewed_at': now}}
+        )
+        return result.matched_count > 0
+    except Exception as e:
+        db_breaker.record_failure(e)
+        print(f"⚠️ Failed to renew lease {name}: {e}")
+        return True
+
+
+def release_lease(name: str, owner: str = PROCESS_ID):
+    """Releases a lease held by the caller (no-op if it is held by someone else)."""
+    collection = get_collection(LEASES_COLLECTION)
+    if collection is None:
+        return
+
+    try:
+        collection.delete_one({'_id': name, 'owner': owner})
+    except Exception as e:
+        db_breaker.record_failure(e)
+        print(f"⚠️ Failed to release lease {name}: {e}")
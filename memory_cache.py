@@ -0,0 +1,103 @@
+"""
+Bounded in-process cache with LRU eviction and per-entry TTL.
+Used as the first (L1) tier in front of Cosmos DB. All operations are guarded by a lock,
+so one instance can be shared by all Streamlit session threads of a process.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLLRUCache:
+    """
+    Thread-safe LRU cache whose entries also expire after a fixed time-to-live.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        """
+        Args:
+            maxsize (int): Maximum number of entries; the least recently used one is evicted first.
+            ttl (float): Seconds an entry stays valid after it was stored.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns the value stored under key, or None if it is missing or expired.
+        A hit marks the entry as most recently used.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        """
+        Stores a value, evicting the least recently used entries if the cache is full.
+
+        Args:
+            key: Hashable cache key.
+            value: The value to store.
+            ttl (float, optional): Overrides the default time-to-live for this entry.
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key) -> bool:
+        """Removes a single entry. Returns True if it existed."""
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def invalidate_where(self, predicate) -> int:
+        """
+        Removes all entries whose value matches a predicate.
+
+        Args:
+            predicate (callable): Receives the stored value, returns True to drop the entry.
+
+        Returns:
+            int: Number of removed entries.
+        """
+        with self._lock:
+            keys = [key for key, (_, value) in self._data.items() if predicate(value)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self):
+        """Removes all entries (counters are kept)."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """Returns hit/miss/eviction counters and the current size."""
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,297 @@
+"""
+Request unit (RU) accounting and throttling retries for Cosmos DB.
+
+Cosmos DB bills every operation in request units and answers with error 16500
+("TooManyRequests", HTTP 429) once a workload exceeds the provisioned throughput.
+run_metered() wraps a single database call: throttled attempts are retried after the
+back-off the server suggests (RetryAfterMs), and every call is recorded per operation
+type in ru_meter, so throttling shows up in the numbers instead of as cache misses.
+
+With COSMOS_RU_ACCOUNTING=1 the request charge of every call is read back with the
+getLastRequestStatistics command. This costs an extra round trip per call, so it is
+meant for sizing runs rather than permanent use. The command reports the last request
+of the connection it runs on; pymongo reuses the most recently returned pooled
+connection, so charges are exact for sequential callers and approximate under heavy
+concurrency.
+
+run_metered_async() and run_bulk_metered_async() are the counterparts for Motor
+collections: they await the call and back off with asyncio.sleep, so a throttled
+coroutine does not block the event loop.
+"""
+import asyncio
+import os
+import re
+import threading
+import time
+from pymongo.errors import BulkWriteError, OperationFailure
+from pymongo.results import BulkWriteResult
+
+# Cosmos DB reports throttling (HTTP 429) as error code 16500
+THROTTLED_ERROR_CODE = 16500
+
+# Retries of a throttled call before the error is passed on to the caller
+MAX_THROTTLE_RETRIES = int(os.getenv("COSMOS_THROTTLE_RETRIES", "3"))
+# Back-off if the server does not suggest one, and the upper bound for a single wait
+# (calls on the request path must not stall a page for long)
+DEFAULT_RETRY_AFTER = 0.1
+MAX_RETRY_AFTER = 2.0
+
+# Read the request charge of every call (one extra round trip each)
+RU_ACCOUNTING = os.getenv("COSMOS_RU_ACCOUNTING", "").strip().lower() in ("1", "true", "yes")
+
+
+def retry_after_seconds(error_message: str, default: float) -> float:
+    """Extracts Cosmos' suggested back-off ('RetryAfterMs=123') from an error message."""
+    match = re.search(r'RetryAfterMs=(\d+)', error_message or '')
+    if match:
+        return int(match.group(1)) / 1000
+    return default
+
+
+def is_throttled(error: Exception) -> bool:
+    """True if a pymongo error is Cosmos DB rate limiting (not a bulk error with mixed results)."""
+    if isinstance(error, BulkWriteError) or not isinstance(error, OperationFailure):
+        return False
+    return error.code == THROTTLED_ERROR_CODE or 'TooManyRequests' in str(error)
+
+
+class RequestUnitMeter:
+    """Thread-safe counters of calls, throttling and request charge per operation type."""
+
+    def __init__(self):
+        self._operations = {}  # "collection.operation" -> counters
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, request_charge: float = None, retries: int = 0, throttled: bool = False):
+        """
+        Records one call.
+
+        Args:
+            operation (str): Operation type, e.g. "answer_cache.find_one".
+            request_charge (float, optional): RUs charged for the call (if measured).
+            retries (int): Throttled attempts that were retried.
+            throttled (bool): The call finally failed because of throttling.
+        """
+        with self._lock:
+            counters = self._operations.setdefault(operation, {
+                'calls': 0, 'measured_calls': 0, 'request_charge': 0.0, 'retries': 0, 'throttled': 0
+            })
+            counters['calls'] += 1
+            counters['retries'] += retries
+            counters['throttled'] += int(throttled)
+            if request_charge is not None:
+                counters['measured_calls'] += 1
+                counters['request_charge'] += request_charge
+
+    def stats(self) -> dict:
+        """
+        Returns the counters per operation type.
+
+        Returns:
+            dict: {operation: {'calls', 'measured_calls', 'request_charge', 'avg_request_charge', 'retries', 'throttled'}}
+        """
+        with self._lock:
+            stats = {operation: dict(counters) for operation, counters in self._operations.items()}
+        for counters in stats.values():
+            measured = counters['measured_calls']
+            counters['avg_request_charge'] = counters['request_charge'] / measured if measured else None
+        return stats
+
+    def reset(self):
+        """Clears all counters (e.g. between benchmark runs)."""
+        with self._lock:
+            self._operations.clear()
+
+
+# Global meter shared by all collections in this process
+ru_meter = RequestUnitMeter()
+
+
+def _last_request_charge(collection) -> float:
+    """Reads the request charge of the last call on this connection (None if unavailable)."""
+    try:
+        statistics = collection.database.command({'getLastRequestStatistics': 1})
+        return float(statistics.get('RequestCharge', 0.0))
+    except Exception:
+        return None
+
+
+def run_metered(collection, operation: str, fn):
+    """
+    Runs one database call with throttling retries and RU accounting.
+
+    Args:
+        collection: The pymongo collection the call runs on.
+        operation (str): Operation name, recorded as "<collection>.<operation>".
+        fn (callable): Zero-argument function performing the call. It must return a
+            materialized result (e.g. list(cursor)), so that retries cover the whole read.
+
+    Returns:
+        The result of fn(). Errors other than throttling (and throttling after
+        MAX_THROTTLE_RETRIES retries) are raised to the caller.
+    """
+    name = f"{collection.name}.{operation}"
+    retries = 0
+    while True:
+        try:
+            result = fn()
+        except Exception as e:
+            if not is_throttled(e) or retries >= MAX_THROTTLE_RETRIES:
+                ru_meter.record(name, retries=retries, throttled=is_throttled(e))
+                raise
+            retries += 1
+            time.sleep(min(MAX_RETRY_AFTER, retry_after_seconds(str(e), DEFAULT_RETRY_AFTER * 2 ** retries)))
+            continue
+
+        request_charge = _last_request_charge(collection) if RU_ACCOUNTING else None
+        ru_meter.record(name, request_charge, retries=retries)
+        return result
+
+
+def _empty_bulk_totals() -> dict:
+    """Returns zeroed counters in the shape of BulkWriteResult.bulk_api_result."""
+    return {'nInserted': 0, 'nUpserted': 0, 'nMatched': 0, 'nModified': 0, 'nRemoved': 0,
+            'upserted': [], 'writeErrors': [], 'writeConcernErrors': []}
+
+
+def _merge_bulk_attempt(totals: dict, pending: list, details: dict, attempt: int):
+    """
+    Adds one bulk_write attempt to the totals and collects its throttled operations.
+
+    Args:
+        totals (dict): Combined result so far (updated in place).
+        pending (list): (original index, request) pairs sent in this attempt.
+        details (dict): bulk_api_result (or BulkWriteError.details) of the attempt.
+        attempt (int): Number of the attempt, starting at 0.
+
+    Returns:
+        tuple: (throttled (index, request) pairs to resend, back-off in seconds)
+    """
+    for key in ('nInserted', 'nUpserted', 'nMatched', 'nModified', 'nRemoved'):
+        totals[key] += details.get(key, 0)
+    totals['upserted'].extend({**u, 'index': pending[u['index']][0]} for u in details.get('upserted', []))
+    totals['writeConcernErrors'].extend(details.get('writeConcernErrors', []))
+
+    throttled, retry_after = [], 0.0
+    for error in details.get('writeErrors', []):
+        if error.get('code') == THROTTLED_ERROR_CODE and attempt < MAX_THROTTLE_RETRIES:
+            throttled.append(pending[error['index']])
+            retry_after = max(retry_after, retry_after_seconds(error.get('errmsg'), DEFAULT_RETRY_AFTER * 2 ** (attempt + 1)))
+        else:
+            totals['writeErrors'].append({**error, 'index': pending[error['index']][0]})
+    return throttled, min(MAX_RETRY_AFTER, retry_after)
+
+
+def _bulk_result(totals: dict) -> BulkWriteResult:
+    """Raises the combined write errors or wraps the totals as a BulkWriteResult."""
+    if totals['writeErrors']:
+        raise BulkWriteError(totals)
+    return BulkWriteResult(totals, True)
+
+
+def run_bulk_metered(collection, operation: str, requests: list) -> BulkWriteResult:
+    """
+    Unordered bulk_write that retries only the throttled operations of a batch.
+
+    Args:
+        collection: The pymongo collection.
+        operation (str): Operation name for the RU meter.
+        requests (list): pymongo write models.
+
+    Returns:
+        BulkWriteResult: Combined result of all attempts.
+
+    Raises:
+        BulkWriteError: If operations failed for other reasons or stayed throttled; the
+            'index' of every write error refers to the original requests list.
+    """
+    totals = _empty_bulk_totals()
+    pending = list(enumerate(requests))
+    for attempt in range(MAX_THROTTLE_RETRIES + 1):
+        try:
+            details = run_metered(collection, operation, lambda: collection.bulk_write([r for _, r in pending], ordered=False)).bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+
+        throttled, retry_after = _merge_bulk_attempt(totals, pending, details, attempt)
+        if not throttled:
+            break
+        pending = throttled
+        time.sleep(retry_after)
+
+    return _bulk_result(totals)
+
+
+async def _last_request_charge_async(collection) -> float:
+    """Async counterpart of _last_request_charge() for Motor collections."""
+    try:
+        statistics = await collection.database.command({'getLastRequestStatistics': 1})
+        return float(statistics.get('RequestCharge', 0.0))
+    except Exception:
+        return None
+
+
+async def run_metered_async(collection, operation: str, fn):
+    """
+    Async counterpart of run_metered() for Motor collections.
+
+    Args:
+        collection: The Motor collection the call runs on.
+        operation (str): Operation name, recorded as "<collection>.<operation>".
+        fn (callable): Zero-argument function returning an awaitable that performs the
+            call, e.g. lambda: collection.find(query).to_list(None). It is called again
+            for every retry, so a throttled read is repeated as a whole.
+
+    Returns:
+        The awaited result of fn(). Errors other than throttling (and throttling after
+        MAX_THROTTLE_RETRIES retries) are raised to the caller.
+    """
+    name = f"{collection.name}.{operation}"
+    retries = 0
+    while True:
+        try:
+            result = await fn()
+        except Exception as e:
+            if not is_throttled(e) or retries >= MAX_THROTTLE_RETRIES:
+                ru_meter.record(name, retries=retries, throttled=is_throttled(e))
+                raise
+            retries += 1
+            await asyncio.sleep(min(MAX_RETRY_AFTER, retry_after_seconds(str(e), DEFAULT_RETRY_AFTER * 2 ** retries)))
+            continue
+
+        request_charge = await _last_request_charge_async(collection) if RU_ACCOUNTING else None
+        ru_meter.record(name, request_charge, retries=retries)
+        return result
+
+
+async def run_bulk_metered_async(collection, operation: str, requests: list) -> BulkWriteResult:
+    """
+    Async counterpart of run_bulk_metered() for Motor collections.
+
+    Args:
+        collection: The Motor collection.
+        operation (str): Operation name for the RU meter.
+        requests (list): pymongo write models.
+
+    Returns:
+        BulkWriteResult: Combined result of all attempts.
+
+    Raises:
+        BulkWriteError: If operations failed for other reasons or stayed throttled.
+    """
+    totals = _empty_bulk_totals()
+    pending = list(enumerate(requests))
+    for attempt in range(MAX_THROTTLE_RETRIES + 1):
+        try:
+            result = await run_metered_async(collection, operation, lambda: collection.bulk_write([r for _, r in pending], ordered=False))
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+
+        throttled, retry_after = _merge_bulk_attempt(totals, pending, details, attempt)
+        if not throttled:
+            break
+        pending = throttled
+        await asyncio.sleep(retry_after)
+
+    return _bulk_result(totals)
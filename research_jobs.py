@@ -0,0 +1,464 @@
+"""
+Persistent background jobs for the Research Assistant.
+
+A job is a document in the research_jobs collection (or table). submit_research_job()
+stores it as 'queued' and runs the research pipeline in a worker thread of the server
+process, so the admin's session is not blocked and closing the tab does not lose the
+work. While the job runs, the worker writes a heartbeat with the live progress per
+department; the dashboard only reads the job document.
+
+Only one job per kind may be queued or running. On Cosmos DB this is a lease
+("job:<kind>", see leases.py) renewed by the heartbeat, so it holds across replicas;
+on SQLite it is checked in the same transaction that inserts the job. The election
+fails closed: if the lease or the job document cannot be written, no job starts. A job whose
+worker died stops sending heartbeats and is reported as stale once its lease expired.
+
+The daily auto-search is scheduled the same way: run_scheduled_research() gives the job
+of each time window a fixed id ("research:<window start>"), so across all replicas exactly
+one node inserts and runs it; the others find the document with a single read and skip.
+If the node running it dies, another one takes the stale job over.
+
+Job lifecycle: queued -> running -> done | failed
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
+from db_connection import JOBS_COLLECTION, db_breaker, get_collection, get_storage_backend
+from db_purge import purge_collection
+from leases import PROCESS_ID, acquire_lease, release_lease, renew_lease
+
+# Kind of the Research Assistant's "Neue Tools suchen" job
+RESEARCH_JOB_KIND = "research"
+# Seconds between heartbeats (progress writes) of a running job
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "5"))
+# Seconds without heartbeat after which a job counts as dead and a new one may start
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+# Hours per window of the scheduled auto-search (one run per window across all nodes)
+AUTO_SEARCH_INTERVAL_HOURS = float(os.getenv("AUTO_SEARCH_INTERVAL_HOURS", "24"))
+# The scheduled auto-search is opt-in: page renders only start it with AUTO_SEARCH_ENABLED=1
+AUTO_SEARCH_ENABLED = os.getenv("AUTO_SEARCH_ENABLED", "").strip().lower() in ("1", "true", "yes")
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+def is_stale(job: dict) -> bool:
+    """True if a queued or running job has not sent a heartbeat within the lease time."""
+    if job.get('status') not in ACTIVE_STATUSES:
+        return False
+    heartbeat = job.get('heartbeat_at') or job.get('created_at')
+    return heartbeat is None or datetime.utcnow() - heartbeat > timedelta(seconds=JOB_LEASE_SECONDS)
+
+
+def schedule_window(interval_hours: float = AUTO_SEARCH_INTERVAL_HOURS, now: float = None) -> str:
+    """Start of the current schedule window (UTC, windows are aligned to the epoch)."""
+    interval = max(int(interval_hours * 3600), 1)
+    start = int((time.time() if now is None else now) // interval * interval)
+    return datetime.utcfromtimestamp(start).strftime('%Y-%m-%dT%H:%M')
+
+
+class JobStore:
+    """
+    Job documents in Cosmos DB.
+    Jobs started by this process are also kept in memory, so their status stays
+    visible while the database is unavailable after they started.
+    """
+
+    def __init__(self):
+        self._jobs = {}  # job_id -> job document (jobs of this process)
+        self._lock = threading.Lock()
+
+    @property
+    def collection(self):
+        """Lazy-loads the collection."""
+        return get_collection(JOBS_COLLECTION)
+
+    @staticmethod
+    def _new_job(kind: str, requested_by: str = None, job_id: str = None) -> dict:
+        """Builds the document of a queued job."""
+        now = datetime.utcnow()
+        run_id = uuid.uuid4().hex
+        return {
+            '_id': job_id or run_id,
+            'kind': kind,
+            'status': 'queued',
+            'requested_by': requested_by,
+            # Unique per run (a taken-over job keeps its id), so it also owns the job's lease
+            'owner': f"{PROCESS_ID}:{run_id[:8]}",
+            'created_at': now,
+            'started_at': None,
+            'finished_at': None,
+            'heartbeat_at': now,
+            'progress': {},
+            'stats': {},
+            'stored': 0,
+            'error': None,
+        }
+
+    def _active_in_process(self, kind: str) -> bool:
+        """True if this process already runs a job of this kind."""
+        return any(job['kind'] == kind and job['status'] in ACTIVE_STATUSES for job in self._jobs.values())
+
+    def _abandon(self, job: dict):
+        """Forgets a job that could not be stored and frees its lease."""
+        with self._lock:
+            self._jobs.pop(job['_id'], None)
+        release_lease(f"job:{job['kind']}", owner=job['owner'])
+
+    def create(self, kind: str, requested_by: str = None, job_id: str = None) -> dict:
+        """
+        Stores a new queued job, unless a job of the same kind is already queued or running.
+
+        Args:
+            kind (str): Job kind (e.g. RESEARCH_JOB_KIND).
+            requested_by (str, optional): User who started the job.
+            job_id (str, optional): Fixed id (e.g. of a schedule window). If a job with this id
+                exists, it is only replaced when it is stale.
+
+        Returns:
+            dict: The job document, or None if another job of this kind is active, the
+            job with job_id already exists, or the database could not be written.
+        """
+        job = self._new_job(kind, requested_by, job_id)
+        with self._lock:
+            if self._active_in_process(kind):
+                return None
+            # The lease is owned by this run, so only its heartbeat keeps it. Without a
+            # written lease every replica would believe it was elected, so fail closed.
+            if not acquire_lease(f"job:{kind}", JOB_LEASE_SECONDS, owner=job['owner'], fail_open=False):
+                return None
+            self._jobs[job['_id']] = job
+
+        collection = self.collection
+        if collection is None:
+            print(f"⚠️ Job {job['_id']} not started: database unavailable")
+            self._abandon(job)
+            return None
+        try:
+            collection.insert_one(dict(job))
+        except DuplicateKeyError:
+            stale_before = job['created_at'] - timedelta(seconds=JOB_LEASE_SECONDS)
+            try:
+                taken_over = collection.replace_one(
+                    {'_id': job['_id'], 'status': {'$in': list(ACTIVE_STATUSES)}, 'heartbeat_at': {'$lt': stale_before}},
+                    dict(job)
+                ).matched_count
+            except Exception as e:
+                db_breaker.record_failure(e)
+                print(f"⚠️ Failed to take over job {job['_id']}: {e}")
+                taken_over = 0
+            if not taken_over:
+                self._abandon(job)
+                return None
+            print(f"ℹ️ Took over stale job {job['_id']}")
+        except Exception as e:
+            db_breaker.record_failure(e)
+            print(f"⚠️ Job {job['_id']} not started, it could not be stored: {e}")
+            self._abandon(job)
+            return None
+        return dict(job)
+
+    def update(self, job: dict, fields: dict, renew: bool = False):
+        """
+        Updates a job of this process.
+
+        Args:
+            job (dict): The job document returned by create().
+            fields (dict): Fields to set.
+            renew (bool): Also extend the job's lease (heartbeat).
+        """
+        with self._lock:
+            self._jobs[job['_id']].update(fields)
+        if renew:
+            renew_lease(f"job:{job['kind']}", JOB_LEASE_SECONDS, owner=job['owner'])
+
+        collection = self.collection
+        if collection is None:
+            return
+        try:
+            collection.update_one({'_id': job['_id']}, {'$set': fields})
+        except Exception as e:
+            db_breaker.record_failure(e)
+            print(f"⚠️ Failed to update job {job['_id']}: {e}")
+
+    def finish(self, job: dict, fields: dict):
+        """Stores the final state of a job and frees its kind for the next job."""
+        self.update(job, fields)
+        release_lease(f"job:{job['kind']}", owner=job['owner'])
+
+    def get(self, job_id: str) -> dict:
+        """Returns a job by id, or None."""
+        collection = self.collection
+        if collection is not None:
+            try:
+                job = collection.find_one({'_id': job_id})
+                if job is not None:
+                    return job
+            except Exception as e:
+                db_breaker.record_failure(e)
+                print(f"⚠️ Failed to read job {job_id}: {e}")
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def latest(self, kind: str) -> dict:
+        """Returns the most recently created job of a kind, or None."""
+        collection = self.collection
+        if collection is not None:
+            try:
+                jobs = list(collection.find({'kind': kind}).sort('created_at', -1).limit(1))
+                if jobs:
+                    return jobs[0]
+            except Exception as e:
+                db_breaker.record_failure(e)
+                print(f"⚠️ Failed to read jobs: {e}")
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job['kind'] == kind]
+            return dict(max(jobs, key=lambda job: job['created_at'])) if jobs else None
+
+    def _forget_finished(self, kind: str):
+        """Drops the finished jobs of a kind from memory."""
+        with self._lock:
+            self._jobs = {job_id: job for job_id, job in self._jobs.items()
+                          if job['kind'] != kind or job['status'] in ACTIVE_STATUSES}
+
+    def clear(self, kind: str) -> int:
+        """
+        Deletes the finished jobs of a kind (including the schedule windows, so the
+        scheduled job of the current window runs again).
+
+        Returns:
+            int: Number of deleted jobs.
+        """
+        self._forget_finished(kind)
+        collection = get_collection(JOBS_COLLECTION, use_breaker=False)
+        if collection is None:
+            return 0
+        return purge_collection(collection, {'kind': kind, 'status': {'$nin': list(ACTIVE_STATUSES)}})
+
+
+class SQLiteJobStore(JobStore):
+    """JobStore in the embedded SQLite database (progress and stats are stored as JSON)."""
+
+    JSON_COLUMNS = ('progress', 'stats')
+    DATETIME_COLUMNS = ('created_at', 'started_at', 'finished_at', 'heartbeat_at')
+
+    def __init__(self, database):
+        """
+        Args:
+            database (SQLiteDatabase): The shared embedded database.
+        """
+        super().__init__()
+        self.database = database
+
+    @property
+    def collection(self):
+        """Not used by this backend (there is no Cosmos collection)."""
+        return None
+
+    @classmethod
+    def _row_value(cls, column: str, value):
+        """Converts a job field into its stored representation."""
+        if column in cls.JSON_COLUMNS:
+            return json.dumps(value)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    @classmethod
+    def _document(cls, row) -> dict:
+        """Converts a row into a job document."""
+        job = dict(row)
+        job['_id'] = job.pop('id')
+        for column in cls.JSON_COLUMNS:
+            job[column] = json.loads(job[column]) if job[column] else {}
+        for column in cls.DATETIME_COLUMNS:
+            if job[column]:
+                job[column] = datetime.fromisoformat(job[column])
+        return job
+
+    def create(self, kind: str, requested_by: str = None, job_id: str = None) -> dict:
+        """Stores a new queued job, unless a live job of the same kind exists (see JobStore.create)."""
+        job = self._new_job(kind, requested_by, job_id)
+        row = {column: self._row_value(column, value) for column, value in job.items() if column != '_id'}
+        fresh_after = (job['created_at'] - timedelta(seconds=JOB_LEASE_SECONDS)).isoformat()
+        with self._lock:
+            if self._active_in_process(kind):
+                return None
+            try:
+                with self.database.transaction() as conn:
+                    active = conn.execute(
+                        "SELECT id FROM research_jobs WHERE kind = ? AND status IN ('queued', 'running') AND heartbeat_at >= ? LIMIT 1",
+                        (kind, fresh_after)
+                    ).fetchone()
+                    if active is not None:
+                        return None
+                    # An existing job with this id is only replaced if it is stale (the query above
+                    # already ruled out live ones)
+                    inserted = conn.execute(
+                        f"INSERT INTO research_jobs (id, {', '.join(row)}) VALUES (?{', ?' * len(row)}) "
+                        f"ON CONFLICT (id) DO UPDATE SET {', '.join(f'{column} = excluded.{column}' for column in row)} "
+                        "WHERE research_jobs.status IN ('queued', 'running')",
+                        (job['_id'],) + tuple(row.values())
+                    ).rowcount
+                    if not inserted:
+                        return None
+            except sqlite3.Error as e:
+                print(f"⚠️ Job {job['_id']} not started, it could not be stored: {e}")
+                return None
+            self._jobs[job['_id']] = job
+        return dict(job)
+
+    def update(self, job: dict, fields: dict, renew: bool = False):
+        """Updates a job of this process (the heartbeat_at field is the lease here)."""
+        with self._lock:
+            self._jobs[job['_id']].update(fields)
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        try:
+            self.database.connection().execute(
+                f"UPDATE research_jobs SET {assignments} WHERE id = ?",
+                tuple(self._row_value(column, value) for column, value in fields.items()) + (job['_id'],)
+            )
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to update job {job['_id']}: {e}")
+
+    def finish(self, job: dict, fields: dict):
+        """Stores the final state of a job (its status frees the kind for the next job)."""
+        self.update(job, fields)
+
+    def get(self, job_id: str) -> dict:
+        """Returns a job by id, or None."""
+        try:
+            row = self.database.connection().execute("SELECT * FROM research_jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is not None:
+                return self._document(row)
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to read job {job_id}: {e}")
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def latest(self, kind: str) -> dict:
+        """Returns the most recently created job of a kind, or None."""
+        try:
+            row = self.database.connection().execute(
+                "SELECT * FROM research_jobs WHERE kind = ? ORDER BY created_at DESC LIMIT 1", (kind,)
+            ).fetchone()
+            if row is not None:
+                return self._document(row)
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to read jobs: {e}")
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job['kind'] == kind]
+            return dict(max(jobs, key=lambda job: job['created_at'])) if jobs else None
+
+    def clear(self, kind: str) -> int:
+        """Deletes the finished jobs of a kind (see JobStore.clear)."""
+        self._forget_finished(kind)
+        try:
+            with self.database.transaction() as conn:
+                return conn.execute(
+                    "DELETE FROM research_jobs WHERE kind = ? AND status NOT IN ('queued', 'running')", (kind,)
+                ).rowcount
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to delete jobs: {e}")
+            return 0
+
+
+def _run_research_job(job: dict, queries: dict, max_results: int, extracted_label: str):
+    """Worker thread of a research job: runs the pipeline and reports progress via heartbeats."""
+    from research_pipeline import run_research
+
+    progress = {}
+    stop_heartbeat = threading.Event()
+
+    def snapshot():
+        # The pipeline only changes counter values, never the keys, so copying is safe
+        return {department: dict(counters) for department, counters in progress.items()}
+
+    def heartbeat():
+        while not stop_heartbeat.wait(JOB_HEARTBEAT_SECONDS):
+            job_store.update(job, {'heartbeat_at': datetime.utcnow(), 'progress': snapshot()}, renew=True)
+
+    now = datetime.utcnow()
+    job_store.update(job, {'status': 'running', 'started_at': now, 'heartbeat_at': now}, renew=True)
+    threading.Thread(target=heartbeat, name=f"job-heartbeat-{job['_id'][:8]}", daemon=True).start()
+    print(f"🔄 Research job {job['_id']} started ({len(queries)} departments)")
+    try:
+        outcome = run_research(queries, max_results=max_results, extracted_label=extracted_label, progress=progress)
+    except Exception as e:
+        stop_heartbeat.set()
+        traceback.print_exc()
+        now = datetime.utcnow()
+        job_store.finish(job, {'status': 'failed', 'finished_at': now, 'heartbeat_at': now,
+                               'progress': snapshot(), 'error': str(e)})
+        print(f"❌ Research job {job['_id']} failed: {e}")
+        return
+
+    stop_heartbeat.set()
+    now = datetime.utcnow()
+    job_store.finish(job, {'status': 'done', 'finished_at': now, 'heartbeat_at': now, 'progress': snapshot(),
+                           'stats': outcome['stats'], 'stored': outcome['stored']})
+    print(f"✅ Research job {job['_id']} done: {outcome['stored']} result(s)")
+
+
+def submit_research_job(queries: dict, requested_by: str = None, max_results: int = 3,
+                        extracted_label: str = "LLM extracted", job_id: str = None) -> dict:
+    """
+    Queues a research run and starts it in a background thread.
+
+    Args:
+        queries (dict): department -> search query.
+        requested_by (str, optional): User who started the job.
+        max_results (int): Search results (pages) per query.
+        extracted_label (str): 'apertus_validation' of tools extracted by the LLM.
+        job_id (str, optional): Fixed job id (see run_scheduled_research).
+
+    Returns:
+        dict: The queued job, or None if a research job is already queued or running,
+        the job with job_id already ran, or the database could not be written.
+    """
+    job = job_store.create(RESEARCH_JOB_KIND, requested_by, job_id)
+    if job is None:
+        print("ℹ️ Research job not started: another one is running, this one already ran, or the database is unavailable")
+        return None
+    threading.Thread(
+        target=_run_research_job, args=(job, queries, max_results, extracted_label),
+        name=f"research-job-{job['_id'][:8]}", daemon=True
+    ).start()
+    return job
+
+
+def run_scheduled_research(queries: dict, interval_hours: float = AUTO_SEARCH_INTERVAL_HOURS, **kwargs) -> dict:
+    """
+    Starts the research job of the current schedule window, unless some node already ran
+    or runs it. Cheap to call on every page load: a skipped call costs one read by id.
+
+    Args:
+        queries (dict): department -> search query.
+        interval_hours (float): Length of the schedule window.
+        **kwargs: Passed to submit_research_job (max_results, extracted_label).
+
+    Returns:
+        dict: The started job, or None if the window's job exists and is not stale.
+    """
+    job_id = f"{RESEARCH_JOB_KIND}:{schedule_window(interval_hours)}"
+    existing = job_store.get(job_id)
+    if existing is not None and not is_stale(existing):
+        return None
+    print(f"🔄 Scheduled research for window {job_id}")
+    return submit_research_job(queries, requested_by="scheduler", job_id=job_id, **kwargs)
+
+
+# Global instance (embedded SQLite when Cosmos DB is not configured or not selected)
+if get_storage_backend() == "sqlite":
+    import db_cache  # noqa: F401 - sqlite_backend subclasses its managers, so it must be loaded first
+    from sqlite_backend import sqlite_database
+    job_store = SQLiteJobStore(sqlite_database)
+else:
+    job_store = JobStore()
@@ -0,0 +1,309 @@
+"""
+Staged, concurrent research pipeline: search -> fetch -> gather -> extract -> persist.
+
+Every stage has its own worker pool and reads from a bounded queue, so slow stages
+(page downloads, LLM extraction) overlap instead of running one department after
+another, and a fast stage cannot pile up unbounded work in front of a slow one.
+A full refresh therefore takes about as long as its bottleneck stage. Pages are fetched
+one by one but extracted per department (one LLM call per department, as before).
+
+StagedPipeline is generic; run_research() wires the research stages and is used by
+run_search.py and the daily auto-search in app.py.
+"""
+import os
+import queue
+import threading
+import time
+from analysis import extract_tool_names
+from db_cache import validated_results_manager
+from scraper import scrape_result, search_urls
+
+# Worker threads per stage and capacity of the queue in front of each stage
+SEARCH_WORKERS = int(os.getenv("RESEARCH_SEARCH_WORKERS", "2"))
+FETCH_WORKERS = int(os.getenv("RESEARCH_FETCH_WORKERS", "8"))
+EXTRACT_WORKERS = int(os.getenv("RESEARCH_EXTRACT_WORKERS", "3"))
+STAGE_QUEUE_SIZE = int(os.getenv("RESEARCH_QUEUE_SIZE", "32"))
+# Seconds between progress reports while the pipeline runs
+PROGRESS_INTERVAL = 5.0
+# Pages stored by title when the LLM extracts no tool from any page of a department
+DIRECT_SCRAPE_FALLBACK_PAGES = 2
+
+# Marks the end of a stage's input (one per worker)
+_DONE = object()
+
+
+class Stage:
+    """One pipeline stage: a function applied to every item by a pool of worker threads."""
+
+    def __init__(self, name: str, fn, workers: int = 1, queue_size: int = STAGE_QUEUE_SIZE):
+        """
+        Args:
+            name (str): Stage name (used in the stats).
+            fn (callable): Takes one item and returns an iterable of output items
+                (empty to drop the item, several to fan out).
+            workers (int): Worker threads of this stage.
+            queue_size (int): Capacity of the input queue (producers block when it is full).
+        """
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.emitted = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+
+    def put(self, item):
+        """Queues an item for this stage (blocks while the queue is full)."""
+        self.queue.put(item)
+        depth = self.queue.qsize()
+        with self._lock:
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def record(self, emitted: int, busy: float, failed: bool = False):
+        """Updates the counters after one item."""
+        with self._lock:
+            self.processed += 1
+            self.emitted += emitted
+            self.errors += int(failed)
+            self.busy_seconds += busy
+
+    def stats(self, elapsed: float) -> dict:
+        """Counters of this stage, with throughput over the elapsed run time."""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'processed': self.processed,
+                'emitted': self.emitted,
+                'errors': self.errors,
+                'queue_depth': self.queue.qsize(),
+                'max_queue_depth': self.max_queue_depth,
+                'items_per_second': self.processed / elapsed if elapsed > 0 else 0.0,
+                # Share of the worker pool's time spent working (close to 1.0 = bottleneck)
+                'utilization': self.busy_seconds / (elapsed * self.workers) if elapsed > 0 else 0.0,
+            }
+
+
+class StagedPipeline:
+    """Runs items through a chain of stages connected by bounded queues."""
+
+    def __init__(self, stages: list):
+        """
+        Args:
+            stages (list): Stage objects in processing order.
+        """
+        self.stages = stages
+        self.results = []
+        self._results_lock = threading.Lock()
+        self._started = None
+        self._finished = None
+
+    def _worker(self, index: int):
+        """Worker loop of stage index: process items and hand the outputs to the next stage."""
+        stage = self.stages[index]
+        downstream = self.stages[index + 1] if index + 1 < len(self.stages) else None
+        while True:
+            item = stage.queue.get()
+            if item is _DONE:
+                return
+
+            started = time.monotonic()
+            try:
+                outputs = list(stage.fn(item) or [])
+            except Exception as e:
+                stage.record(0, time.monotonic() - started, failed=True)
+                print(f"⚠️ Pipeline stage {stage.name} failed: {e}")
+                continue
+            stage.record(len(outputs), time.monotonic() - started)
+
+            for output in outputs:
+                if downstream is not None:
+                    downstream.put(output)
+                else:
+                    with self._results_lock:
+                        self.results.append(output)
+
+    def run(self, inputs, progress_interval: float = PROGRESS_INTERVAL) -> list:
+        """
+        Feeds inputs into the first stage and waits until every stage is drained.
+
+        Args:
+            inputs: Iterable of items for the first stage.
+            progress_interval (float): Seconds between progress reports (None for no reports).
+
+        Returns:
+            list: Outputs of the last stage.
+        """
+        self._started = time.monotonic()
+        self._finished = None
+        pools = []
+        for index, stage in enumerate(self.stages):
+            threads = [threading.Thread(target=self._worker, args=(index,), name=f"pipeline-{stage.name}-{i}", daemon=True)
+                       for i in range(stage.workers)]
+            for thread in threads:
+                thread.start()
+            pools.append(threads)
+
+        stop_reporting = threading.Event()
+        if progress_interval:
+            threading.Thread(target=self._report_progress, args=(stop_reporting, progress_interval), daemon=True).start()
+
+        try:
+            for item in inputs:
+                self.stages[0].put(item)
+            # Shut the stages down in order: a stage is finished once all its workers have
+            # seen the end marker, and only then can nothing new reach the next stage.
+            for stage, threads in zip(self.stages, pools):
+                for _ in threads:
+                    stage.queue.put(_DONE)
+                for thread in threads:
+                    thread.join()
+        finally:
+            stop_reporting.set()
+            self._finished = time.monotonic()
+        return self.results
+
+    def _report_progress(self, stop: threading.Event, interval: float):
+        """Prints the stage counters every interval seconds until stop is set."""
+        while not stop.wait(interval):
+            print(self.format_stats())
+
+    def stats(self) -> dict:
+        """
+        Returns per-stage counters, throughput and queue depths.
+
+        Returns:
+            dict: {stage name: {'workers', 'processed', 'emitted', 'errors', 'queue_depth',
+            'max_queue_depth', 'items_per_second', 'utilization'}}
+        """
+        if self._started is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._finished or time.monotonic()) - self._started
+        return {stage.name: stage.stats(elapsed) for stage in self.stages}
+
+    def format_stats(self) -> str:
+        """One line per stage, for progress output."""
+        lines = []
+        for name, stats in self.stats().items():
+            lines.append(f"  {name:<8} {stats['processed']:>4} done ({stats['items_per_second']:.2f}/s, "
+                         f"{stats['utilization']:.0%} busy, {stats['errors']} errors), "
+                         f"queue {stats['queue_depth']} (max {stats['max_queue_depth']})")
+        return "\n".join(lines)
+
+
+def run_research(queries: dict, max_results: int = 3, extracted_label: str = "LLM extracted", progress: dict = None) -> dict:
+    """
+    Searches, scrapes and extracts AI tools for several departments concurrently and
+    stores them as pending results.
+
+    Args:
+        queries (dict): department -> search query.
+        max_results (int): Search results (pages) per query.
+        extracted_label (str): 'apertus_validation' of tools extracted by the LLM; pages
+            without extractable tools are stored by title as "Direct scrape".
+        progress (dict, optional): Filled with live counters per department
+            ({department: {'pages', 'tools', 'errors'}}) that other threads may read.
+
+    Returns:
+        dict: {'stored': number of stored result_ids, 'stats': pipeline stats}
+    """
+    seen_urls = set()
+    seen_lock = threading.Lock()
+    expected = {}  # department -> number of URLs its search returned
+    gathered = {}  # department -> {'arrived': URLs accounted for, 'pages': pages to extract}
+    if progress is None:
+        progress = {}
+    # All keys exist up front, so readers can copy the dict while the pipeline runs
+    progress.update({department: {'pages': 0, 'tools': 0, 'errors': 0} for department in queries})
+
+    def count(department, key, n=1):
+        with seen_lock:
+            progress[department][key] += n
+
+    def tracked(fn):
+        # Counts failures per department (the pipeline itself only counts them per stage)
+        def run(task):
+            try:
+                return fn(task)
+            except Exception:
+                count(task[0]['department'] if isinstance(task, list) else task[0], 'errors')
+                raise
+        return run
+
+    def search(task):
+        department, query = task
+        urls = search_urls(query, max_results)
+        with seen_lock:
+            expected[department] = len(urls)
+        return [(department, query, url) for url in urls]
+
+    def fetch(task):
+        # Always emits the task, with page None on failure, so gather can tell when a department is complete
+        department, query, url = task
+        try:
+            page = scrape_result(url)
+        except Exception as e:
+            page = {'title': 'Failed to scrape', 'url': url, 'content': f"Failed to scrape {url}: {e}"}
+        if page['title'] == 'Failed to scrape':
+            print(f"  ⚠️ {page['content']}")
+            count(department, 'errors')
+            return [(department, query, None)]
+        count(department, 'pages')
+        return [(department, query, page)]
+
+    def gather(task):
+        # Drops pages already seen (the same page often ranks for several queries of a department)
+        # and hands on all pages of a department at once, once every URL of it is accounted for
+        department, query, page = task
+        state = gathered.setdefault(department, {'arrived': 0, 'pages': []})
+        state['arrived'] += 1
+        if page is not None and (department, page['url']) not in seen_urls:
+            seen_urls.add((department, page['url']))
+            state['pages'].append(page)
+        with seen_lock:
+            complete = state['arrived'] == expected[department]
+        return [(department, query, state['pages'])] if complete and state['pages'] else []
+
+    def extract(task):
+        department, query, pages = task
+        tools = extract_tool_names(pages, department)
+        if tools:
+            # Cited with the first page of the department, as before
+            return [[{
+                'query': query,
+                'department': department,
+                'llm_analysis': tool.get('description', ''),
+                'apertus_validation': extracted_label,
+                'tool_name': tool.get('tool_name'),
+                'source_url': pages[0]['url'],
+            } for tool in tools]]
+        # Fallback only if no page of the department yielded a tool: store the first page titles
+        return [[{
+            'query': query,
+            'department': department,
+            'llm_analysis': page.get('snippet', ''),
+            'apertus_validation': "Direct scrape",
+            'tool_name': page.get('title', 'Unknown')[:60],
+            'source_url': page['url'],
+        } for page in pages[:DIRECT_SCRAPE_FALLBACK_PAGES]]]
+
+    def persist(items):
+        result_ids = validated_results_manager.add_pending_results_bulk(items)
+        count(items[0]['department'], 'tools', len(result_ids))
+        return result_ids
+
+    pipeline = StagedPipeline([
+        Stage("search", tracked(search), SEARCH_WORKERS),
+        Stage("fetch", tracked(fetch), FETCH_WORKERS),
+        # One worker: gather keeps per-department state without locking
+        Stage("gather", gather, 1),
+        Stage("extract", tracked(extract), EXTRACT_WORKERS),
+        # One writer: bulk writes already batch, parallel writers would only compete for RUs
+        Stage("persist", tracked(persist), 1),
+    ])
+    stored = set(pipeline.run(queries.items()))
+    print(f"✅ Research pipeline stored {len(stored)} result(s)\n{pipeline.format_stats()}")
+    return {'stored': len(stored), 'stats': pipeline.stats()}
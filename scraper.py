@@ -64,9 +64,56 @@ def scrape_website(url):
             "message": f"An unexpected error occurred: {str(e)}"
         }
 
+def search_urls(query, max_results=100):
+    """
+    Searches for the query using Google Search.
+    
+    Args:
+        query (str): The search term.
+        max_results (int): Maximum number of search results.
+        
+    Returns:
+        list: The result URLs.
+        
+    Raises:
+        Exception: If the search itself fails (e.g. rate limiting).
+    """
+    from googlesearch import search
+    
+    # Note: googlesearch library might rate limit if used too heavily
+    return list(search(query, num_results=max_results, lang="en"))
+
+def scrape_result(url):
+    """
+    Scrapes one search result URL.
+    
+    Args:
+        url (str): The result URL.
+        
+    Returns:
+        dict: title, url, snippet and content. Failed scrapes keep the URL, with
+        title 'Failed to scrape' and the error message as content.
+    """
+    scraped_data = scrape_website(url)
+    
+    if scraped_data['status'] == 'success':
+        return {
+            'title': scraped_data.get('title', 'No Title'),
+            'url': url,
+            'snippet': scraped_data.get('text', '')[:200],  # Short preview
+            'content': scraped_data.get('text', '')         # Full content
+        }
+    return {
+        'title': 'Failed to scrape',
+        'url': url,
+        'snippet': '',
+        'content': f"Failed to scrape: {scraped_data.get('message', 'Unknown error')}"
+    }
+
 def search_and_scrape(query, max_results=100):
     """
-    Searches for the query using Google Search and scrapes the top results.
+    Searches for the query using Google Search and scrapes the top results one after another.
+    (research_pipeline runs search and scraping as separate concurrent stages.)
     
     Args:
         query (str): The search term.
@@ -75,35 +122,9 @@ def search_and_scrape(query, max_results=100):
     Returns:
         list: A list of dictionaries containing title, url, snippet, and content.
     """
-    from googlesearch import search
-    
-    results = []
     try:
-        # Perform Google search
-        # Note: googlesearch library might rate limit if used too heavily
-        urls = list(search(query, num_results=max_results, lang="en"))
-        
-        for url in urls:
-            # Scrape each URL found detailed content
-            scraped_data = scrape_website(url)
-            
-            if scraped_data['status'] == 'success':
-                results.append({
-                    'title': scraped_data.get('title', 'No Title'),
-                    'url': url,
-                    'snippet': scraped_data.get('text', '')[:200],  # Short preview
-                    'content': scraped_data.get('text', '')         # Full content
-                })
-            else:
-                # Log failed scrapes but keep the URL in results
-                results.append({
-                    'title': 'Failed to scrape',
-                    'url': url,
-                    'snippet': '',
-                    'content': f"Failed to scrape: {scraped_data.get('message', 'Unknown error')}"
-                })
-                
-        return results
+        # Scrape each URL found detailed content (failed scrapes keep the URL in results)
+        return [scrape_result(url) for url in search_urls(query, max_results)]
     except Exception as e:
         # Return a list with a single error object if the search fails broadly
         return [{"error": str(e)}]
@@ -0,0 +1,67 @@
+"""
+Request coalescing ("single-flight") for expensive computations.
+Concurrent callers asking for the same key share one in-flight computation
+instead of each running their own.
+"""
+import threading
+
+
+class SingleFlight:
+    """
+    In-process single-flight group.
+    The first caller for a key runs the function; callers arriving while it runs
+    block until it finishes and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._calls = {}  # key -> _Call
+        self._lock = threading.Lock()
+
+    def run(self, key, fn):
+        """
+        Runs fn() once per key at a time.
+
+        Args:
+            key: Hashable identifier of the computation.
+            fn (callable): Zero-argument function computing the result.
+
+        Returns:
+            The result of fn() (shared by all concurrent callers of the same key).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self, key) -> bool:
+        """True if a computation for key is currently running in this process."""
+        with self._lock:
+            return key in self._calls
+
+
+class _Call:
+    """State of one in-flight computation."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
@@ -7,10 +7,34 @@ Key Features:
 - Keyword extraction (German/English stop word removal).
 - Text similarity scoring (using sequence matching).
 - Relevance-based ranking of tools.
+- Process-wide catalog snapshot per department (no database round trip per question).
+- Catalog-versioned answer caching with stale-while-revalidate.
 """
+from concurrent.futures import ThreadPoolExecutor
 from difflib import SequenceMatcher
+import hashlib
 import re
-from db_cache import validated_results_manager
+import threading
+import time
+from db_cache import cache, validated_results_manager
+from leases import acquire_lease, release_lease
+from single_flight import SingleFlight
+from text_normalization import STOP_WORDS
+
+# Safety net for changes made by other processes (e.g. a second replica approving tools):
+# local approvals/revocations invalidate the snapshot immediately, everything else after this many seconds.
+CATALOG_SNAPSHOT_MAX_AGE = 300
+
+# Fields the ranking and the curated answer need (skips e.g. apertus_validation)
+CATALOG_FIELDS = ('result_id', 'tool_name', 'source_url', 'llm_analysis')
+
+# Worker threads recomputing stale cached answers in the background
+REFRESH_WORKERS = 2
+
+# Cross-process coalescing: how long one process may own the computation of an answer,
+# and how often the other processes check the cache for its result meanwhile.
+ANSWER_LEASE_SECONDS = 60
+ANSWER_LEASE_POLL_INTERVAL = 0.5
 
 
 def calculate_similarity(text1: str, text2: str) -> float:
@@ -40,28 +64,16 @@ def extract_keywords(text: str) -> set:
     Returns:
         set: A set of unique keywords strings.
     """
-    # Common German and English stop words to filter out
-    # These words carry little semantic weight for matching purposes.
-    stop_words = {
-        'der', 'die', 'das', 'und', 'oder', 'für', 'mit', 'von', 'zu', 'in', 'auf', 'ist', 'sind',
-        'ein', 'eine', 'einer', 'einem', 'einen', 'wie', 'was', 'wer', 'wo', 'wann', 'warum',
-        'the', 'a', 'an', 'and', 'or', 'for', 'with', 'of', 'to', 'in', 'on', 'is', 'are',
-        'how', 'what', 'who', 'where', 'when', 'why', 'can', 'could', 'would', 'should',
-        'welche', 'welcher', 'welches', 'gibt', 'es', 'ich', 'sie', 'er', 'wir', 'ihr',
-        'bitte', 'können', 'kann', 'werden', 'wurde', 'haben', 'hat', 'sein', 'bei', 'am',
-        'tools', 'tool', 'ki', 'ai', 'beste', 'best', 'gut', 'good'
-    }
-    
     # Use Regex to isolate words, convert to lowercase
     words = re.findall(r'\b\w+\b', text.lower())
     
-    # Filter: Keep word if NOT in stop_words AND length > 2
-    keywords = {w for w in words if w not in stop_words and len(w) > 2}
+    # Filter: Keep word if NOT a stop word (shared list, see text_normalization) AND length > 2
+    keywords = {w for w in words if w not in STOP_WORDS and len(w) > 2}
     
     return keywords
 
 
-def score_tool_relevance(question: str, tool: dict) -> float:
+def score_tool_relevance(question: str, tool: dict, question_keywords: set = None, tool_keywords: set = None) -> float:
     """
     Score how relevant a specific tool is to the user's question.
     Uses a hybrid approach of Keyword Overlap + String Similarity.
@@ -69,19 +81,23 @@ def score_tool_relevance(question: str, tool: dict) -> float:
     Args:
         question (str): The user's query.
         tool (dict): The tool data object (must contain 'tool_name' and 'llm_analysis').
+        question_keywords (set, optional): Precomputed keywords of the question.
+        tool_keywords (set, optional): Precomputed keywords of the tool (see DepartmentCatalog).
         
     Returns:
         float: A relevance score between 0.0 and 1.0.
     """
     # 1. Extract keywords from user question
-    question_keywords = extract_keywords(question)
+    if question_keywords is None:
+        question_keywords = extract_keywords(question)
     
     # 2. Prepare tool text (Name + Description)
     tool_name = tool.get('tool_name', '')
     description = tool.get('llm_analysis', '')
     
-    tool_text = f"{tool_name} {description}"
-    tool_keywords = extract_keywords(tool_text)
+    if tool_keywords is None:
+        tool_text = f"{tool_name} {description}"
+        tool_keywords = extract_keywords(tool_text)
     
     # 3. Calculate Keyword Score (Jaccard-like containment)
     # What % of the question's keywords appear in the tool's text?
@@ -107,6 +123,155 @@ def score_tool_relevance(question: str, tool: dict) -> float:
     return min(relevance_score, 1.0)  # Ensure score doesn't exceed 1.0
 
 
+class DepartmentCatalog:
+    """
+    Process-wide, read-mostly snapshot of the approved tools per department.
+    
+    The approved set only changes when an admin approves or revokes a tool, so the
+    snapshot (including precomputed keywords) is reused across questions and sessions
+    until the department's catalog version changes.
+    
+    Each snapshot also carries a fingerprint of the approved set. Unlike the local version
+    counter it is identical across processes, so it is used to version cached answers.
+    """
+    
+    def __init__(self, results_manager, max_age: float = CATALOG_SNAPSHOT_MAX_AGE):
+        """
+        Args:
+            results_manager: Source of truth for approved results (ValidatedResultsManager).
+            max_age (float): Seconds after which a snapshot is reloaded even without a version change.
+        """
+        self.results_manager = results_manager
+        self.max_age = max_age
+        self._snapshots = {}  # department -> snapshot dict
+        self._lock = threading.Lock()
+    
+    def _is_current(self, snapshot: dict, department: str) -> bool:
+        """Checks whether a snapshot still matches the department's catalog version."""
+        if snapshot is None:
+            return False
+        if snapshot['version'] != self.results_manager.catalog_version(department):
+            return False
+        return time.monotonic() - snapshot['loaded_at'] < self.max_age
+    
+    def _load(self, department: str) -> dict:
+        """
+        Loads the approved tools of a department and precomputes their tokens.
+        Returns None if the database is unavailable.
+        """
+        # Read the version first: a change racing with the load then triggers another reload.
+        version = self.results_manager.catalog_version(department)
+        approved = []
+        after = None
+        while True:
+            page = self.results_manager.list_results('approved', department, CATALOG_FIELDS, after=after, none_if_unavailable=True)
+            if page is None:
+                return None
+            approved.extend(page['items'])
+            after = page['next_cursor']
+            if after is None:
+                break
+        return self._build(version, approved)
+    
+    @staticmethod
+    def _build(version: int, approved: list) -> dict:
+        """Builds a snapshot from the approved tools (precomputed keywords and fingerprint)."""
+        tools = []
+        for tool in approved:
+            tool_name = tool.get('tool_name', '')
+            description = tool.get('llm_analysis', '')
+            tools.append({
+                'tool': tool,
+                'keywords': frozenset(extract_keywords(f"{tool_name} {description}")),
+            })
+        
+        # Covers the content answers quote, not only which tools are approved, so an edited
+        # description (e.g. by admin sync) also makes cached answers stale
+        digest = hashlib.sha256()
+        for tool in sorted(approved, key=lambda tool: str(tool.get('result_id'))):
+            for field in CATALOG_FIELDS:
+                digest.update(str(tool.get(field) or '').encode())
+                digest.update(b'\x1f')
+            digest.update(b'\x1e')
+        fingerprint = digest.hexdigest()[:16]
+        return {
+            'version': version,
+            'fingerprint': fingerprint,
+            'loaded_at': time.monotonic(),
+            'tools': tools,
+        }
+    
+    def seed(self, department: str, approved: list):
+        """
+        Installs a snapshot built from already loaded approved tools (e.g. a cache snapshot
+        file) unless the department already has a current one. Like a loaded snapshot it is
+        replaced once the catalog version changes or max_age has passed.
+        
+        Args:
+            department (str): The department context.
+            approved (list): Approved tool documents with at least CATALOG_FIELDS.
+        """
+        with self._lock:
+            if not self._is_current(self._snapshots.get(department), department):
+                self._snapshots[department] = self._build(self.results_manager.catalog_version(department), approved)
+    
+    def _snapshot(self, department: str) -> dict:
+        """Returns the current snapshot of a department (reloading it if needed), or None."""
+        snapshot = self._snapshots.get(department)
+        if self._is_current(snapshot, department):
+            return snapshot
+        
+        with self._lock:
+            # Another session may have reloaded the snapshot while we were waiting.
+            snapshot = self._snapshots.get(department)
+            if not self._is_current(snapshot, department):
+                loaded = self._load(department)
+                if loaded is None:
+                    # Database unavailable (e.g. circuit breaker open): keep serving the last known catalog
+                    return snapshot
+                snapshot = loaded
+                self._snapshots[department] = snapshot
+            return snapshot
+    
+    def get(self, department: str) -> list:
+        """
+        Returns the prepared tools of a department.
+        
+        Args:
+            department (str): The department context.
+            
+        Returns:
+            list: Dicts with the raw 'tool' document and its precomputed 'keywords'.
+        """
+        snapshot = self._snapshot(department)
+        return snapshot['tools'] if snapshot is not None else []
+    
+    def fingerprint(self, department: str) -> str:
+        """
+        Returns the catalog version used for answer caching.
+        
+        Args:
+            department (str): The department context.
+            
+        Returns:
+            str: Fingerprint of the approved tools and their content, or None if it is unknown (database unavailable).
+        """
+        snapshot = self._snapshot(department)
+        return snapshot['fingerprint'] if snapshot is not None else None
+    
+    def invalidate(self, department: str = None):
+        """Drops the snapshot of one department (or all of them)."""
+        with self._lock:
+            if department is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(department, None)
+
+
+# Global catalog snapshot instance
+department_catalog = DepartmentCatalog(validated_results_manager)
+
+
 def get_approved_tools_response(question: str, department: str) -> dict:
     """
     Core function: Returns a list of approved AI tools for a specific department,
@@ -123,11 +288,11 @@ def get_approved_tools_response(question: str, department: str) -> dict:
             - 'tool_count': Number of tools found.
             - 'no_curated_data': Boolean (True if no tools found).
     """
-    # Fetch all "approved" results for this department from the database
-    approved_results = validated_results_manager.get_approved_by_department(department)
+    # Fetch all "approved" results for this department from the in-process snapshot
+    catalog = department_catalog.get(department)
     
     # If no tools exist for this department yet
-    if not approved_results:
+    if not catalog:
         return {
             "answer": None,
             "no_curated_data": True,  # Flags that we should fall back to generic LLM
@@ -135,9 +300,11 @@ def get_approved_tools_response(question: str, department: str) -> dict:
         }
     
     # Rank all available tools against the question
+    question_keywords = extract_keywords(question)
     scored_tools = []
-    for tool in approved_results:
-        score = score_tool_relevance(question, tool)
+    for entry in catalog:
+        tool = entry['tool']
+        score = score_tool_relevance(question, tool, question_keywords, entry['keywords'])
         scored_tools.append((tool, score))
     
     # Sort findings by score descending (most relevant first)
@@ -171,12 +338,12 @@ def get_approved_tools_response(question: str, department: str) -> dict:
     
     # Footer
     answer_parts.append("---")
-    answer_parts.append(f"*{len(approved_results)} Tool(s) von unserem Team geprüft und empfohlen.*")
+    answer_parts.append(f"*{len(catalog)} Tool(s) von unserem Team geprüft und empfohlen.*")
     
     return {
         "answer": "\n".join(answer_parts),
         "curated": True,
-        "tool_count": len(approved_results)
+        "tool_count": len(catalog)
     }
 
 
@@ -188,6 +355,166 @@ def answer_with_curated_knowledge(question: str, department: str) -> dict:
     return get_approved_tools_response(question, department)
 
 
+def generate_answer(question: str, department: str) -> dict:
+    """
+    Computes the final chat answer for a question without consulting the answer cache.
+    Prefers curated knowledge and falls back to a direct LLM answer if the department
+    has no approved tools yet.
+    
+    Args:
+        question (str): The user's input question.
+        department (str): The department context.
+        
+    Returns:
+        dict: {'answer': str} on success, or {'error': str}.
+    """
+    slm_result = answer_with_curated_knowledge(question, department)
+    
+    if slm_result.get("curated") and slm_result.get("answer"):
+        # Successfully got answer from curated knowledge
+        answer_text = slm_result["answer"]
+        
+        # Add source attribution
+        sources = slm_result.get("sources", [])
+        if sources:
+            answer_text += "\n\n---\n*Basierend auf kuratiertem Wissen*"
+        return {"answer": answer_text}
+    
+    if slm_result.get("no_curated_data"):
+        # No curated data - fall back to direct LLM
+        from analysis import analyze_content_llm
+        
+        mock_results = [{
+            'title': f'{department} KI-Tools',
+            'url': 'internal',
+            'content': f'Frage zum Bereich {department}: {question}'
+        }]
+        
+        llm_result = analyze_content_llm(mock_results, f"{question} - Fokus: {department}")
+        
+        if "error" in llm_result:
+            return {"error": llm_result["error"]}
+        
+        answer = llm_result["analysis"]
+        answer += "\n\n---\n*Hinweis: Diese Antwort wurde direkt generiert. Kuratiertes Wissen ist noch nicht verfügbar.*"
+        return {"answer": answer}
+    
+    return {"error": slm_result.get("error", "Unbekannt")}
+
+
+# Coalesces concurrent computations of the same (question, department) within this process
+_answer_flight = SingleFlight()
+
+
+def _compute_and_store(question: str, department: str) -> dict:
+    """Computes a fresh answer and stores it under the current catalog version."""
+    # Read the version before computing: if the catalog changes meanwhile, the entry is just stale
+    catalog_version = department_catalog.fingerprint(department)
+    result = generate_answer(question, department)
+    if "error" not in result:
+        cache.store_answer(question, department, result["answer"], catalog_version=catalog_version)
+    return result
+
+
+def _compute_with_lease(question: str, department: str, key: str, wait: bool) -> dict:
+    """
+    Computes an answer unless another process already does (lease document in Mongo).
+    
+    If the lease is taken, waiting callers poll the cache until the other process has
+    stored the answer; non-waiting callers (background refreshes) give up immediately.
+    """
+    lease_name = f"answer:{key}"
+    if acquire_lease(lease_name, ANSWER_LEASE_SECONDS):
+        try:
+            return _compute_and_store(question, department)
+        finally:
+            release_lease(lease_name)
+    
+    if not wait:
+        # Drop our local copy so the next lookup reads the other process' result from Cosmos
+        cache.l1.invalidate(key)
+        return {"error": "Antwort wird bereits von einem anderen Prozess berechnet.", "busy": True}
+    
+    deadline = time.monotonic() + ANSWER_LEASE_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(ANSWER_LEASE_POLL_INTERVAL)
+        # Our L1 may hold the stale entry being refreshed (or get it back from the previous
+        # poll), which would hide the other process' answer in Cosmos: always read L2
+        cache.l1.invalidate(key)
+        cached = cache.get_cached_answer(question, department, catalog_version=department_catalog.fingerprint(department))
+        if cached and not cached.get('stale'):
+            return {"answer": cached["answer"]}
+    
+    # The other process did not deliver in time (e.g. it crashed): compute ourselves
+    return _compute_and_store(question, department)
+
+
+def refresh_answer(question: str, department: str, wait: bool = True) -> dict:
+    """
+    Computes a fresh answer and stores it in the cache, tagged with the current catalog version.
+    Concurrent requests for the same question share one computation: within this process
+    via single-flight, across processes via a lease document.
+    
+    Args:
+        question (str): The user's input question.
+        department (str): The department context.
+        wait (bool): Wait for another process' computation instead of giving up (see _compute_with_lease).
+        
+    Returns:
+        dict: {'answer': str} on success, or {'error': str}.
+    """
+    key = cache.question_key(question, department)
+    result = _answer_flight.run(key, lambda: _compute_with_lease(question, department, key, wait))
+    if wait and result.get("busy"):
+        # We joined a background refresh that gave up on the lease: wait for the other process instead
+        result = _answer_flight.run(key, lambda: _compute_with_lease(question, department, key, True))
+    return result
+
+
+_refresh_executor = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix="answer-refresh")
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def _schedule_refresh(question: str, department: str):
+    """Recomputes a stale answer in the background (at most one refresh per question at a time)."""
+    key = (department, question)
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    
+    def _run():
+        try:
+            refresh_answer(question, department, wait=False)
+        except Exception as e:
+            print(f"⚠️ Background refresh failed for '{question[:50]}': {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+    
+    _refresh_executor.submit(_run)
+
+
+def lookup_cached_answer(question: str, department: str) -> dict:
+    """
+    Looks up a cached answer for the current catalog version (stale-while-revalidate).
+    A stale answer (older catalog version or age) is returned immediately and
+    recomputed in the background, so the next request gets the fresh one.
+    
+    Args:
+        question (str): The user's input question.
+        department (str): The department context.
+        
+    Returns:
+        dict: The cached result (see AnswerCache.get_cached_answer), or None on a miss.
+    """
+    cached = cache.get_cached_answer(question, department, catalog_version=department_catalog.fingerprint(department))
+    if cached and cached.get('stale'):
+        _schedule_refresh(question, department)
+    return cached
+
+
 def get_curated_stats(department: str = None) -> dict:
     """
     Get statistics about the curated knowledge base.
@@ -199,23 +526,25 @@ def get_curated_stats(department: str = None) -> dict:
     Returns:
         dict: Stats object (counts, booleans, etc.)
     """
+    # One aggregation ($group by department and status) instead of loading every document
+    counts = validated_results_manager.get_status_counts()
+    
     if department:
         # Get count for specific department
-        approved = validated_results_manager.get_approved_by_department(department)
+        approved_count = counts.get(department, {}).get('approved', 0)
         return {
             "department": department,
-            "approved_count": len(approved),
-            "has_data": len(approved) > 0
+            "approved_count": approved_count,
+            "has_data": approved_count > 0
         }
     else:
         # Get aggregated stats for all departments
-        all_approved = validated_results_manager.get_all_approved()
         by_dept = {}
-        for result in all_approved:
-            dept = result.get('department', 'Unknown')
-            by_dept[dept] = by_dept.get(dept, 0) + 1
+        for dept, statuses in counts.items():
+            if statuses.get('approved'):
+                by_dept[dept] = statuses['approved']
         
         return {
-            "total_approved": len(all_approved),
+            "total_approved": sum(by_dept.values()),
             "by_department": by_dept
         }
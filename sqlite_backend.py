@@ -0,0 +1,736 @@
+"""
+Embedded SQLite storage backend for single-node deployments and local benchmarks.
+Implements AnswerCache and ValidatedResultsManager on a local SQLite database in WAL mode,
+with the same status lifecycle (pending -> approved/rejected, approved -> pending on revoke,
+rejected and stale pending -> archived on compaction) and the same indexes as the Cosmos DB collections.
+
+The managers subclass the Cosmos ones and only replace the storage calls, so the L1 cache,
+paraphrase matching, catalog versions and listeners behave identically on both backends.
+
+db_cache selects this backend when STORAGE_BACKEND=sqlite, or when no Cosmos DB connection
+string is configured. Always import the managers from db_cache, not from this module.
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from db_cache import (
+    ANSWER_MAX_AGE_SECONDS,
+    ARCHIVE_RETENTION_SECONDS,
+    BULK_CHUNK_SIZE,
+    LISTING_FIELDS,
+    LIST_PAGE_SIZE,
+    STALE_PENDING_DAYS,
+    STATS_CACHE_TTL,
+    TOMBSTONE_FIELDS,
+    TOMBSTONE_MAX_AGE_DAYS,
+    AnswerCache,
+    ValidatedResultsManager,
+)
+from db_purge import PURGE_BATCH_SIZE
+from text_normalization import canonicalize_question
+
+# Database file (next to the app by default)
+SQLITE_PATH = os.getenv("SQLITE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "kmu_meet_ki.db"))
+# Seconds a writer waits for the database lock before failing
+BUSY_TIMEOUT = 5.0
+# Seconds between purges of expired answers (SQLite has no TTL index)
+ANSWER_EXPIRY_INTERVAL = 3600
+
+# Tables and indexes mirror the Cosmos collections and db_indexes.INDEX_SPECS
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answer_cache (
+    department TEXT NOT NULL,
+    question_hash TEXT NOT NULL,
+    question TEXT,
+    canonical_question TEXT,
+    answer TEXT,
+    catalog_version TEXT,
+    created_at TEXT,
+    validated INTEGER DEFAULT 1,
+    PRIMARY KEY (department, question_hash)
+);
+CREATE INDEX IF NOT EXISTS created_at_ttl ON answer_cache (created_at);
+
+CREATE TABLE IF NOT EXISTS validated_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    result_id TEXT NOT NULL,
+    query TEXT,
+    tool_name TEXT,
+    source_url TEXT,
+    department TEXT,
+    llm_analysis TEXT,
+    apertus_validation TEXT,
+    status TEXT NOT NULL,
+    approved_by TEXT,
+    created_at TEXT,
+    approved_at TEXT,
+    last_seen TEXT,
+    seen_count INTEGER DEFAULT 1
+);
+CREATE UNIQUE INDEX IF NOT EXISTS result_id_unique ON validated_results (result_id);
+CREATE INDEX IF NOT EXISTS status_department_id ON validated_results (status, department, id);
+
+CREATE TABLE IF NOT EXISTS validated_results_archive (
+    result_id TEXT PRIMARY KEY,
+    query TEXT,
+    tool_name TEXT,
+    source_url TEXT,
+    department TEXT,
+    llm_analysis TEXT,
+    apertus_validation TEXT,
+    status TEXT,
+    approved_by TEXT,
+    created_at TEXT,
+    approved_at TEXT,
+    last_seen TEXT,
+    seen_count INTEGER,
+    archived_at TEXT,
+    archived_reason TEXT
+);
+CREATE INDEX IF NOT EXISTS archived_at_ttl ON validated_results_archive (archived_at);
+
+CREATE TABLE IF NOT EXISTS research_jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    requested_by TEXT,
+    owner TEXT,
+    created_at TEXT,
+    started_at TEXT,
+    finished_at TEXT,
+    heartbeat_at TEXT,
+    progress TEXT,
+    stats TEXT,
+    stored INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS kind_created_at ON research_jobs (kind, created_at);
+"""
+
+# Columns of validated_results that may be requested by the listing APIs
+RESULT_COLUMNS = (
+    'result_id', 'query', 'tool_name', 'source_url', 'department', 'llm_analysis', 'apertus_validation',
+    'status', 'approved_by', 'created_at', 'approved_at', 'last_seen', 'seen_count',
+)
+# Columns stored as ISO 8601 text and returned as datetime
+DATETIME_COLUMNS = ('created_at', 'approved_at', 'last_seen')
+
+
+def _sql_value(value):
+    """Converts a Python value into its stored representation."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _row_to_document(row: sqlite3.Row) -> dict:
+    """Converts a row into the document shape of the Cosmos backend ('id' becomes '_id')."""
+    document = dict(row)
+    if 'id' in document:
+        document['_id'] = document.pop('id')
+    for column in DATETIME_COLUMNS:
+        if document.get(column):
+            document[column] = datetime.fromisoformat(document[column])
+    return document
+
+
+class SQLiteDatabase:
+    """
+    Connection manager for the embedded database.
+    SQLite connections must not be shared between threads, so every thread gets its own;
+    WAL mode lets readers proceed while a writer commits.
+    """
+
+    def __init__(self, path: str = SQLITE_PATH):
+        """
+        Args:
+            path (str): Database file. The file and schema are created on first use.
+        """
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def connection(self) -> sqlite3.Connection:
+        """Returns this thread's connection (autocommit mode; see transaction())."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.executescript(SCHEMA)
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Runs a block of statements atomically (takes the write lock up front)."""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+
+class SQLiteAnswerCache(AnswerCache):
+    """AnswerCache whose L2 tier is the embedded SQLite database."""
+
+    BACKEND = "sqlite"
+
+    def __init__(self, database: SQLiteDatabase):
+        """
+        Args:
+            database (SQLiteDatabase): The shared embedded database.
+        """
+        super().__init__()
+        self.database = database
+        self._expired_at = 0.0
+
+    @property
+    def collection(self):
+        """Not used by this backend (there is no Cosmos collection)."""
+        return None
+
+    def _lookup(self, question_hash: str, department: str, question: str) -> dict:
+        """Looks up a cache entry by hash, first in L1, then in SQLite."""
+        entry = self.l1.get(question_hash)
+        if entry is not None:
+            return entry
+
+        try:
+            row = self.database.connection().execute(
+                "SELECT answer, created_at, catalog_version FROM answer_cache WHERE department = ? AND question_hash = ?",
+                (department, question_hash)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠️ Cache lookup error: {e}")
+            return None
+
+        if row is None:
+            self.l2_misses += 1
+            print(f"❌ Cache MISS for: {question[:50]}...")
+            return None
+
+        self.l2_hits += 1
+        print(f"✅ Cache HIT for: {question[:50]}...")
+        entry = self.entry_from_document(department, _row_to_document(row))
+        self.l1.set(question_hash, entry)
+        return entry
+
+    def _department_candidates(self, department: str) -> dict:
+        """Canonical forms of all cached questions of a department (see AnswerCache._department_candidates)."""
+        fresh = self.fresh_candidates(department)
+        if fresh is not None:
+            return fresh
+
+        try:
+            rows = self.database.connection().execute(
+                "SELECT question_hash, question, canonical_question FROM answer_cache WHERE department = ?",
+                (department,)
+            ).fetchall()
+            candidates = {
+                row['question_hash']: row['canonical_question'] or canonicalize_question(row['question'] or '')
+                for row in rows
+            }
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to load cached questions: {e}")
+            candidates = None
+        return self.remember_candidates(department, candidates)
+
+    def iter_documents(self, batch_size: int = BULK_CHUNK_SIZE):
+        """Yields all unexpired answer documents (see AnswerCache.iter_documents)."""
+        cutoff = datetime.utcnow() - timedelta(seconds=ANSWER_MAX_AGE_SECONDS)
+        cursor = self.database.connection().execute("SELECT * FROM answer_cache WHERE created_at >= ?", (cutoff.isoformat(),))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield _row_to_document(row)
+
+    def store_answer(self, question: str, department: str, answer: str, catalog_version: str = None) -> bool:
+        """
+        Stores a question-answer pair in L1 and SQLite (upsert).
+
+        Returns:
+            bool: True if the answer was written to the database.
+        """
+        question_hash, document = self._prepare_store(question, department, answer, catalog_version)
+        columns = list(document)
+        try:
+            self.database.connection().execute(
+                f"INSERT INTO answer_cache ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                f"ON CONFLICT (department, question_hash) DO UPDATE SET "
+                + ', '.join(f"{column} = excluded.{column}" for column in columns),
+                [_sql_value(document[column]) for column in columns]
+            )
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to cache answer: {e}")
+            return False
+
+        self._expire_answers()
+        print(f"✅ Cached answer for: {question[:50]}...")
+        return True
+
+    def _expire_answers(self):
+        """Deletes answers older than ANSWER_MAX_AGE_SECONDS (at most once per ANSWER_EXPIRY_INTERVAL)."""
+        now = time.monotonic()
+        if now - self._expired_at < ANSWER_EXPIRY_INTERVAL:
+            return
+        self._expired_at = now
+
+        cutoff = datetime.utcnow() - timedelta(seconds=ANSWER_MAX_AGE_SECONDS)
+        try:
+            self.database.connection().execute("DELETE FROM answer_cache WHERE created_at < ?", (cutoff.isoformat(),))
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to expire cached answers: {e}")
+
+    def invalidate(self, question: str, department: str):
+        """Removes a cached answer from both tiers."""
+        question_hash = self._hash_question(question, department)
+        self.l1.invalidate(question_hash)
+
+        try:
+            self.database.connection().execute(
+                "DELETE FROM answer_cache WHERE department = ? AND question_hash = ?",
+                (department, question_hash)
+            )
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to invalidate cached answer: {e}")
+
+
+class SQLiteValidatedResultsManager(ValidatedResultsManager):
+    """ValidatedResultsManager storing the research results in the embedded SQLite database."""
+
+    BACKEND = "sqlite"
+
+    def __init__(self, database: SQLiteDatabase):
+        """
+        Args:
+            database (SQLiteDatabase): The shared embedded database.
+        """
+        super().__init__()
+        self.database = database
+
+    @property
+    def collection(self):
+        """Not used by this backend (there is no Cosmos collection)."""
+        return None
+
+    def _upsert_pending(self, conn: sqlite3.Connection, documents: list):
+        """Inserts new tools as 'pending'; known tools only get last_seen/seen_count updated."""
+        columns = [column for column in RESULT_COLUMNS if column in documents[0]]
+        conn.executemany(
+            f"INSERT INTO validated_results ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            "ON CONFLICT (result_id) DO UPDATE SET last_seen = excluded.last_seen, seen_count = seen_count + 1",
+            [[_sql_value(document.get(column)) for column in columns] for document in documents]
+        )
+
+    def add_pending_result(self, query: str, department: str, llm_analysis: str, apertus_validation: str, tool_name: str = None, source_url: str = None) -> str:
+        """
+        Add a research result with 'pending' status, or record a rediscovery of a known tool.
+
+        Returns:
+            str: The deterministic result_id of the tool, or None if the write failed.
+        """
+        _, document = self.build_pending_upsert(query, department, llm_analysis, apertus_validation, tool_name, source_url)
+        try:
+            self._upsert_pending(self.database.connection(), [document])
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to add pending result: {e}")
+            return None
+
+        self._stats_cache = None
+        print(f"✅ Added pending result: {document['result_id']} - {tool_name}")
+        return document['result_id']
+
+    def add_pending_results_bulk(self, items: list) -> list:
+        """Adds many research results, one transaction per BULK_CHUNK_SIZE tools."""
+        documents = {}
+        for item in items:
+            _, document = self.build_pending_upsert(**item)
+            documents.setdefault(document['result_id'], document)
+
+        result_ids = list(documents)
+        written_ids = []
+        for start in range(0, len(result_ids), BULK_CHUNK_SIZE):
+            chunk = result_ids[start:start + BULK_CHUNK_SIZE]
+            try:
+                with self.database.transaction() as conn:
+                    self._upsert_pending(conn, [documents[result_id] for result_id in chunk])
+                written_ids.extend(chunk)
+            except sqlite3.Error as e:
+                print(f"⚠️ Failed to add pending results: {e}")
+                break
+
+        self._stats_cache = None
+        print(f"✅ Added or refreshed {len(written_ids)} pending result(s)")
+        return written_ids
+
+    def _find(self, where: str, params: tuple) -> list:
+        """Runs a SELECT * on validated_results and returns documents (raises sqlite3.Error)."""
+        rows = self.database.connection().execute(
+            f"SELECT * FROM validated_results WHERE {where} ORDER BY id", params
+        ).fetchall()
+        return [_row_to_document(row) for row in rows]
+
+    def get_pending_results(self) -> list:
+        """Get all results with 'pending' status (for Admin Dashboard)."""
+        try:
+            return self._find("status = 'pending'", ())
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to get pending results: {e}")
+            return []
+
+    def get_approved_by_department(self, department: str, none_if_unavailable: bool = False) -> list:
+        """Get all approved results for a specific department (for SLM Service)."""
+        try:
+            return self._find("status = 'approved' AND department = ?", (department,))
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to get approved results: {e}")
+            return None if none_if_unavailable else []
+
+    def get_all_approved(self) -> list:
+        """Get all approved results across all departments."""
+        try:
+            return self._find("status = 'approved'", ())
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to get all approved results: {e}")
+            return []
+
+    def list_results(self, status: str, department: str = None, fields: tuple = LISTING_FIELDS,
+                     page_size: int = LIST_PAGE_SIZE, after=None, description_chars: int = None,
+                     none_if_unavailable: bool = False) -> dict:
+        """One keyset page of lightweight records (see ValidatedResultsManager.list_results)."""
+        columns = ['id'] + [field for field in fields if field in RESULT_COLUMNS]
+        params = [status]
+        if description_chars is not None:
+            columns.append("substr(coalesce(llm_analysis, ''), 1, ?) AS description")
+            params.insert(0, description_chars + 1)
+
+        where = "status = ?"
+        if department is not None:
+            where += " AND department = ?"
+            params.append(department)
+        if after is not None:
+            where += " AND id > ?"
+            params.append(after)
+        params.append(page_size)
+
+        try:
+            rows = self.database.connection().execute(
+                f"SELECT {', '.join(columns)} FROM validated_results WHERE {where} ORDER BY id LIMIT ?", params
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to list {status} results: {e}")
+            return None if none_if_unavailable else {'items': [], 'next_cursor': None}
+
+        items = [_row_to_document(row) for row in rows]
+        next_cursor = items[-1]['_id'] if len(items) == page_size else None
+        return {'items': items, 'next_cursor': next_cursor}
+
+    def get_status_counts(self) -> dict:
+        """Counts results per department and status (cached for STATS_CACHE_TTL seconds)."""
+        cached = self._stats_cache
+        if cached is not None and time.monotonic() - cached[0] < STATS_CACHE_TTL:
+            return cached[1]
+
+        try:
+            rows = self.database.connection().execute(
+                "SELECT department, status, COUNT(*) AS count FROM validated_results GROUP BY department, status"
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to aggregate result stats: {e}")
+            return cached[1] if cached is not None else {}
+
+        counts = self.counts_from_rows(
+            {'_id': {'department': row['department'], 'status': row['status']}, 'count': row['count']} for row in rows
+        )
+        self._stats_cache = (time.monotonic(), counts)
+        return counts
+
+    @staticmethod
+    def _result_where(result_ids: list, status: str, department: str = None):
+        """WHERE clause and parameters selecting result_ids in a status (optionally of one department)."""
+        where = f"result_id IN ({', '.join('?' * len(result_ids))}) AND status = ?"
+        params = list(result_ids) + [status]
+        if department is not None:
+            where += " AND department = ?"
+            params.append(department)
+        return where, params
+
+    def _transition(self, result_id: str, from_status: str, update: dict, department: str = None):
+        """
+        Changes the status of one result atomically.
+
+        Returns:
+            str: The department of the changed result, or None if no result was in from_status.
+        """
+        where, params = self._result_where([result_id], from_status, department)
+        with self.database.transaction() as conn:
+            row = conn.execute(f"SELECT department FROM validated_results WHERE {where}", params).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                f"UPDATE validated_results SET {', '.join(f'{column} = ?' for column in update)} WHERE {where}",
+                [_sql_value(value) for value in update.values()] + params
+            )
+            return row['department']
+
+    def approve_result(self, result_id: str, approved_by: str, department: str = None) -> bool:
+        """Transfers a result from 'pending' to 'approved'."""
+        try:
+            department = self._transition(result_id, 'pending', {
+                'status': 'approved',
+                'approved_by': approved_by,
+                'approved_at': datetime.utcnow()
+            }, department)
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to approve result: {e}")
+            return False
+
+        if department is None:
+            return False
+        self.bump_catalog_version(department)
+        print(f"✅ Approved result: {result_id}")
+        return True
+
+    def reject_result(self, result_id: str, department: str = None) -> bool:
+        """Mark a pending result as 'rejected'."""
+        try:
+            department = self._transition(result_id, 'pending', {'status': 'rejected'}, department)
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to reject result: {e}")
+            return False
+
+        if department is None:
+            return False
+        self._stats_cache = None
+        print(f"❌ Rejected result: {result_id}")
+        return True
+
+    def revoke_approval(self, result_id: str, department: str = None) -> bool:
+        """Moves an item back from 'approved' to 'pending'."""
+        try:
+            department = self._transition(result_id, 'approved', {
+                'status': 'pending',
+                'approved_by': None,
+                'approved_at': None
+            }, department)
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to revoke approval: {e}")
+            return False
+
+        if department is None:
+            return False
+        self.bump_catalog_version(department)
+        return True
+
+    def _update_many_by_id(self, result_ids: list, from_status: str, update: dict, department: str = None) -> dict:
+        """Applies the same status transition to many results, one transaction per chunk."""
+        modified = 0
+        departments = set()
+        assignments = ', '.join(f'{column} = ?' for column in update)
+        values = [_sql_value(value) for value in update.values()]
+        for start in range(0, len(result_ids), BULK_CHUNK_SIZE):
+            where, params = self._result_where(list(result_ids[start:start + BULK_CHUNK_SIZE]), from_status, department)
+            try:
+                with self.database.transaction() as conn:
+                    rows = conn.execute(f"SELECT DISTINCT department FROM validated_results WHERE {where}", params).fetchall()
+                    departments.update(row['department'] for row in rows)
+                    cursor = conn.execute(f"UPDATE validated_results SET {assignments} WHERE {where}", values + params)
+                    modified += cursor.rowcount
+            except sqlite3.Error as e:
+                print(f"⚠️ Failed to update results: {e}")
+                break
+
+        self._stats_cache = None
+        return {'modified': modified, 'departments': departments}
+
+    def find_results(self, result_ids: list = None, source: str = None, fields: tuple = LISTING_FIELDS,
+                     none_if_unavailable: bool = False) -> list:
+        """Looks up results in any status by result_id and/or source (see ValidatedResultsManager.find_results)."""
+        conditions, params = [], []
+        if result_ids is not None:
+            result_ids = list(result_ids)
+            conditions.append(f"result_id IN ({', '.join('?' * len(result_ids))})")
+            params.extend(result_ids)
+        if source is not None:
+            conditions.append("apertus_validation = ?")
+            params.append(source)
+        columns = ['id'] + [field for field in fields if field in RESULT_COLUMNS]
+        try:
+            rows = self.database.connection().execute(
+                f"SELECT {', '.join(columns)} FROM validated_results WHERE {' AND '.join(conditions) or '1 = 1'} ORDER BY id", params
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to find results: {e}")
+            return None if none_if_unavailable else []
+        return [_row_to_document(row) for row in rows]
+
+    @staticmethod
+    def _id_where(result_ids: list, department: str = None):
+        """WHERE clause and parameters selecting result_ids in any status (optionally of one department)."""
+        where = f"result_id IN ({', '.join('?' * len(result_ids))})"
+        params = list(result_ids)
+        if department is not None:
+            where += " AND department = ?"
+            params.append(department)
+        return where, params
+
+    def _approved_departments(self, conn: sqlite3.Connection, where: str, params: list) -> list:
+        """Departments with an approved result matching where (see ValidatedResultsManager._approved_departments)."""
+        rows = conn.execute(f"SELECT DISTINCT department FROM validated_results WHERE {where} AND status = 'approved'", params).fetchall()
+        return [row['department'] for row in rows]
+
+    def update_results(self, changes: dict, department: str = None) -> int:
+        """Updates fields of many results, one transaction per chunk (see ValidatedResultsManager.update_results)."""
+        result_ids = list(changes)
+        modified = 0
+        departments = set()
+        for start in range(0, len(result_ids), BULK_CHUNK_SIZE):
+            try:
+                with self.database.transaction() as conn:
+                    for result_id in result_ids[start:start + BULK_CHUNK_SIZE]:
+                        update = {column: value for column, value in changes[result_id].items() if column in RESULT_COLUMNS}
+                        where, params = self._id_where([result_id], department)
+                        departments.update(self._approved_departments(conn, where, params))
+                        modified += conn.execute(
+                            f"UPDATE validated_results SET {', '.join(f'{column} = ?' for column in update)} WHERE {where}",
+                            [_sql_value(value) for value in update.values()] + params
+                        ).rowcount
+            except sqlite3.Error as e:
+                print(f"⚠️ Failed to update results: {e}")
+                break
+
+        self._stats_cache = None
+        for changed_department in departments:
+            self.bump_catalog_version(changed_department)
+        return modified
+
+    def delete_results(self, result_ids: list, department: str = None) -> int:
+        """Deletes many results, one transaction per chunk (see ValidatedResultsManager.delete_results)."""
+        deleted = 0
+        departments = set()
+        for start in range(0, len(result_ids), BULK_CHUNK_SIZE):
+            where, params = self._id_where(list(result_ids[start:start + BULK_CHUNK_SIZE]), department)
+            try:
+                with self.database.transaction() as conn:
+                    departments.update(self._approved_departments(conn, where, params))
+                    deleted += conn.execute(f"DELETE FROM validated_results WHERE {where}", params).rowcount
+            except sqlite3.Error as e:
+                print(f"⚠️ Failed to delete results: {e}")
+                break
+
+        self._stats_cache = None
+        for changed_department in departments:
+            self.bump_catalog_version(changed_department)
+        return deleted
+
+    def purge(self, status: str = None, dry_run: bool = False, batch_size: int = PURGE_BATCH_SIZE) -> int:
+        """Deletes all results (or all results in one status) in id ranges, one transaction per batch."""
+        where, params = ("status = ?", [status]) if status else ("1 = 1", [])
+        conn = self.database.connection()
+        try:
+            total = conn.execute(f"SELECT COUNT(*) FROM validated_results WHERE {where}", params).fetchone()[0]
+            if dry_run:
+                print(f"ℹ️ Dry run: would delete {total} document(s) from validated_results")
+                return total
+            departments = [] if status not in (None, 'approved') else [
+                row['department'] for row in conn.execute("SELECT DISTINCT department FROM validated_results WHERE status = 'approved'")
+            ]
+
+            deleted = 0
+            started = time.monotonic()
+            while True:
+                with self.database.transaction() as conn:
+                    row = conn.execute(
+                        f"SELECT max(id) FROM (SELECT id FROM validated_results WHERE {where} ORDER BY id LIMIT ?)",
+                        params + [batch_size]
+                    ).fetchone()
+                    if row[0] is None:
+                        break
+                    deleted += conn.execute(f"DELETE FROM validated_results WHERE {where} AND id <= ?", params + [row[0]]).rowcount
+                elapsed = max(time.monotonic() - started, 1e-6)
+                percent = min(deleted / total * 100, 100.0) if total else 100.0
+                print(f"  validated_results: {deleted}/{total} deleted ({percent:.0f}%) - {deleted / elapsed:.0f} docs/s")
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to purge results: {e}")
+            return 0
+
+        self._stats_cache = None
+        for department in departments:
+            self.bump_catalog_version(department)
+        print(f"✅ Deleted {deleted} document(s) from validated_results in {time.monotonic() - started:.1f}s")
+        return deleted
+
+    def compact(self, stale_after_days: int = STALE_PENDING_DAYS, tombstone_max_age_days: int = TOMBSTONE_MAX_AGE_DAYS,
+                batch_size: int = BULK_CHUNK_SIZE, dry_run: bool = False) -> dict:
+        """
+        Moves rejected and stale pending results into validated_results_archive and leaves
+        tombstones in their place (see ValidatedResultsManager.compact). Runs in a single
+        transaction, so batch_size is not used.
+        """
+        now = datetime.utcnow()
+        where = "(status = 'rejected' OR (status = 'pending' AND coalesce(last_seen, created_at) < ?))"
+        params = ((now - timedelta(days=stale_after_days)).isoformat(),)
+        expired_params = ((now - timedelta(days=tombstone_max_age_days)).isoformat(),)
+        archive_expired_params = ((now - timedelta(seconds=ARCHIVE_RETENTION_SECONDS)).isoformat(),)
+        outcome = {'archived': 0, 'expired_tombstones': 0, 'expired_archived': 0}
+
+        try:
+            conn = self.database.connection()
+            if dry_run:
+                outcome['archived'] = conn.execute(f"SELECT COUNT(*) FROM validated_results WHERE {where}", params).fetchone()[0]
+                outcome['expired_tombstones'] = conn.execute(
+                    "SELECT COUNT(*) FROM validated_results WHERE status = 'archived' AND last_seen < ?", expired_params
+                ).fetchone()[0]
+                outcome['expired_archived'] = conn.execute(
+                    "SELECT COUNT(*) FROM validated_results_archive WHERE archived_at < ?", archive_expired_params
+                ).fetchone()[0]
+                return outcome
+
+            columns = ', '.join(RESULT_COLUMNS)
+            cleared = ', '.join(f"{column} = NULL" for column in RESULT_COLUMNS if column not in TOMBSTONE_FIELDS and column != 'status')
+            with self.database.transaction() as conn:
+                # WHERE is required before ON CONFLICT in an INSERT ... SELECT upsert
+                conn.execute(
+                    f"INSERT INTO validated_results_archive ({columns}, archived_at, archived_reason) "
+                    f"SELECT {columns}, ?, CASE status WHEN 'rejected' THEN 'rejected' ELSE 'stale' END "
+                    f"FROM validated_results WHERE {where} ON CONFLICT (result_id) DO UPDATE SET "
+                    + ', '.join(f"{column} = excluded.{column}" for column in RESULT_COLUMNS + ('archived_at', 'archived_reason')),
+                    (now.isoformat(),) + params
+                )
+                outcome['archived'] = conn.execute(
+                    f"UPDATE validated_results SET status = 'archived', {cleared}, "
+                    f"last_seen = coalesce(last_seen, created_at, ?) WHERE {where}",
+                    (now.isoformat(),) + params
+                ).rowcount
+                outcome['expired_tombstones'] = conn.execute(
+                    "DELETE FROM validated_results WHERE status = 'archived' AND last_seen < ?", expired_params
+                ).rowcount
+                outcome['expired_archived'] = conn.execute(
+                    "DELETE FROM validated_results_archive WHERE archived_at < ?", archive_expired_params
+                ).rowcount
+        except sqlite3.Error as e:
+            print(f"⚠️ Compaction failed: {e}")
+            return {'archived': 0, 'expired_tombstones': 0, 'expired_archived': 0}
+
+        self._stats_cache = None
+        print(f"🗄️ Archived {outcome['archived']} result(s), expired {outcome['expired_tombstones']} tombstone(s) "
+              f"and {outcome['expired_archived']} archived result(s)")
+        return outcome
+
+
+# Shared embedded database of this process
+sqlite_database = SQLiteDatabase()
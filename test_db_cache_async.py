@@ -0,0 +1,158 @@
+"""
+Tests of the async managers in db_cache_async.
+Motor is replaced by a small awaitable facade over a mongomock collection, so the tests
+need neither a Cosmos DB account nor a running event loop of the app.
+
+Run with: python -m pytest test_db_cache_async.py
+"""
+import asyncio
+import pytest
+from pymongo.errors import OperationFailure
+
+mongomock = pytest.importorskip("mongomock")
+
+import db_cache
+import write_behind
+from db_cache import AnswerCache, ValidatedResultsManager
+from db_cache_async import AsyncAnswerCache, AsyncValidatedResultsManager
+from request_units import THROTTLED_ERROR_CODE, ru_meter
+
+
+class AsyncCursor:
+    """Motor-style cursor: chaining stays synchronous, to_list() is awaited."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, limit):
+        self._cursor = self._cursor.limit(limit)
+        return self
+
+    async def to_list(self, length):
+        return list(self._cursor)
+
+
+class AsyncCollection:
+    """Motor-style facade over a mongomock collection (only what db_cache_async uses)."""
+
+    def __init__(self, collection):
+        self._collection = collection
+        self.name = collection.name
+        self.throttle_next = 0  # Number of upcoming bulk_write calls that fail with 16500
+
+    def find(self, *args, **kwargs):
+        return AsyncCursor(self._collection.find(*args, **kwargs))
+
+    def aggregate(self, pipeline):
+        return AsyncCursor(self._collection.aggregate(pipeline))
+
+    async def bulk_write(self, requests, ordered=True):
+        if self.throttle_next:
+            self.throttle_next -= 1
+            raise OperationFailure("Request rate is large. RetryAfterMs=1", code=THROTTLED_ERROR_CODE)
+        return self._collection.bulk_write(requests, ordered=ordered)
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+
+@pytest.fixture
+def collections(monkeypatch):
+    """Routes the async managers and the write-behind flusher to fresh in-memory collections."""
+    database = mongomock.MongoClient().db
+    answers = AsyncCollection(database.answer_cache)
+    results = AsyncCollection(database.validated_results)
+    monkeypatch.setattr(AsyncAnswerCache, 'collection', property(lambda self: answers))
+    monkeypatch.setattr(AsyncValidatedResultsManager, 'collection', property(lambda self: results))
+    monkeypatch.setattr(db_cache, 'is_configured', lambda: True)
+    monkeypatch.setattr(write_behind, 'get_collection', lambda name: database[name])
+    return answers, results
+
+
+def add_tool(manager, tool_name, department="Marketing"):
+    return asyncio.run(manager.add_pending_result(
+        query=f"{tool_name} für {department}",
+        department=department,
+        llm_analysis=f"{tool_name} erstellt Texte.",
+        apertus_validation="Test",
+        tool_name=tool_name,
+        source_url=f"https://{tool_name.lower()}.example"
+    ))
+
+
+def test_result_lifecycle_shares_state_with_sync_manager(collections):
+    sync_manager = ValidatedResultsManager()
+    manager = AsyncValidatedResultsManager(sync_manager)
+
+    result_id = add_tool(manager, "Jasper")
+    assert result_id == sync_manager.tool_result_id("Marketing", "Jasper", "https://jasper.example")
+    assert [r['result_id'] for r in asyncio.run(manager.get_pending_results())] == [result_id]
+
+    assert asyncio.run(manager.approve_result(result_id, "admin", "Marketing"))
+    assert sync_manager.catalog_version("Marketing") == 1
+    assert asyncio.run(manager.get_status_counts()) == {'Marketing': {'approved': 1}}
+    assert sync_manager.cached_status_counts() == {'Marketing': {'approved': 1}}
+
+    assert asyncio.run(manager.update_results({result_id: {'tool_name': "Jasper AI"}})) == 1
+    assert sync_manager.catalog_version("Marketing") == 2
+    found = asyncio.run(manager.find_results([result_id], fields=('result_id', 'tool_name')))
+    assert [r['tool_name'] for r in found] == ["Jasper AI"]
+
+    assert asyncio.run(manager.delete_results([result_id])) == 1
+    assert sync_manager.catalog_version("Marketing") == 3
+    assert asyncio.run(manager.find_results([result_id])) == []
+
+
+def test_listing_pages_and_bulk_approval(collections):
+    manager = AsyncValidatedResultsManager(ValidatedResultsManager())
+    result_ids = [add_tool(manager, name) for name in ("Jasper", "Canva", "Notion")]
+
+    async def listed():
+        return [item['result_id'] async for item in manager.iter_results('pending', page_size=2)]
+
+    assert sorted(asyncio.run(listed())) == sorted(result_ids)
+    assert asyncio.run(manager.approve_many(result_ids[:2], "admin")) == 2
+    assert asyncio.run(manager.list_results('pending'))['items'][0]['result_id'] == result_ids[2]
+
+
+def test_throttled_write_is_retried_and_metered(collections):
+    _, results = collections
+    manager = AsyncValidatedResultsManager(ValidatedResultsManager())
+    ru_meter.reset()
+
+    results.throttle_next = 1
+    assert add_tool(manager, "Jasper") is not None
+    assert results.throttle_next == 0
+    assert ru_meter.stats()['validated_results.upsert_pending']['retries'] == 1
+
+
+def test_answers_take_the_write_behind_path(collections):
+    sync_cache = AnswerCache()
+    answers = AsyncAnswerCache(sync_cache)
+    # An older answer of the sync API is still queued when the async one is stored
+    assert sync_cache.store_answer("Was ist KI?", "General", "Veraltete Antwort.", "v0")
+    assert asyncio.run(answers.store_answer("Was ist KI?", "General", "Maschinelle Intelligenz.", "v1"))
+
+    other = AsyncAnswerCache(AnswerCache())
+    assert asyncio.run(other.get_cached_answer("Was ist KI?", "General", "v1"))['answer'] == "Maschinelle Intelligenz."
+    assert write_behind.write_queue.flush()
+
+    async def exported():
+        return [document async for document in answers.iter_documents()]
+
+    documents = asyncio.run(exported())
+    assert [d['answer'] for d in documents] == ["Maschinelle Intelligenz."]
+    assert '_id' not in documents[0]
+
+    fresh = AsyncAnswerCache(AnswerCache())
+    assert fresh.seed(documents) == 1
+    result = asyncio.run(fresh.get_cached_answer("Was ist KI?", "General", "v1"))
+    assert result['answer'] == "Maschinelle Intelligenz." and not result['stale']
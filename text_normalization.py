@@ -0,0 +1,133 @@
+"""
+Text canonicalization shared by the answer cache and the SLM ranking.
+Questions that only differ in casing, punctuation, umlaut spelling ("fuer" vs "für")
+or filler words map to the same canonical form. Word order is kept, since it carries
+meaning ("Ist Jasper besser als Copy.ai?" is not "Ist Copy.ai besser als Jasper?").
+"""
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+# Umlauts are folded to their ASCII transliteration, so both spellings meet in the middle
+UMLAUT_FOLDING = str.maketrans({
+    'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'ß': 'ss',
+})
+
+# Common German and English stop words to filter out
+# These words carry little semantic weight for matching purposes.
+STOP_WORDS = {
+    'der', 'die', 'das', 'und', 'oder', 'für', 'mit', 'von', 'zu', 'in', 'auf', 'ist', 'sind',
+    'ein', 'eine', 'einer', 'einem', 'einen', 'wie', 'was', 'wer', 'wo', 'wann', 'warum',
+    'the', 'a', 'an', 'and', 'or', 'for', 'with', 'of', 'to', 'in', 'on', 'is', 'are',
+    'how', 'what', 'who', 'where', 'when', 'why', 'can', 'could', 'would', 'should',
+    'welche', 'welcher', 'welches', 'gibt', 'es', 'ich', 'sie', 'er', 'wir', 'ihr',
+    'bitte', 'können', 'kann', 'werden', 'wurde', 'haben', 'hat', 'sein', 'bei', 'am',
+    'tools', 'tool', 'ki', 'ai', 'beste', 'best', 'gut', 'good'
+}
+
+# The same stop words after umlaut folding (used on canonicalized text)
+FOLDED_STOP_WORDS = {word.translate(UMLAUT_FOLDING) for word in STOP_WORDS}
+
+# Negations flip the meaning of an otherwise near-identical question, so questions
+# that differ in them are never treated as similar
+NEGATION_TOKENS = {
+    'nicht', 'nichts', 'kein', 'keine', 'keinen', 'keinem', 'keiner', 'keines', 'ohne', 'nie', 'niemals',
+    'not', 'no', 'none', 'without', 'never',
+}
+
+
+def fold_text(text: str) -> str:
+    """
+    Unicode NFKC normalization, lowercasing and umlaut folding.
+
+    Args:
+        text (str): Raw input text.
+
+    Returns:
+        str: Folded text (punctuation is kept).
+    """
+    text = unicodedata.normalize('NFKC', text).lower()
+    return text.translate(UMLAUT_FOLDING)
+
+
+def question_tokens(text: str) -> list:
+    """
+    Splits a question into canonical content tokens (folded, no punctuation, no stop words).
+
+    Args:
+        text (str): The user's question.
+
+    Returns:
+        list: Tokens in their original order.
+    """
+    words = re.findall(r'\w+', fold_text(text))
+    return [w for w in words if w not in FOLDED_STOP_WORDS]
+
+
+def canonicalize_question(text: str, sort_tokens: bool = False) -> str:
+    """
+    Builds the canonical form of a question used for cache keys.
+    Tokens keep their order, so questions that only differ in word order stay distinct.
+
+    Args:
+        text (str): The user's question.
+        sort_tokens (bool): De-duplicate and sort the tokens instead (order-insensitive
+            identities such as the query fallback of discovered tools).
+
+    Returns:
+        str: Space-separated canonical tokens (may be empty for pure filler questions).
+    """
+    tokens = question_tokens(text)
+    if not tokens:
+        # Nothing but stop words/punctuation: fall back to the folded text itself
+        return ' '.join(re.findall(r'\w+', fold_text(text)))
+    return ' '.join(sorted(set(tokens)) if sort_tokens else tokens)
+
+
+def _ordered_unique(canonical: str, tokens: set) -> list:
+    """The given tokens in order of their first occurrence in a canonical question."""
+    return list(dict.fromkeys(token for token in canonical.split() if token in tokens))
+
+
+def canonical_similarity(canonical1: str, canonical2: str) -> float:
+    """
+    Similarity of two canonical questions (0.0 - 1.0).
+    Averages token overlap (Jaccard) and character-level similarity, so both
+    reworded and slightly misspelled questions score high, unrelated ones low.
+    Questions that differ in a negation ("nicht", "kein", "not", ...) or that use their
+    shared words in a different order ("A besser als B" vs "B besser als A") score 0.0.
+
+    Args:
+        canonical1 (str): Output of canonicalize_question().
+        canonical2 (str): Output of canonicalize_question().
+
+    Returns:
+        float: Similarity ratio.
+    """
+    tokens1 = set(canonical1.split())
+    tokens2 = set(canonical2.split())
+    if not tokens1 or not tokens2:
+        return 1.0 if canonical1 == canonical2 else 0.0
+    if tokens1 & NEGATION_TOKENS != tokens2 & NEGATION_TOKENS:
+        return 0.0
+    shared = tokens1 & tokens2
+    if _ordered_unique(canonical1, shared) != _ordered_unique(canonical2, shared):
+        return 0.0
+
+    jaccard = len(tokens1 & tokens2) / len(tokens1 | tokens2)
+    char_ratio = SequenceMatcher(None, canonical1, canonical2).ratio()
+    return (jaccard + char_ratio) / 2
+
+
+def normalize_tool_name(name: str) -> str:
+    """
+    Normalizes a tool name for identity comparisons.
+    "ChatGPT", "Chat GPT" and "chat-gpt" all map to "chatgpt".
+
+    Args:
+        name (str): Tool name as extracted from a search result.
+
+    Returns:
+        str: Folded name without whitespace and punctuation.
+    """
+    return ''.join(re.findall(r'[a-z0-9]+', fold_text(name or '')))
@@ -0,0 +1,199 @@
+"""
+Non-blocking write-behind queue for Cosmos DB writes.
+Request threads enqueue their writes and return immediately; a background flusher
+batches them into bulk_write calls, retries throttled or failed batches, and drains
+the queue on shutdown.
+
+Writes that are queued but not yet flushed can still be read back via pending(),
+so callers never miss their own writes.
+"""
+import atexit
+import threading
+import time
+from collections import OrderedDict
+from pymongo.errors import BulkWriteError
+from db_connection import db_breaker, get_collection
+from request_units import THROTTLED_ERROR_CODE, retry_after_seconds, run_metered
+
+# Flusher settings
+FLUSH_INTERVAL = 0.5     # seconds between flushes when writes are pending
+WRITE_BATCH_SIZE = 100   # operations per bulk_write call (keeps each request well below Cosmos limits)
+MAX_BACKOFF = 30.0       # upper bound for the retry backoff in seconds
+SHUTDOWN_TIMEOUT = 10.0  # seconds to drain the queue at interpreter exit
+
+
+class WriteBehindQueue:
+    """
+    Batches writes per collection and flushes them in the background.
+    Writes are keyed, so a newer write for the same key replaces an unflushed older one.
+    """
+
+    def __init__(self):
+        self._pending = OrderedDict()  # (collection_name, key) -> (operation, document)
+        self._inflight = {}            # same shape, batch currently being written
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()  # serializes flushes of the background thread and flush()
+        self._thread = None
+        self._backoff = 0.0
+        self.flushed = 0
+        self.retries = 0
+        self.dropped = 0
+
+    def enqueue(self, collection_name: str, key: str, operation, document: dict):
+        """
+        Queues a write.
+
+        Args:
+            collection_name (str): Target collection.
+            key (str): Identity of the written document (e.g. question_hash or result_id).
+            operation: pymongo write model (InsertOne, UpdateOne, ...).
+            document (dict): The document as it will look after the write (served by pending()).
+        """
+        with self._condition:
+            self._pending[(collection_name, key)] = (operation, document)
+            self._pending.move_to_end((collection_name, key))
+            self._ensure_thread()
+            self._condition.notify()
+
+    def pending(self, collection_name: str, key: str) -> dict:
+        """Returns the not-yet-flushed document for key, or None."""
+        with self._condition:
+            entry = self._pending.get((collection_name, key)) or self._inflight.get((collection_name, key))
+            return entry[1] if entry else None
+
+    def pending_documents(self, collection_name: str) -> list:
+        """Returns all not-yet-flushed documents of a collection."""
+        with self._condition:
+            merged = dict(self._inflight)
+            merged.update(self._pending)
+            return [document for (name, _), (_, document) in merged.items() if name == collection_name]
+
+    def _ensure_thread(self):
+        """Starts the flusher thread on first use (caller holds the condition)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Flusher loop."""
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                delay = max(FLUSH_INTERVAL, self._backoff)
+            time.sleep(delay)
+            self.flush_once()
+
+    def flush_once(self) -> bool:
+        """
+        Writes all currently pending operations.
+
+        Returns:
+            bool: True if everything was written, False if some writes were re-queued.
+        """
+        with self._flush_lock:
+            return self._flush_pending()
+
+    def _flush_pending(self) -> bool:
+        """Body of flush_once (caller holds the flush lock)."""
+        with self._condition:
+            if not self._pending:
+                return True
+            self._inflight = dict(self._pending)
+            self._pending.clear()
+
+        by_collection = {}
+        for (collection_name, key), entry in self._inflight.items():
+            by_collection.setdefault(collection_name, []).append((key, entry))
+
+        failed = {}
+        retry_after = 0.0
+        for collection_name, entries in by_collection.items():
+            for start in range(0, len(entries), WRITE_BATCH_SIZE):
+                chunk = entries[start:start + WRITE_BATCH_SIZE]
+                chunk_failed, chunk_retry_after = self._write_chunk(collection_name, chunk)
+                for key, entry in chunk_failed:
+                    failed[(collection_name, key)] = entry
+                retry_after = max(retry_after, chunk_retry_after)
+
+        with self._condition:
+            # Re-queue failures unless a newer write for the same key arrived meanwhile
+            for full_key, entry in failed.items():
+                if full_key not in self._pending:
+                    self._pending[full_key] = entry
+            self._inflight = {}
+            if failed:
+                self.retries += len(failed)
+                self._backoff = min(MAX_BACKOFF, max(retry_after, self._backoff * 2 or FLUSH_INTERVAL))
+            else:
+                self._backoff = 0.0
+            self._condition.notify_all()
+        return not failed
+
+    def _write_chunk(self, collection_name: str, chunk: list):
+        """
+        Writes one chunk with an unordered bulk_write.
+
+        Returns:
+            tuple: (entries to retry, suggested back-off in seconds)
+        """
+        collection = get_collection(collection_name)
+        if collection is None:
+            # Circuit breaker open (or database gone): keep everything for later
+            return chunk, 0.0
+
+        try:
+            run_metered(collection, 'write_behind', lambda: collection.bulk_write([operation for _, (operation, _) in chunk], ordered=False))
+            self.flushed += len(chunk)
+            return [], 0.0
+        except BulkWriteError as e:
+            retry, retry_after = [], 0.0
+            for error in e.details.get('writeErrors', []):
+                if error.get('code') == THROTTLED_ERROR_CODE:
+                    retry.append(chunk[error['index']])
+                    retry_after = max(retry_after, retry_after_seconds(error.get('errmsg'), FLUSH_INTERVAL))
+                else:
+                    self.dropped += 1
+                    print(f"⚠️ Dropped write to {collection_name}: {error.get('errmsg')}")
+            self.flushed += len(chunk) - len(e.details.get('writeErrors', []))
+            return retry, retry_after
+        except Exception as e:
+            db_breaker.record_failure(e)
+            print(f"⚠️ Write-behind flush to {collection_name} failed, retrying: {e}")
+            return chunk, retry_after_seconds(str(e), FLUSH_INTERVAL)
+
+    def flush(self, timeout: float = SHUTDOWN_TIMEOUT) -> bool:
+        """
+        Synchronously drains the queue (used before reads that need flushed data and at shutdown).
+
+        Args:
+            timeout (float): Maximum seconds to keep retrying.
+
+        Returns:
+            bool: True if the queue is empty afterwards.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.flush_once():
+                return True
+            if time.monotonic() >= deadline:
+                with self._condition:
+                    remaining = len(self._pending)
+                print(f"⚠️ Write-behind queue not drained, {remaining} write(s) lost")
+                return False
+            time.sleep(min(self._backoff, max(0.0, deadline - time.monotonic())))
+
+    def stats(self) -> dict:
+        """Returns queue depth and flush counters."""
+        with self._condition:
+            return {
+                "pending": len(self._pending) + len(self._inflight),
+                "flushed": self.flushed,
+                "retries": self.retries,
+                "dropped": self.dropped,
+            }
+
+
+# Global queue shared by all managers in this process
+write_queue = WriteBehindQueue()
+atexit.register(write_queue.flush)